@@ -8,7 +8,10 @@ from datetime import datetime, timedelta
 # Import custom modules
 from risk_assessment import get_risk_profile, get_risk_score
 from financial_data import get_market_data, get_stock_data, get_index_data
+from correlation_engine import CorrelationEngine
+from rolling_analytics import rolling_analytics
 from portfolio_optimizer import get_optimized_portfolio
+from what_if import WhatIfPortfolio
 from performance_projections import project_portfolio_performance
 from educational_content import investment_education
 from utils import load_profile_image
@@ -149,6 +152,45 @@ elif page == "Portfolio Recommendation":
             })
             st.dataframe(allocation_df, hide_index=True)
             
+            st.subheader("What-If Analysis")
+            st.write("Adjust the allocation to see how the expected return and risk change.")
+            
+            # Keep one engine per profile, so each slider tick only applies
+            # the weights that changed
+            if st.session_state.get('what_if_profile') != st.session_state.risk_profile:
+                st.session_state.what_if = WhatIfPortfolio(dict(zip(portfolio['asset_class'], portfolio['allocation'])))
+                st.session_state.what_if_profile = st.session_state.risk_profile
+            what_if = st.session_state.what_if
+            
+            slider_cols = st.columns(4)
+            for i, (asset, weight) in enumerate(zip(portfolio['asset_class'], portfolio['allocation'])):
+                with slider_cols[i % 4]:
+                    value = st.slider(asset, 0, 100, int(round(weight * 100)),
+                                      key=f"what_if_{st.session_state.risk_profile}_{asset}")
+                what_if.set_weight(asset, value / 100)
+            
+            metrics = what_if.metrics()
+            metric_cols = st.columns(4)
+            metric_cols[0].metric("Expected Return", f"{metrics['expected_return']:.2%}",
+                                  f"{metrics['expected_return'] - portfolio['expected_return']:+.2%}")
+            metric_cols[1].metric("Expected Volatility", f"{metrics['expected_volatility']:.2%}",
+                                  f"{metrics['expected_volatility'] - portfolio['expected_volatility']:+.2%}",
+                                  delta_color="inverse")
+            metric_cols[2].metric("Sharpe Ratio", f"{metrics['sharpe_ratio']:.2f}",
+                                  f"{metrics['sharpe_ratio'] - portfolio['sharpe_ratio']:+.2f}")
+            metric_cols[3].metric("Total Allocation", f"{metrics['total_weight']:.0%}")
+            if abs(metrics['total_weight'] - 1) > 1e-9:
+                st.warning("The allocation does not add up to 100%.")
+            
+            contributions = what_if.risk_contributions()
+            fig = px.bar(
+                x=contributions.index,
+                y=contributions['share'] * 100,
+                labels={'x': 'Asset Class', 'y': 'Share of Portfolio Risk (%)'},
+                title='Risk Contribution by Asset Class'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            
             st.info("This is a high-level asset allocation. For a more detailed portfolio with specific securities, please consult with a financial advisor.")
             
         except Exception as e:
@@ -187,6 +229,11 @@ elif page == "Market Analysis":
                 st.session_state.market_data = market_data
             
             if market_data is not None:
+                # Report tickers that could not be fetched and analyze the rest
+                if market_data['failures']:
+                    st.warning(f"No data could be fetched for: {', '.join(market_data['failures'])}")
+                tickers = [ticker for ticker in tickers if ticker in market_data['prices'].columns]
+                
                 # Price chart
                 fig = px.line(
                     market_data['normalized'], 
@@ -213,15 +260,49 @@ elif page == "Market Analysis":
                 })
                 st.dataframe(metrics_df, hide_index=True)
                 
-                # Correlation matrix
-                st.subheader("Correlation Matrix")
-                fig_corr = px.imshow(
-                    market_data['correlation'],
-                    text_auto=True,
-                    color_continuous_scale='RdBu_r',
-                    title='Stock Price Correlation'
+                # Rolling risk, with the window scaled to the selected period and
+                # short enough to fill at least twice over the available returns
+                st.subheader("Rolling Risk")
+                rolling_window = min(21 if period_days[period] <= 365 else 63,
+                                     len(market_data['daily_returns']) // 2)
+                analytics = rolling_analytics(market_data['prices'][tickers], windows=(max(rolling_window, 2),))
+                
+                if rolling_window >= 5:
+                    fig_vol = px.line(
+                        analytics['volatility'][rolling_window].dropna(how='all'),
+                        labels={'value': 'Volatility (%)', 'variable': 'Stock'},
+                        title=f'Rolling {rolling_window}-Day Volatility'
+                    )
+                    st.plotly_chart(fig_vol, use_container_width=True)
+                
+                fig_dd = px.area(
+                    analytics['underwater'] * 100,
+                    labels={'value': 'Drawdown (%)', 'variable': 'Stock'},
+                    title='Drawdown from Peak'
                 )
-                st.plotly_chart(fig_corr, use_container_width=True)
+                st.plotly_chart(fig_dd, use_container_width=True)
+                
+                # Correlation matrix, or the strongest correlations of one
+                # ticker when there are too many tickers to display
+                st.subheader("Correlation Matrix")
+                if len(tickers) <= 25:
+                    fig_corr = px.imshow(
+                        market_data['correlation'],
+                        text_auto=True,
+                        color_continuous_scale='RdBu_r',
+                        title='Stock Price Correlation'
+                    )
+                    st.plotly_chart(fig_corr, use_container_width=True)
+                else:
+                    focus = st.selectbox("Show the strongest correlations of", tickers)
+                    engine = CorrelationEngine(market_data['daily_returns'])
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.write("Most correlated")
+                        st.dataframe(engine.top_k(focus, 10).rename('Correlation'))
+                    with col2:
+                        st.write("Least correlated")
+                        st.dataframe(engine.top_k(focus, 10, largest=False).rename('Correlation'))
             else:
                 st.warning("No data available for the selected tickers or time period. Please check your inputs and try again.")
         except Exception as e:
@@ -250,8 +331,12 @@ elif page == "Performance Projections":
             projected_performance = project_portfolio_performance(
                 st.session_state.portfolio,
                 initial_investment=initial_investment,
-                years=time_horizon
+                years=time_horizon,
+                sampling='sobol',
+                control_variate=True
             )
+            # Keep only the Monte Carlo percentiles in the session, not every path
+            projected_performance['monte_carlo'].pop('simulations')
             st.session_state.projected_performance = projected_performance
             
             # Performance projection chart
@@ -0,0 +1,291 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import pandas as pd
+import numpy as np
+from financial_data import get_market_data
+from portfolio_optimizer import ALLOCATION_MAPS, EXAMPLE_TICKERS, FALLBACK_TICKERS
+from rolling_analytics import max_drawdown
+
+# Default one-way transaction cost, as a fraction of the value traded
+DEFAULT_COST = 0.001
+
+def _rebalance_candidates(index, frequency):
+    """
+    Find the bars at which a rebalancing rule may trade.
+
+    Args:
+        index (pandas.DatetimeIndex): Dates of the price panel
+        frequency (str): Period alias ('W', 'M', 'Q', 'Y'): the first bar of every
+                         period is a candidate; None makes every bar a candidate
+
+    Returns:
+        numpy.ndarray: Positions of the candidate bars, excluding the first bar
+    """
+    if frequency is None:
+        return np.arange(1, len(index))
+    periods = index.to_period(frequency).asi8
+    return np.flatnonzero(np.diff(periods) != 0) + 1
+
+def _rebalance_dates(relatives, targets, candidates, threshold):
+    """
+    Find the bars at which the portfolio is actually rebalanced.
+
+    Between two rebalancings the holdings are fixed, so the drifted weights at
+    a block of later candidates follow from one vectorized product. Blocks
+    start small after every rebalancing and double while no breach is found,
+    so the whole scan touches each candidate about once.
+
+    Args:
+        relatives (numpy.ndarray): Prices divided by their first row, bars x assets
+        targets (numpy.ndarray): Target weight of each asset
+        candidates (numpy.ndarray): Positions of the bars the rule may trade at
+        threshold (float): Rebalance only when a weight drifts further than this
+                           from its target; None to rebalance at every candidate
+
+    Returns:
+        numpy.ndarray: Positions of the rebalancing bars
+    """
+    if threshold is None:
+        return candidates
+
+    rebalances = []
+    holdings = targets / relatives[0]
+    position, block = 0, 16
+    while position < len(candidates):
+        window = candidates[position:position + block]
+        values = relatives[window] * holdings
+        drift = np.abs(values / values.sum(axis=1, keepdims=True) - targets).max(axis=1)
+        breaches = np.flatnonzero(drift > threshold)
+        if len(breaches):
+            start = window[breaches[0]]
+            rebalances.append(start)
+            holdings = targets / relatives[start]
+            position, block = position + breaches[0] + 1, 16
+        else:
+            position, block = position + block, block * 2
+    return np.array(rebalances, dtype=int)
+
+def backtest_allocation(prices, weights, frequency='M', threshold=None, cost=DEFAULT_COST,
+                        periods_per_year=252):
+    """
+    Backtest a fixed-weight allocation with rebalancing and transaction costs.
+
+    Rebalancing bars are found first; the value path is then computed for all
+    bars at once, each bar's growth being measured against the prices of the
+    last rebalancing before it.
+
+    Args:
+        prices (pandas.DataFrame): Prices with one column per ticker, without gaps
+        weights (dict): Target weight of each ticker
+        frequency (str): Calendar rebalancing period ('W', 'M', 'Q', 'Y'), None for none
+        threshold (float): Only rebalance when a weight has drifted further than
+                           this from its target (checked at every candidate bar)
+        cost (float): One-way transaction cost as a fraction of the value traded
+        periods_per_year (int): Bars per year, used for annualization
+
+    Returns:
+        dict: Value path ('value'), rebalancing dates, turnover and the summary
+              metrics returned by summarize_backtest
+    """
+    tickers = [ticker for ticker in weights if weights[ticker]]
+    targets = np.array([weights[ticker] for ticker in tickers], dtype=float)
+    targets /= targets.sum()
+    values = prices[tickers].to_numpy(dtype=float)
+    relatives = values / values[0]
+
+    if frequency is None and threshold is None:
+        rebalances = np.array([], dtype=int)
+    else:
+        candidates = _rebalance_candidates(prices.index, frequency)
+        rebalances = _rebalance_dates(relatives, targets, candidates, threshold)
+
+    # Position of the last rebalancing (or the start) at or before each bar
+    starts = np.zeros(len(values), dtype=int)
+    starts[rebalances] = rebalances
+    starts = np.maximum.accumulate(starts)
+
+    # Growth of the portfolio since its last rebalancing
+    growth = (relatives / relatives[starts]) @ targets
+
+    # At each rebalancing, trade from the drifted weights back to the targets
+    previous = starts[rebalances - 1]
+    drifted = relatives[rebalances] / relatives[previous] * targets
+    segment_growth = drifted.sum(axis=1)
+    turnover = np.abs(drifted / segment_growth[:, None] - targets).sum(axis=1)
+
+    # Value at the start of each segment: growth of every earlier segment net of costs
+    segment_values = np.concatenate([[1.0], np.cumprod(segment_growth * (1 - cost * turnover))])
+    segment = np.searchsorted(rebalances, np.arange(len(values)), side='right')
+    portfolio = pd.Series(segment_values[segment] * growth, index=prices.index)
+
+    result = summarize_backtest(portfolio, periods_per_year)
+    result['value'] = portfolio
+    result['rebalance_dates'] = prices.index[rebalances]
+    result['turnover'] = pd.Series(turnover, index=prices.index[rebalances])
+    return result
+
+def summarize_backtest(value, periods_per_year=252):
+    """
+    Compute summary metrics of a backtested value path.
+
+    Args:
+        value (pandas.Series): Portfolio value at every bar
+        periods_per_year (int): Bars per year, used for annualization
+
+    Returns:
+        dict: Total and annualized return, volatility, Sharpe ratio (risk-free
+              rate of 0) and maximum drawdown
+    """
+    returns = value.pct_change().iloc[1:]
+    years = len(returns) / periods_per_year
+    total_return = value.iloc[-1] / value.iloc[0] - 1
+    volatility = returns.std() * np.sqrt(periods_per_year)
+    return {
+        'total_return': total_return,
+        'annualized_return': (1 + total_return) ** (1 / years) - 1 if years > 0 else np.nan,
+        'volatility': volatility,
+        'sharpe_ratio': returns.mean() * periods_per_year / volatility if volatility > 0 else np.nan,
+        'max_drawdown': max_drawdown(value.to_frame()).iloc[0]
+    }
+
+# Panel shared by the tasks running in a worker process
+_worker_prices = None
+
+def _init_worker(prices):
+    """
+    Receive the price panel once per worker process.
+
+    Args:
+        prices (pandas.DataFrame): Prices shared by all tasks
+    """
+    global _worker_prices
+    _worker_prices = prices
+
+def _run_task(task):
+    """
+    Backtest one allocation under one rule against the worker's panel.
+
+    Args:
+        task (tuple): (allocation name, weights, rule)
+
+    Returns:
+        dict: Allocation name, rule parameters and summary metrics
+    """
+    name, weights, rule = task
+    result = backtest_allocation(_worker_prices, weights, **rule)
+    summary = {key: result[key] for key in ('total_return', 'annualized_return', 'volatility',
+                                            'sharpe_ratio', 'max_drawdown')}
+    return {'allocation': name, **rule, 'start': result['value'].index[0], 'end': result['value'].index[-1],
+            'rebalances': len(result['rebalance_dates']), 'turnover': result['turnover'].sum(), **summary}
+
+def backtest_grid(prices, allocations, rules, max_workers=None):
+    """
+    Backtest every allocation under every rebalancing rule.
+
+    Tasks are spread over a process pool whose workers receive the price panel
+    once, at start-up, rather than with every task. Every allocation is
+    backtested over the common history of all tickers, reported in the
+    'start' and 'end' columns.
+
+    Args:
+        prices (pandas.DataFrame): Prices with one column per ticker
+        allocations (dict): Mapping of allocation name to a dict of ticker weights
+        rules (list): Keyword arguments of backtest_allocation for each rule, e.g.
+                      {'frequency': 'Q', 'threshold': 0.05, 'cost': 0.001}
+        max_workers (int): Number of processes, 1 to run in this process
+
+    Returns:
+        pandas.DataFrame: One row per allocation and rule with its backtested
+                          period and summary metrics
+    """
+    # Every allocation is backtested over the common history of its tickers
+    tickers = sorted({ticker for weights in allocations.values() for ticker in weights})
+    prices = prices[tickers].dropna()
+    tasks = [(name, weights, rule) for (name, weights), rule in product(allocations.items(), rules)]
+
+    if max_workers == 1:
+        _init_worker(prices)
+        rows = [_run_task(task) for task in tasks]
+    else:
+        max_workers = max_workers or os.cpu_count()
+        chunksize = max(1, len(tasks) // (4 * max_workers))
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(prices,)) as executor:
+            rows = list(executor.map(_run_task, tasks, chunksize=chunksize))
+
+    return pd.DataFrame(rows)
+
+def rebalancing_rules(frequencies=('M', 'Q', 'Y', None), thresholds=(None, 0.02, 0.05, 0.1),
+                      costs=(DEFAULT_COST,)):
+    """
+    Build a grid of rebalancing rules.
+
+    Args:
+        frequencies (list): Calendar periods to check at (None for every bar)
+        thresholds (list): Drift thresholds (None to always rebalance at the checks)
+        costs (list): Transaction costs
+
+    Returns:
+        list: Rules for backtest_grid
+    """
+    return [
+        {'frequency': frequency, 'threshold': threshold, 'cost': cost}
+        for frequency, threshold, cost in product(frequencies, thresholds, costs)
+    ]
+
+def splice_fallbacks(prices, fallbacks):
+    """
+    Extend prices back before each ticker's first bar with the returns of a stand-in.
+
+    Before its first price, a ticker follows its stand-in's price scaled to
+    meet the ticker's first price, so its returns there are the stand-in's.
+
+    Args:
+        prices (pandas.DataFrame): Prices with columns for the tickers and their stand-ins
+        fallbacks (dict): Mapping of ticker to the ticker of its stand-in
+
+    Returns:
+        pandas.DataFrame: Copy of prices with the tickers' histories extended
+    """
+    prices = prices.copy()
+    for ticker, fallback in fallbacks.items():
+        if ticker not in prices or fallback not in prices:
+            continue
+        launch = prices[ticker].first_valid_index()
+        if launch is None or pd.isna(prices.at[launch, fallback]):
+            continue
+        before = prices.index < launch
+        prices.loc[before, ticker] = prices.loc[before, fallback] * (prices.at[launch, ticker]
+                                                                     / prices.at[launch, fallback])
+    return prices
+
+def backtest_profiles(rules=None, days=365 * 20, provider=None, max_workers=None):
+    """
+    Backtest the allocation of every risk profile against the proxy ETFs' history.
+
+    Proxies launched after the start of the history are extended with the
+    returns of their FALLBACK_TICKERS, so the backtest covers all the days
+    requested where the stand-ins have prices.
+
+    Args:
+        rules (list): Rebalancing rules, defaults to rebalancing_rules()
+        days (int): Number of days of history
+        provider (MarketDataProvider or str): Price source, defaults to data_providers.get_provider()
+        max_workers (int): Number of processes, 1 to run in this process
+
+    Returns:
+        pandas.DataFrame: One row per profile and rule with its summary metrics,
+                          or None if the prices could not be fetched
+    """
+    allocations = {
+        profile: {EXAMPLE_TICKERS[asset]: weight for asset, weight in allocation.items() if weight}
+        for profile, allocation in ALLOCATION_MAPS.items()
+    }
+    tickers = sorted({ticker for weights in allocations.values() for ticker in weights})
+    fallbacks = {EXAMPLE_TICKERS[asset]: ticker for asset, ticker in FALLBACK_TICKERS.items()}
+
+    market_data = get_market_data(tickers + sorted(set(fallbacks.values())), days, provider)
+    if market_data is None or any(ticker in market_data['failures'] for ticker in tickers):
+        return None
+    prices = splice_fallbacks(market_data['prices'], fallbacks)
+    return backtest_grid(prices, allocations, rules or rebalancing_rules(), max_workers)
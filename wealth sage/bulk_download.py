@@ -0,0 +1,151 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+# Defaults for bulk downloads; requests for more tickers than DEFAULT_CHUNK_SIZE
+# are split into chunks by financial_data automatically
+DEFAULT_CHUNK_SIZE = 50
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RATE_LIMIT = 2.0
+DEFAULT_RETRIES = 3
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls at most `rate` per second apart.
+    """
+
+    def __init__(self, rate):
+        """
+        Args:
+            rate (float): Maximum number of calls per second, None or 0 for no limit
+        """
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """
+        Block until the caller is allowed to make its next call.
+        """
+        if not self.interval:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+def missing_tickers(prices, tickers, start, end):
+    """
+    Find the requested tickers a download returned no data for.
+
+    A range without any business day (e.g. a weekend) has no bars for any
+    ticker, so nothing is reported for it.
+
+    Args:
+        prices (pandas.DataFrame): Prices returned by a provider
+        tickers (list): Requested ticker symbols
+        start (datetime): First date requested
+        end (datetime): End date (exclusive)
+
+    Returns:
+        dict: "No data returned" for every requested ticker without a price
+    """
+    if len(pd.bdate_range(pd.Timestamp(start).normalize(), end, inclusive='left')) == 0:
+        return {}
+    return {
+        ticker: "No data returned"
+        for ticker in tickers
+        if ticker not in prices or prices[ticker].isna().all()
+    }
+
+def _fetch_chunk(provider, chunk, start, end, interval, limiter, retries, backoff):
+    """
+    Fetch one chunk of tickers, retrying with exponential backoff.
+
+    Args:
+        provider (MarketDataProvider): Source of the prices
+        chunk (list): Ticker symbols to fetch together
+        start (datetime): First date to fetch
+        end (datetime): End date (exclusive)
+        interval (str): Bar interval
+        limiter (RateLimiter): Shared rate limiter
+        retries (int): Number of retries after the first attempt
+        backoff (float): Delay before the first retry in seconds
+
+    Returns:
+        tuple: (prices, error) where exactly one of the two is None
+    """
+    error = None
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            time.sleep(backoff * 2 ** (attempt - 1))
+        limiter.wait()
+        try:
+            return provider.download(chunk, start, end, interval), None
+        except Exception as e:
+            error = e
+    return None, error
+
+def bulk_download(tickers, start, end, provider, interval='1d', chunk_size=DEFAULT_CHUNK_SIZE,
+                  max_workers=DEFAULT_MAX_WORKERS, rate_limit=DEFAULT_RATE_LIMIT,
+                  retries=DEFAULT_RETRIES, backoff=1.0):
+    """
+    Download prices for a large ticker universe in concurrent chunks.
+
+    The universe is split into chunks that are fetched on a thread pool, with
+    all workers sharing one rate limiter. A chunk that keeps failing after its
+    retries only costs its own tickers: everything that was fetched is still
+    assembled into a single panel aligned on the union of dates.
+
+    Args:
+        tickers (list): List of ticker symbols
+        start (datetime): First date to fetch
+        end (datetime): End date (exclusive)
+        provider (MarketDataProvider): Source of the prices
+        interval (str): Bar interval
+        chunk_size (int): Number of tickers per request
+        max_workers (int): Number of concurrent requests
+        rate_limit (float): Maximum requests per second across all workers
+        retries (int): Number of retries per chunk after the first attempt
+        backoff (float): Delay before the first retry in seconds, doubled each retry
+
+    Returns:
+        dict: 'prices' (pandas.DataFrame with one column per fetched ticker) and
+              'failures' (dict mapping each missing ticker to an error message)
+    """
+    tickers = list(dict.fromkeys(tickers))
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    limiter = RateLimiter(rate_limit)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_fetch_chunk, provider, chunk, start, end, interval, limiter, retries, backoff)
+            for chunk in chunks
+        ]
+        results = [future.result() for future in futures]
+
+    frames = []
+    failures = {}
+    for chunk, (prices, error) in zip(chunks, results):
+        if error is not None:
+            for ticker in chunk:
+                failures[ticker] = str(error)
+            continue
+
+        failures.update(missing_tickers(prices, chunk, start, end))
+        fetched = [ticker for ticker in chunk if ticker not in failures]
+        if fetched and len(prices.index):
+            frames.append(prices[fetched])
+
+    fetched = [ticker for ticker in tickers if ticker not in failures]
+    if frames:
+        prices = pd.concat(frames, axis=1).sort_index().reindex(columns=fetched)
+    else:
+        prices = pd.DataFrame(index=pd.DatetimeIndex([]), columns=fetched, dtype=float)
+
+    return {'prices': prices, 'failures': failures}
@@ -0,0 +1,173 @@
+import pandas as pd
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+class CorrelationEngine:
+    """
+    Blockwise correlation of returns for large ticker universes.
+
+    Columns are centered (and, without missing values, standardized) once up
+    front; correlations are then produced one (block_size x block_size) tile at
+    a time with matrix products. Missing values are handled with 0/1 masks,
+    giving the same pairwise-complete result as pandas' DataFrame.corr(). The
+    query methods work tile by tile, so the full n x n matrix is never held in
+    memory unless matrix() is called explicitly.
+    """
+
+    def __init__(self, returns, dtype=np.float32, block_size=512):
+        """
+        Args:
+            returns (pandas.DataFrame): Returns indexed by date with one column per ticker
+            dtype (numpy.dtype): Precision of the computation (float32 halves memory)
+            block_size (int): Number of tickers per tile
+        """
+        self.tickers = list(returns.columns)
+        self.ticker_index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.dtype = np.dtype(dtype)
+        self.block_size = block_size
+
+        values = returns.to_numpy(dtype=np.float64)
+        mask = ~np.isnan(values)
+        self.complete = bool(mask.all())
+
+        # Center in float64 before casting, so float32 tiles do not lose the
+        # signal to cancellation
+        with np.errstate(invalid='ignore'):
+            centered = values - np.nanmean(values, axis=0)
+        centered[~mask] = 0.0
+
+        if self.complete:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scale = np.sqrt((centered ** 2).sum(axis=0))
+                self.standardized = (centered / scale).astype(self.dtype)
+        else:
+            self.centered = centered.astype(self.dtype)
+            self.squared = (centered ** 2).astype(self.dtype)
+            self.mask = mask.astype(self.dtype)
+
+    def _blocks(self):
+        """
+        Split the ticker positions into tiles.
+
+        Returns:
+            list: List of slices, one per tile
+        """
+        n = len(self.tickers)
+        return [slice(i, min(i + self.block_size, n)) for i in range(0, n, self.block_size)]
+
+    def block(self, rows, columns):
+        """
+        Compute the correlations between two groups of tickers.
+
+        Args:
+            rows (slice or numpy.ndarray): Ticker positions of the tile rows
+            columns (slice or numpy.ndarray): Ticker positions of the tile columns
+
+        Returns:
+            numpy.ndarray: Correlation tile (NaN where it is undefined)
+        """
+        if self.complete:
+            tile = self.standardized[:, rows].T @ self.standardized[:, columns]
+            return np.clip(tile, -1.0, 1.0)
+
+        x, x_sq, x_mask = self.centered[:, rows], self.squared[:, rows], self.mask[:, rows]
+        y, y_sq, y_mask = self.centered[:, columns], self.squared[:, columns], self.mask[:, columns]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n = x_mask.T @ y_mask
+            n[n < 2] = np.nan
+            sum_x = x.T @ y_mask
+            sum_y = x_mask.T @ y
+            covariance = x.T @ y - sum_x * sum_y / n
+            variance_x = x_sq.T @ y_mask - sum_x ** 2 / n
+            variance_y = x_mask.T @ y_sq - sum_y ** 2 / n
+            tile = covariance / np.sqrt(variance_x * variance_y)
+        return np.clip(tile, -1.0, 1.0)
+
+    def matrix(self):
+        """
+        Assemble the full correlation matrix tile by tile.
+
+        Returns:
+            pandas.DataFrame: Correlation matrix
+        """
+        n = len(self.tickers)
+        result = np.empty((n, n), dtype=self.dtype)
+        blocks = self._blocks()
+        for i, rows in enumerate(blocks):
+            for columns in blocks[i:]:
+                tile = self.block(rows, columns)
+                result[rows, columns] = tile
+                result[columns, rows] = tile.T
+        diagonal = np.arange(n)
+        result[diagonal, diagonal] = np.where(np.isnan(result[diagonal, diagonal]), np.nan, 1.0)
+        return pd.DataFrame(result, index=self.tickers, columns=self.tickers)
+
+    def correlations_with(self, ticker):
+        """
+        Compute the correlations of one ticker with every other ticker.
+
+        Args:
+            ticker (str): Ticker symbol
+
+        Returns:
+            pandas.Series: Correlation with each other ticker
+        """
+        position = self.ticker_index[ticker]
+        row = np.concatenate([
+            self.block(slice(position, position + 1), columns)[0]
+            for columns in self._blocks()
+        ])
+        return pd.Series(row, index=self.tickers).drop(ticker)
+
+    def top_k(self, ticker, k=10, largest=True):
+        """
+        Find the tickers most (or least) correlated with a ticker.
+
+        Args:
+            ticker (str): Ticker symbol
+            k (int): Number of tickers to return
+            largest (bool): True for the most correlated, False for the least
+
+        Returns:
+            pandas.Series: The k correlations, strongest first
+        """
+        row = self.correlations_with(ticker).dropna()
+        return row.nlargest(k) if largest else row.nsmallest(k)
+
+    def clusters(self, threshold):
+        """
+        Group tickers connected by correlations at or above a threshold.
+
+        Two tickers end up in the same cluster when a chain of pairs with
+        correlation >= threshold links them. Only the qualifying pairs of each
+        tile are kept, never the tile itself.
+
+        Args:
+            threshold (float): Minimum correlation for two tickers to be linked
+
+        Returns:
+            list: Clusters with more than one ticker, largest first, each a list of tickers
+        """
+        n = len(self.tickers)
+        sources, targets = [], []
+        blocks = self._blocks()
+        for i, rows in enumerate(blocks):
+            for columns in blocks[i:]:
+                tile_rows, tile_columns = np.nonzero(self.block(rows, columns) >= threshold)
+                sources.append(tile_rows + rows.start)
+                targets.append(tile_columns + columns.start)
+
+        sources = np.concatenate(sources)
+        targets = np.concatenate(targets)
+        graph = coo_matrix((np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+
+        order = np.argsort(labels, kind='stable')
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        groups = [
+            [self.tickers[position] for position in group]
+            for group in np.split(order, boundaries) if len(group) > 1
+        ]
+        return sorted(groups, key=len, reverse=True)
@@ -0,0 +1,315 @@
+import os
+import zlib
+import pandas as pd
+import numpy as np
+import yfinance as yf
+from intervals import INTERVAL_SECONDS, bars_per_day
+from price_panel import PANEL_DIR, open_panel
+
+class MarketDataProvider:
+    """
+    Base class for sources of historical prices used by financial_data.
+
+    Subclasses implement download(), which returns adjusted closing prices as a
+    DataFrame indexed by date with one column per ticker. Tickers the provider
+    has no data for are simply left out of the result.
+    """
+    # Short name used to select the provider and to namespace its disk cache
+    name = 'base'
+    # Whether results should go through the on-disk price cache
+    cacheable = False
+
+    def cache_key(self):
+        """
+        Identify the data this provider serves for the in-process panel cache.
+
+        Two providers with the same key must return the same prices. The default
+        is specific to the instance; providers whose data is fully determined by
+        their settings override it so that separate instances share entries.
+
+        Returns:
+            hashable: Key of the provider's data
+        """
+        return (self.name, id(self))
+
+    def download(self, tickers, start, end, interval='1d'):
+        """
+        Return adjusted closing prices for the given tickers.
+
+        Args:
+            tickers (list): List of ticker symbols
+            start (datetime): First date to return
+            end (datetime): End date (exclusive)
+            interval (str): Bar interval, one of intervals.INTERVAL_SECONDS
+
+        Returns:
+            pandas.DataFrame: Prices indexed by date (naive UTC timestamps for
+                              intraday bars) with one column per ticker
+        """
+        raise NotImplementedError
+
+class YahooFinanceProvider(MarketDataProvider):
+    """
+    Live prices downloaded from Yahoo Finance.
+    """
+    name = 'yahoo'
+    cacheable = True
+
+    def cache_key(self):
+        return self.name
+
+    def download(self, tickers, start, end, interval='1d'):
+        data = yf.download(
+            tickers,
+            start=pd.Timestamp(start).strftime('%Y-%m-%d'),
+            end=pd.Timestamp(end).strftime('%Y-%m-%d'),
+            interval=interval,
+            auto_adjust=False,
+            progress=False
+        )
+
+        if data.empty:
+            return pd.DataFrame()
+
+        prices = data['Adj Close']
+        if isinstance(prices, pd.Series):
+            prices = prices.to_frame(tickers[0])
+        if prices.index.tz is not None:
+            prices.index = prices.index.tz_convert('UTC').tz_localize(None)
+        return prices
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Deterministic offline prices generated as geometric Brownian motion.
+
+    Every ticker gets its own random stream derived from the seed and the ticker
+    symbol, and its path always starts at base_date. A ticker therefore has the
+    same price on a given date regardless of the window or the other tickers
+    requested, which makes the output usable as a stand-in for real data in
+    benchmarks and load tests.
+    """
+    name = 'synthetic'
+
+    def __init__(self, seed=42, base_date='2000-01-03', initial_price=100.0,
+                 drift_range=(0.0, 0.15), volatility_range=(0.10, 0.45)):
+        """
+        Args:
+            seed (int): Seed shared by all tickers
+            base_date (str): Date on which every path starts
+            initial_price (float): Price of every ticker on base_date
+            drift_range (tuple): Range of annual drifts assigned to tickers
+            volatility_range (tuple): Range of annual volatilities assigned to tickers
+        """
+        self.seed = seed
+        self.base_date = pd.Timestamp(base_date)
+        self.initial_price = initial_price
+        self.drift_range = drift_range
+        self.volatility_range = volatility_range
+
+    def cache_key(self):
+        return (self.name, self.seed, self.base_date, self.initial_price,
+                tuple(self.drift_range), tuple(self.volatility_range))
+
+    def _daily_log_prices(self, tickers, end):
+        """
+        Generate the daily log price paths of the tickers from base_date.
+
+        Args:
+            tickers (list): List of ticker symbols
+            end (datetime): End date (exclusive)
+
+        Returns:
+            tuple: (dates, log_prices, daily_vol) where log_prices has one row per
+                   ticker and daily_vol is the per-ticker daily volatility column
+        """
+        dates = pd.bdate_range(self.base_date, end, inclusive='left')
+
+        # Draw each ticker's shocks from its own stream, then scale, accumulate
+        # and exponentiate the whole (tickers x dates) block at once
+        shocks = np.empty((len(tickers), len(dates)))
+        drift = np.empty(len(tickers))
+        volatility = np.empty(len(tickers))
+        for i, ticker in enumerate(tickers):
+            rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+            drift[i] = rng.uniform(*self.drift_range)
+            volatility[i] = rng.uniform(*self.volatility_range)
+            rng.standard_normal(out=shocks[i])
+
+        daily_vol = (volatility / np.sqrt(252))[:, None]
+        daily_drift = drift[:, None] / 252 - 0.5 * daily_vol ** 2
+        shocks *= daily_vol
+        shocks += daily_drift
+        if len(dates) > 0:
+            shocks[:, 0] = np.log(self.initial_price)
+        np.cumsum(shocks, axis=1, out=shocks)
+        return dates, shocks, daily_vol
+
+    def _intraday_log_prices(self, tickers, days, previous_close, close, daily_vol, interval):
+        """
+        Fill in intraday bars between consecutive daily closes.
+
+        Each day is a Brownian bridge from the previous close to the day's close,
+        so resampling the bars back to daily reproduces the daily prices exactly.
+        Shocks come from one stream per ticker and calendar month, which keeps a
+        bar's price independent of the requested window.
+
+        Args:
+            tickers (list): List of ticker symbols
+            days (pandas.DatetimeIndex): Trading days to generate
+            previous_close (numpy.ndarray): Log close before each day, (tickers, days)
+            close (numpy.ndarray): Log close of each day, (tickers, days)
+            daily_vol (numpy.ndarray): Daily volatility per ticker, (tickers, 1)
+            interval (str): Bar interval, one of intervals.INTERVAL_SECONDS
+
+        Returns:
+            numpy.ndarray: Log prices with shape (tickers, days, bars per day)
+        """
+        k = bars_per_day(interval)
+        months = days.year * 12 + days.month - 1
+        shocks = np.empty((len(tickers), len(days), k))
+
+        for month in np.unique(months):
+            rows = np.flatnonzero(months == month)
+            month_start = pd.Timestamp(year=month // 12, month=month % 12 + 1, day=1)
+            month_days = pd.bdate_range(month_start, month_start + pd.offsets.MonthEnd(0))
+            positions = month_days.searchsorted(days[rows])
+            for i, ticker in enumerate(tickers):
+                rng = np.random.default_rng(
+                    [self.seed, zlib.crc32(ticker.encode()), INTERVAL_SECONDS[interval], month]
+                )
+                shocks[i, rows] = rng.standard_normal((len(month_days), k))[positions]
+
+        fraction = np.arange(1, k + 1) / k
+        bridge = np.cumsum(shocks, axis=2)
+        bridge -= fraction * bridge[:, :, -1:]
+        bridge *= (daily_vol / np.sqrt(k))[:, :, None]
+        return previous_close[:, :, None] + fraction * (close - previous_close)[:, :, None] + bridge
+
+    def download(self, tickers, start, end, interval='1d'):
+        start = max(pd.Timestamp(start), self.base_date)
+        dates, log_prices, daily_vol = self._daily_log_prices(tickers, end)
+        first = dates.searchsorted(start)
+        if first >= len(dates):
+            return pd.DataFrame(columns=list(tickers), dtype=float)
+
+        if interval == '1d':
+            prices = np.exp(log_prices[:, first:]).T
+            return pd.DataFrame(prices, index=dates[first:], columns=list(tickers))
+
+        days = dates[first:]
+        previous_close = np.concatenate([log_prices[:, :1], log_prices[:, :-1]], axis=1)[:, first:]
+        bars = self._intraday_log_prices(
+            tickers, days, previous_close, log_prices[:, first:], daily_vol, interval
+        )
+
+        # Bars are labelled by their start time within a 14:30-21:00 UTC session
+        k = bars.shape[2]
+        offsets = pd.to_timedelta(14.5 * 3600 + np.arange(k) * INTERVAL_SECONDS[interval], unit='s')
+        index = pd.DatetimeIndex((days.values[:, None] + offsets.values[None, :]).ravel())
+        prices = np.exp(bars.reshape(len(tickers), -1)).T
+        return pd.DataFrame(prices, index=index, columns=list(tickers))
+
+class FixtureProvider(MarketDataProvider):
+    """
+    Replays a previously recorded price panel.
+    """
+    name = 'fixture'
+
+    def __init__(self, prices):
+        """
+        Args:
+            prices (pandas.DataFrame or str): Price panel indexed by date, or the
+                                              path of a Parquet or CSV file holding one
+        """
+        if isinstance(prices, str):
+            if prices.endswith('.csv'):
+                prices = pd.read_csv(prices, index_col=0, parse_dates=True)
+            else:
+                prices = pd.read_parquet(prices)
+        self.prices = prices.sort_index()
+
+    def download(self, tickers, start, end, interval='1d'):
+        # Bars are replayed as recorded, whatever their interval
+        columns = [ticker for ticker in tickers if ticker in self.prices.columns]
+        index = self.prices.index
+        rows = (index >= pd.Timestamp(start)) & (index < pd.Timestamp(end))
+        return self.prices.loc[rows, columns]
+
+class PanelProvider(MarketDataProvider):
+    """
+    Serves prices from a shared memory-mapped PricePanel.
+
+    Returned DataFrames wrap views of the panel, so many sessions reading the
+    same universe share one physical copy of the prices.
+    """
+    name = 'panel'
+
+    def __init__(self, path=PANEL_DIR):
+        """
+        Args:
+            path (str): Directory holding the panel (see price_panel.PricePanel.write)
+        """
+        self.path = path
+
+    def cache_key(self):
+        return (self.name, os.path.abspath(self.path))
+
+    def download(self, tickers, start, end, interval='1d'):
+        # Bars are served as stored in the panel, whatever their interval
+        panel = open_panel(self.path)
+        columns = [ticker for ticker in tickers if ticker in panel.ticker_index]
+        return panel.frame(columns, start, end)
+
+def synthetic_tickers(n_tickers):
+    """
+    Generate placeholder ticker symbols for large synthetic universes.
+
+    Args:
+        n_tickers (int): Number of symbols to generate
+
+    Returns:
+        list: Symbols SYN0000, SYN0001, ...
+    """
+    width = max(4, len(str(n_tickers - 1)))
+    return [f"SYN{i:0{width}d}" for i in range(n_tickers)]
+
+# Providers selectable by name
+PROVIDERS = {
+    'yahoo': YahooFinanceProvider,
+    'synthetic': SyntheticProvider,
+    'panel': PanelProvider
+}
+
+_default_provider = None
+
+def set_default_provider(provider):
+    """
+    Set the provider used when financial_data functions are called without one.
+
+    Args:
+        provider (MarketDataProvider or str): Provider instance or name, or None to
+                                              fall back to the environment setting
+    """
+    global _default_provider
+    _default_provider = PROVIDERS[provider]() if isinstance(provider, str) else provider
+
+def get_provider(provider=None):
+    """
+    Resolve a provider argument to a provider instance.
+
+    Without an explicit provider, the one set via set_default_provider() is used,
+    then the WEALTH_SAGE_DATA_PROVIDER environment variable, then Yahoo Finance.
+
+    Args:
+        provider (MarketDataProvider or str): Provider instance, name, or None
+
+    Returns:
+        MarketDataProvider: Provider instance
+    """
+    if isinstance(provider, MarketDataProvider):
+        return provider
+    if provider is None:
+        if _default_provider is not None:
+            return _default_provider
+        provider = os.environ.get('WEALTH_SAGE_DATA_PROVIDER', 'yahoo')
+    return PROVIDERS[provider]()
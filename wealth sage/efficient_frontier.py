@@ -0,0 +1,239 @@
+import pandas as pd
+import numpy as np
+from portfolio_optimizer import (
+    EXPECTED_RETURNS, RISK_FREE_RATE, evaluate_portfolios, get_asset_model,
+    get_optimized_portfolio, portfolio_result
+)
+
+# Tolerance of the active-set solver on steps and multipliers
+TOLERANCE = 1e-12
+
+def solve_frontier_point(expected_returns, cov_matrix, risk_tolerance, weights=None):
+    """
+    Solve one long-only mean-variance problem exactly.
+
+    Minimizes 1/2 w'Σw - t μ'w subject to sum(w) = 1 and w >= 0 with a primal
+    active-set method: every iteration solves the equality-constrained problem
+    over the assets that are not pinned at zero, then either steps towards its
+    solution until a weight hits zero or releases the pinned asset with the
+    most negative multiplier. Started from the solution of a nearby risk
+    tolerance, it usually finishes in one or two iterations.
+
+    Args:
+        expected_returns (numpy.ndarray): Expected return of each asset (μ)
+        cov_matrix (numpy.ndarray): Covariance matrix of the assets (Σ)
+        risk_tolerance (float): Weight t of the expected return against the variance
+        weights (numpy.ndarray): Feasible starting weights, equal weights by default
+
+    Returns:
+        numpy.ndarray: Optimal weights
+    """
+    num_assets = len(expected_returns)
+    if weights is None:
+        weights = np.full(num_assets, 1.0 / num_assets)
+    else:
+        weights = np.array(weights, dtype=float)
+    free = weights > 0
+
+    for _ in range(10 * num_assets + 10):
+        gradient = cov_matrix @ weights - risk_tolerance * expected_returns
+        assets = np.flatnonzero(free)
+        size = len(assets)
+
+        # KKT system of the problem restricted to the free assets:
+        # Σ_FF p + λ 1 = -g_F, 1'p = 0
+        kkt = np.zeros((size + 1, size + 1))
+        kkt[:size, :size] = cov_matrix[np.ix_(assets, assets)]
+        kkt[:size, size] = 1.0
+        kkt[size, :size] = 1.0
+        rhs = np.append(-gradient[assets], 0.0)
+        try:
+            solution = np.linalg.solve(kkt, rhs)
+        except np.linalg.LinAlgError:
+            solution = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+        step, multiplier = solution[:size], solution[size]
+
+        if np.abs(step).max() <= TOLERANCE:
+            # Optimal on the free assets; check the multipliers of the pinned ones
+            pinned = np.flatnonzero(~free)
+            if len(pinned) == 0:
+                return weights
+            bound_multipliers = gradient[pinned] + multiplier
+            release = np.argmin(bound_multipliers)
+            if bound_multipliers[release] >= -TOLERANCE:
+                return weights
+            free[pinned[release]] = True
+            continue
+
+        # Step as far as possible without any weight turning negative
+        decreasing = step < 0
+        ratios = -weights[assets][decreasing] / step[decreasing]
+        if len(ratios) and ratios.min() < 1.0:
+            blocking = np.argmin(ratios)
+            weights[assets] += ratios[blocking] * step
+            blocked = assets[decreasing][blocking]
+            weights[blocked] = 0.0
+            free[blocked] = False
+        else:
+            weights[assets] += step
+
+    return weights
+
+def _frontier_inputs(expected_returns, cov_matrix):
+    """
+    Resolve the asset assumptions of the frontier.
+
+    Args:
+        expected_returns (dict): Expected return per asset, defaults to EXPECTED_RETURNS
+        cov_matrix (numpy.ndarray): Covariance matrix in the same order, defaults to
+                                    the covariance built by portfolio_optimizer
+
+    Returns:
+        tuple: (asset names, expected returns array, covariance matrix)
+    """
+    if expected_returns is None:
+        expected_returns = EXPECTED_RETURNS
+    if cov_matrix is None:
+        cov_matrix = get_asset_model()['cov_matrix']
+    assets = list(expected_returns)
+    return assets, np.array([expected_returns[asset] for asset in assets]), np.asarray(cov_matrix, dtype=float)
+
+def _max_risk_tolerance(expected_returns, cov_matrix):
+    """
+    Find the smallest risk tolerance at which the frontier reaches its maximum return.
+
+    The risk tolerance is doubled until the solution reaches the highest
+    expected return, then narrowed down by bisection, so frontier points are
+    not wasted beyond the end of the frontier.
+
+    Args:
+        expected_returns (numpy.ndarray): Expected return of each asset
+        cov_matrix (numpy.ndarray): Covariance matrix of the assets
+
+    Returns:
+        float: Risk tolerance of the highest-return frontier portfolio
+    """
+    best = expected_returns.max()
+    spread = best - expected_returns.min()
+
+    def reaches_max(risk_tolerance, weights):
+        weights = solve_frontier_point(expected_returns, cov_matrix, risk_tolerance, weights)
+        return weights @ expected_returns >= best - TOLERANCE, weights
+
+    low, high = 0.0, np.diag(cov_matrix).max() / spread if spread > 0 else 1.0
+    weights = None
+    for _ in range(60):
+        done, weights = reaches_max(high, weights)
+        if done:
+            break
+        low, high = high, high * 2
+
+    for _ in range(40):
+        middle = (low + high) / 2
+        done, candidate = reaches_max(middle, weights)
+        if done:
+            high = middle
+        else:
+            low = middle
+    return high
+
+def efficient_frontier(num_points=100, expected_returns=None, cov_matrix=None):
+    """
+    Trace the long-only efficient frontier exactly.
+
+    Frontier points are solved for evenly spaced risk tolerances, from the
+    minimum-variance portfolio to the highest-return one, each warm-started
+    from the previous solution.
+
+    Args:
+        num_points (int): Number of frontier points
+        expected_returns (dict): Expected return per asset, defaults to EXPECTED_RETURNS
+        cov_matrix (numpy.ndarray): Covariance matrix in the same order, defaults to
+                                    the covariance built by portfolio_optimizer
+
+    Returns:
+        pandas.DataFrame: One row per frontier point with its expected return,
+                          volatility, Sharpe ratio, risk tolerance and asset weights
+    """
+    assets, expected_returns, cov_matrix = _frontier_inputs(expected_returns, cov_matrix)
+    risk_tolerances = np.linspace(0.0, _max_risk_tolerance(expected_returns, cov_matrix), num_points)
+
+    frontier_weights = np.empty((num_points, len(assets)))
+    weights = None
+    for i, risk_tolerance in enumerate(risk_tolerances):
+        weights = solve_frontier_point(expected_returns, cov_matrix, risk_tolerance, weights)
+        frontier_weights[i] = weights
+
+    portfolio_returns = frontier_weights @ expected_returns
+    volatility = np.sqrt(np.einsum('ij,ij->i', frontier_weights @ cov_matrix, frontier_weights))
+
+    frontier = pd.DataFrame(frontier_weights, columns=assets)
+    frontier.insert(0, 'risk_tolerance', risk_tolerances)
+    frontier.insert(0, 'sharpe_ratio', (portfolio_returns - RISK_FREE_RATE) / volatility)
+    frontier.insert(0, 'expected_volatility', volatility)
+    frontier.insert(0, 'expected_return', portfolio_returns)
+    return frontier
+
+def frontier_portfolio(target_volatility, expected_returns=None, cov_matrix=None):
+    """
+    Find the frontier portfolio with the highest return for a volatility budget.
+
+    Volatility grows monotonically with the risk tolerance along the frontier,
+    so the risk tolerance is found by bisection, warm-starting every solve from
+    the last feasible solution.
+
+    Args:
+        target_volatility (float): Maximum annual volatility
+        expected_returns (dict): Expected return per asset, defaults to EXPECTED_RETURNS
+        cov_matrix (numpy.ndarray): Covariance matrix in the same order, defaults to
+                                    the covariance built by portfolio_optimizer
+
+    Returns:
+        dict: Weight of each asset, in the order of expected_returns
+    """
+    assets, expected_returns, cov_matrix = _frontier_inputs(expected_returns, cov_matrix)
+
+    def volatility_of(weights):
+        return np.sqrt(weights @ cov_matrix @ weights)
+
+    # Below the minimum-variance portfolio no portfolio meets the budget
+    low, high = 0.0, _max_risk_tolerance(expected_returns, cov_matrix)
+    weights = solve_frontier_point(expected_returns, cov_matrix, low)
+    if volatility_of(weights) < target_volatility:
+        upper = solve_frontier_point(expected_returns, cov_matrix, high, weights)
+        if volatility_of(upper) <= target_volatility:
+            weights = upper
+        else:
+            for _ in range(60):
+                middle = (low + high) / 2
+                candidate = solve_frontier_point(expected_returns, cov_matrix, middle, weights)
+                if volatility_of(candidate) <= target_volatility:
+                    low, weights = middle, candidate
+                else:
+                    high = middle
+
+    return dict(zip(assets, weights.tolist()))
+
+def get_frontier_allocation(risk_profile):
+    """
+    Derive the allocation of a risk profile as a point on the efficient frontier.
+
+    The profile's risk budget is the volatility of its reference allocation in
+    portfolio_optimizer, so the result is the highest-return long-only
+    portfolio that is no riskier than the reference one.
+
+    Args:
+        risk_profile (str): The user's risk profile
+
+    Returns:
+        dict: Portfolio allocation, expected returns, volatility, and more, as
+              returned by get_optimized_portfolio
+    """
+    reference = get_optimized_portfolio(risk_profile)
+    allocation = frontier_portfolio(reference['expected_volatility'])
+
+    metrics = evaluate_portfolios(pd.DataFrame([allocation])).iloc[0]
+
+    return portfolio_result(
+        risk_profile, allocation, metrics['expected_return'], metrics['expected_volatility']
+    )
@@ -0,0 +1,198 @@
+import pandas as pd
+import numpy as np
+from sklearn.utils.extmath import randomized_svd
+
+# Floor on specific variances, as a fraction of each asset's total variance
+MIN_SPECIFIC_SHARE = 0.05
+
+class FactorRiskModel:
+    """
+    Low-rank covariance Σ = B F B' + D for large asset universes.
+
+    B holds the n x k factor loadings, F the k x k factor covariance and D the
+    diagonal of specific variances. The dense n x n matrix is never formed:
+    portfolio variances go through the k factor exposures B'w, and systems in Σ
+    are solved with the Woodbury identity
+
+        Σ⁻¹ = D⁻¹ - D⁻¹B (F⁻¹ + B'D⁻¹B)⁻¹ B'D⁻¹
+
+    which only inverts a k x k matrix, so memory and time are O(n·k).
+    """
+
+    def __init__(self, loadings, factor_cov, specific_var, assets=None):
+        """
+        Args:
+            loadings (numpy.ndarray): Factor loadings B, n x k
+            factor_cov (numpy.ndarray): Factor covariance F, k x k
+            specific_var (numpy.ndarray): Specific variances, the diagonal of D
+            assets (list): Asset names, in the row order of the loadings
+        """
+        self.loadings = np.asarray(loadings, dtype=float)
+        self.factor_cov = np.asarray(factor_cov, dtype=float)
+        self.specific_var = np.asarray(specific_var, dtype=float)
+        self.assets = list(assets) if assets is not None else list(range(len(self.specific_var)))
+
+        # k x k core of the Woodbury identity, factored once
+        scaled = self.loadings / self.specific_var[:, None]
+        core = np.linalg.inv(self.factor_cov) + self.loadings.T @ scaled
+        self.core_cholesky = np.linalg.cholesky(core)
+
+    @classmethod
+    def from_returns(cls, returns, num_factors=10, periods_per_year=252):
+        """
+        Fit a statistical factor model with principal components.
+
+        The leading singular vectors of the centered returns span the factors;
+        with unit factor variances the loadings are the scaled right singular
+        vectors. What the factors do not explain becomes specific variance.
+        Missing returns are treated as the asset's mean return.
+
+        Args:
+            returns (pandas.DataFrame): Periodic returns with one column per asset
+            num_factors (int): Number of factors k
+            periods_per_year (int): Bars per year, used for annualization
+
+        Returns:
+            FactorRiskModel: Annualized factor model
+        """
+        values = returns.to_numpy(dtype=float)
+        centered = values - np.nanmean(values, axis=0)
+        centered[np.isnan(centered)] = 0.0
+
+        scale = periods_per_year / (len(values) - 1)
+        num_factors = min(num_factors, min(centered.shape) - 1)
+        _, singular_values, components = randomized_svd(centered, num_factors, random_state=0)
+        loadings = components.T * singular_values * np.sqrt(scale)
+
+        total_var = (centered ** 2).sum(axis=0) * scale
+        specific_var = np.maximum(total_var - (loadings ** 2).sum(axis=1), MIN_SPECIFIC_SHARE * total_var)
+        specific_var[specific_var <= 0] = np.finfo(float).tiny
+
+        return cls(loadings, np.eye(num_factors), specific_var, returns.columns)
+
+    def _weights(self, weights):
+        """
+        Convert weights to an array in asset order.
+
+        Args:
+            weights (numpy.ndarray, pandas.Series or pandas.DataFrame): One weight
+                vector, or one row per portfolio; pandas inputs are matched by asset name
+
+        Returns:
+            numpy.ndarray: Weights as a 1-d or 2-d array
+        """
+        if isinstance(weights, pd.DataFrame):
+            weights = weights.reindex(columns=self.assets, fill_value=0.0)
+        elif isinstance(weights, pd.Series):
+            weights = weights.reindex(self.assets, fill_value=0.0)
+        return np.asarray(weights, dtype=float)
+
+    def covariance_product(self, weights):
+        """
+        Multiply weights by the covariance matrix, Σw.
+
+        Args:
+            weights (numpy.ndarray): One weight vector, or one row per portfolio
+
+        Returns:
+            numpy.ndarray: Σw, shaped like weights
+        """
+        weights = self._weights(weights)
+        exposures = weights @ self.loadings
+        return exposures @ self.factor_cov @ self.loadings.T + weights * self.specific_var
+
+    def variance(self, weights):
+        """
+        Compute portfolio variances.
+
+        Args:
+            weights (numpy.ndarray): One weight vector, or one row per portfolio
+
+        Returns:
+            float or numpy.ndarray: Annualized variance of each portfolio
+        """
+        weights = self._weights(weights)
+        exposures = weights @ self.loadings
+        factor_var = ((exposures @ self.factor_cov) * exposures).sum(axis=-1)
+        return factor_var + (weights ** 2 * self.specific_var).sum(axis=-1)
+
+    def volatility(self, weights):
+        """
+        Compute portfolio volatilities.
+
+        Args:
+            weights (numpy.ndarray): One weight vector, or one row per portfolio
+
+        Returns:
+            float or numpy.ndarray: Annualized volatility of each portfolio
+        """
+        return np.sqrt(self.variance(weights))
+
+    def risk_contributions(self, weights):
+        """
+        Decompose a portfolio's volatility into per-asset contributions.
+
+        Args:
+            weights (numpy.ndarray or pandas.Series): Weight vector
+
+        Returns:
+            pandas.DataFrame: 'marginal' risk (∂σ/∂w = Σw / σ) and 'contribution'
+                              (w · ∂σ/∂w, summing to σ) of each asset
+        """
+        weights = self._weights(weights)
+        marginal = self.covariance_product(weights) / self.volatility(weights)
+        return pd.DataFrame({'marginal': marginal, 'contribution': weights * marginal}, index=self.assets)
+
+    def solve(self, vectors):
+        """
+        Solve Σx = b with the Woodbury identity.
+
+        Args:
+            vectors (numpy.ndarray): Right-hand side b, one vector or one column per system
+
+        Returns:
+            numpy.ndarray: Solution x, shaped like vectors
+        """
+        vectors = np.asarray(vectors, dtype=float)
+        inverse_specific = 1.0 / self.specific_var
+        if vectors.ndim == 2:
+            inverse_specific = inverse_specific[:, None]
+
+        scaled = vectors * inverse_specific
+        projected = self.loadings.T @ scaled
+        correction = np.linalg.solve(self.core_cholesky.T, np.linalg.solve(self.core_cholesky, projected))
+        return scaled - (self.loadings @ correction) * inverse_specific
+
+    def min_variance(self):
+        """
+        Compute the fully invested minimum-variance portfolio, w ∝ Σ⁻¹1.
+
+        Short positions are allowed.
+
+        Returns:
+            pandas.Series: Weight of each asset, summing to 1
+        """
+        direction = self.solve(np.ones(len(self.assets)))
+        return pd.Series(direction / direction.sum(), index=self.assets)
+
+    def optimize(self, expected_returns, risk_tolerance):
+        """
+        Solve the fully invested mean-variance problem in closed form.
+
+        Minimizes 1/2 w'Σw - t μ'w subject to sum(w) = 1, whose solution is
+        w = t Σ⁻¹μ + (1 - t 1'Σ⁻¹μ) / (1'Σ⁻¹1) · Σ⁻¹1. Both solves share one
+        Woodbury pass. Short positions are allowed.
+
+        Args:
+            expected_returns (numpy.ndarray or pandas.Series): Expected return of each asset
+            risk_tolerance (float): Weight t of the expected return against the variance
+
+        Returns:
+            pandas.Series: Weight of each asset, summing to 1
+        """
+        expected_returns = self._weights(expected_returns)
+        solved = self.solve(np.column_stack([expected_returns, np.ones(len(self.assets))]))
+        return_direction, variance_direction = solved[:, 0], solved[:, 1]
+        budget = (1 - risk_tolerance * return_direction.sum()) / variance_direction.sum()
+        weights = risk_tolerance * return_direction + budget * variance_direction
+        return pd.Series(weights, index=self.assets)
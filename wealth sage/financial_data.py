@@ -1,65 +1,204 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
+import os
+from collections.abc import Mapping
+from functools import cached_property
 from datetime import datetime, timedelta
+from bulk_download import DEFAULT_CHUNK_SIZE, bulk_download, missing_tickers
+from correlation_engine import CorrelationEngine
+from data_providers import get_provider
+from intervals import INTERVAL_SECONDS, compact_prices, periods_per_year, resample_prices
+from market_data_cache import DEFAULT_TTL, market_data_cache
+from price_cache import CACHE_DIR, get_cached_prices
+from price_panel import PANEL_DIR, PricePanel
 
-def get_market_data(tickers, days=365):
+def _fetch_prices(tickers, start_date, end_date, provider, bulk=None, failures=None, interval='1d'):
+    """
+    Fetch adjusted closing prices from a provider, going through the on-disk
+    cache for daily bars of providers that support it.
+    
+    Args:
+        tickers (list): List of ticker symbols
+        start_date (str): First date to fetch
+        end_date (str): End date (exclusive)
+        provider (MarketDataProvider): Source of the prices
+        bulk (bool): Fetch in concurrent chunks, by default only for large universes
+        failures (dict): Optional dict that receives an error message for every
+                         ticker that could not be fetched
+        interval (str): Bar interval, one of intervals.INTERVAL_SECONDS
+        
+    Returns:
+        pandas.DataFrame: Prices indexed by date with one column per ticker
+    """
+    if bulk is None:
+        bulk = len(tickers) > DEFAULT_CHUNK_SIZE
+    
+    def fetch(chunk, start, end):
+        if bulk:
+            return bulk_download(chunk, start, end, provider, interval)
+        # Report requested tickers without data, as bulk_download does
+        prices = provider.download(chunk, start, end, interval)
+        missing = missing_tickers(prices, chunk, start, end)
+        if missing:
+            prices = prices.drop(columns=[ticker for ticker in missing if ticker in prices])
+        return {'prices': prices, 'failures': missing}
+    
+    # Intraday bars of the current session are still changing, so only
+    # daily bars go through the on-disk cache
+    if provider.cacheable and interval == '1d':
+        cache_dir = os.path.join(CACHE_DIR, provider.name)
+        return get_cached_prices(tickers, start_date, end_date, fetch, cache_dir, failures)
+    
+    data = fetch(tickers, start_date, end_date)
+    if failures is not None:
+        failures.update(data['failures'])
+    prices = data['prices']
+    
+    # Only drop empty rows when there are any, so views returned by providers
+    # such as PanelProvider are passed through without a copy
+    empty_rows = prices.isna().all(axis=1)
+    return prices[~empty_rows] if empty_rows.any() else prices
+
+class MarketData(Mapping):
+    """
+    Market data for a set of tickers, with derived metrics computed on demand.
+    
+    Behaves like the dictionary get_market_data used to return ('prices',
+    'daily_returns', 'cumulative_returns', 'normalized', 'volatility', 'sharpe',
+    'correlation', 'returns', 'failures'), but each derived metric is only
+    computed the first time it is read and then kept. Callers that only need
+    normalized prices never pay for the correlation matrix.
+    
+    For intraday intervals 'daily_returns' holds per-bar returns, and volatility
+    and Sharpe ratio are annualized with the number of bars per year.
+    """
+    
+    FIELDS = (
+        'prices', 'daily_returns', 'cumulative_returns', 'normalized',
+        'volatility', 'sharpe', 'correlation', 'returns', 'failures'
+    )
+    
+    def __init__(self, prices, failures=None, interval='1d'):
+        """
+        Args:
+            prices (pandas.DataFrame): Adjusted closing prices with one column per ticker
+            failures (dict): Error message for each ticker that could not be fetched
+            interval (str): Bar interval of the prices, used for annualization
+        """
+        self.prices = prices
+        self.failures = failures or {}
+        self.interval = interval
+        self.periods_per_year = periods_per_year(interval)
+    
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self):
+        return iter(self.FIELDS)
+    
+    def __len__(self):
+        return len(self.FIELDS)
+    
+    def resample(self, interval):
+        """
+        Resample the prices to coarser bars.
+        
+        Args:
+            interval (str): Target interval, one of intervals.INTERVAL_SECONDS
+            
+        Returns:
+            MarketData: Market data of the resampled prices
+        """
+        return MarketData(resample_prices(self.prices, interval), self.failures, interval)
+    
+    @cached_property
+    def daily_returns(self):
+        """pandas.DataFrame: Returns per bar"""
+        return self.prices.pct_change().dropna()
+    
+    @cached_property
+    def cumulative_returns(self):
+        """pandas.DataFrame: Cumulative returns as fractions"""
+        return (1 + self.daily_returns).cumprod() - 1
+    
+    @cached_property
+    def returns(self):
+        """pandas.DataFrame: Cumulative returns in percent"""
+        return self.cumulative_returns * 100
+    
+    @cached_property
+    def normalized(self):
+        """pandas.DataFrame: Prices rebased to 100 at the first date"""
+        return self.prices / self.prices.iloc[0] * 100
+    
+    @cached_property
+    def volatility(self):
+        """pandas.Series: Annualized standard deviation of returns in percent"""
+        return self.daily_returns.std() * np.sqrt(self.periods_per_year) * 100
+    
+    @cached_property
+    def sharpe(self):
+        """pandas.Series: Sharpe ratio (assuming risk-free rate of 0% for simplicity)"""
+        return (self.daily_returns.mean() * self.periods_per_year) / (self.daily_returns.std() * np.sqrt(self.periods_per_year))
+    
+    @cached_property
+    def correlation(self):
+        """pandas.DataFrame: Correlation matrix of returns (blockwise, see correlation_engine)"""
+        return CorrelationEngine(self.daily_returns, dtype=np.float64).matrix()
+
+def get_market_data(tickers, days=365, provider=None, bulk=None, interval='1d'):
     """
     Fetch historical market data for the specified tickers over the specified period.
     
     Args:
         tickers (list): List of ticker symbols
         days (int): Number of days to look back
+        provider (MarketDataProvider or str): Price source, defaults to data_providers.get_provider()
+        bulk (bool): Fetch in concurrent chunks, by default only for large universes
+        interval (str): Bar interval ('1d', or intraday such as '1m', '5m', '1h');
+                        intraday prices are stored as float32
         
     Returns:
-        dict: Dictionary containing various market data metrics
+        MarketData: Dict-like object with the prices and their derived metrics, including
+                    'failures' with an error message for each ticker that could not be fetched
     """
     try:
-        end_date = datetime.now().strftime('%Y-%m-%d')
+        # Daily windows end with yesterday's close; intraday windows include
+        # the bars of the current session
+        end = datetime.now() + timedelta(days=0 if interval == '1d' else 1)
+        end_date = end.strftime('%Y-%m-%d')
         start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
         
-        # Fetch data
-        data = yf.download(tickers, start=start_date, end=end_date)
-        
-        if data.empty:
-            return None
-        
-        # Extract closing prices
-        prices = data['Adj Close'].copy()
-        
-        # Calculate daily returns
-        daily_returns = prices.pct_change().dropna()
-        
-        # Calculate cumulative returns
-        cumulative_returns = (1 + daily_returns).cumprod() - 1
-        
-        # Calculate volatility (annualized standard deviation of returns)
-        volatility = daily_returns.std() * np.sqrt(252) * 100
+        provider = get_provider(provider)
         
-        # Calculate Sharpe ratio (assuming risk-free rate of 0% for simplicity)
-        sharpe = (daily_returns.mean() * 252) / (daily_returns.std() * np.sqrt(252))
+        def fetch():
+            # Read the local disk cache first and download only the bars
+            # that are missing from it
+            failures = {}
+            prices = _fetch_prices(tickers, start_date, end_date, provider, bulk, failures, interval)
+            if interval != '1d':
+                prices = compact_prices(prices)
+            return prices, failures
         
-        # Normalize prices for comparison (set initial price to 100)
-        normalized = prices / prices.iloc[0] * 100
+        # Serve the request from a panel already in memory when one covers it,
+        # sharing a single fetch between concurrent sessions otherwise.
+        # Intraday panels expire after one bar.
+        ttl = min(INTERVAL_SECONDS[interval], DEFAULT_TTL)
+        prices, failures = market_data_cache.get(
+            (provider.cache_key(), interval), tickers, start_date, end_date, fetch, ttl
+        )
         
-        # Calculate correlation matrix
-        correlation = daily_returns.corr()
+        if prices.empty:
+            return None
         
-        return {
-            'prices': prices,
-            'daily_returns': daily_returns,
-            'cumulative_returns': cumulative_returns,
-            'normalized': normalized,
-            'volatility': volatility,
-            'sharpe': sharpe,
-            'correlation': correlation,
-            'returns': cumulative_returns * 100  # Convert to percentage
-        }
+        return MarketData(prices, failures, interval)
     except Exception as e:
         print(f"Error fetching market data: {str(e)}")
         return None
 
-def get_stock_data(tickers, days=365):
+def get_stock_data(tickers, days=365, provider=None, interval='1d'):
     """
     Fetch and process historical stock data for the specified tickers.
     This is a wrapper around get_market_data for stock-specific data.
@@ -67,28 +206,54 @@ def get_stock_data(tickers, days=365):
     Args:
         tickers (list): List of stock ticker symbols
         days (int): Number of days to look back
+        provider (MarketDataProvider or str): Price source, defaults to data_providers.get_provider()
+        interval (str): Bar interval, see get_market_data
         
     Returns:
-        dict: Dictionary containing various stock data metrics
+        MarketData: Dict-like object containing various stock data metrics
     """
-    return get_market_data(tickers, days)
+    return get_market_data(tickers, days, provider, interval=interval)
 
-def get_index_data(indices=['SPY', 'QQQ', 'IWM'], days=30):
+def get_index_data(indices=['SPY', 'QQQ', 'IWM'], days=30, provider=None, interval='1d'):
     """
     Fetch and process index data for market overview.
     
     Args:
         indices (list): List of index ETF symbols
         days (int): Number of days to look back
+        provider (MarketDataProvider or str): Price source, defaults to data_providers.get_provider()
+        interval (str): Bar interval, see get_market_data
         
     Returns:
         pandas.DataFrame: Normalized price data for the indices
     """
     try:
-        market_data = get_market_data(indices, days)
+        market_data = get_market_data(indices, days, provider, interval=interval)
         if market_data:
             return market_data['normalized']
         return None
     except Exception as e:
         print(f"Error fetching index data: {str(e)}")
         return None
+
+def build_price_panel(tickers, days=365 * 5, provider=None, path=PANEL_DIR):
+    """
+    Fetch prices for a ticker universe and store them as a shared memory-mapped panel.
+    
+    Once built, the panel can be served to every session through
+    data_providers.PanelProvider without each one holding its own copy.
+    
+    Args:
+        tickers (list): List of ticker symbols
+        days (int): Number of days to look back
+        provider (MarketDataProvider or str): Price source, defaults to data_providers.get_provider()
+        path (str): Directory to write the panel to
+        
+    Returns:
+        PricePanel: The newly written panel
+    """
+    end_date = datetime.now().strftime('%Y-%m-%d')
+    start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+    
+    prices = _fetch_prices(tickers, start_date, end_date, get_provider(provider))
+    return PricePanel.write(path, prices)
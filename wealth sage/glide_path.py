@@ -0,0 +1,111 @@
+import pandas as pd
+import numpy as np
+from functools import lru_cache
+from portfolio_optimizer import ALLOCATION_MAPS, ASSET_CLASSES, get_asset_model
+
+# Risk profiles from the least to the most risky; the glide path moves along them
+PROFILE_ORDER = [
+    "Conservative",
+    "Moderately Conservative",
+    "Moderate",
+    "Moderately Aggressive",
+    "Aggressive"
+]
+
+# Youngest and oldest cohorts that are precomputed
+MIN_AGE = 18
+MAX_AGE = 90
+# Number of years projected for every cohort
+HORIZON_YEARS = 60
+# Years before retirement at which the path starts de-risking
+GLIDE_YEARS = 40
+DEFAULT_RETIREMENT_AGE = 65
+
+def glide_levels(ages, retirement_age=DEFAULT_RETIREMENT_AGE):
+    """
+    Position of each age on the glide path.
+
+    The level runs from 0 (Conservative) to len(PROFILE_ORDER) - 1 (Aggressive):
+    the Aggressive profile is held until GLIDE_YEARS before retirement, then
+    the level falls linearly to Conservative at retirement and stays there.
+
+    Args:
+        ages (numpy.ndarray): Ages, of any shape
+        retirement_age (int): Age at retirement
+
+    Returns:
+        numpy.ndarray: Fractional profile levels, shaped like ages
+    """
+    years_left = retirement_age - np.asarray(ages, dtype=float)
+    return (len(PROFILE_ORDER) - 1) * np.clip(years_left / GLIDE_YEARS, 0.0, 1.0)
+
+@lru_cache(maxsize=8)
+def get_glide_paths(retirement_age=DEFAULT_RETIREMENT_AGE):
+    """
+    Precompute the glide paths of every age cohort.
+
+    Allocations interpolate linearly between neighbouring profiles of
+    ALLOCATION_MAPS, computed for all cohorts and years as one
+    (cohorts x years x assets) array. Expected return and volatility follow
+    from products against the asset model on the last axis, and expected
+    wealth from a cumulative product along the years. The result is cached
+    per retirement age, so every later lookup is a single indexing operation.
+
+    Args:
+        retirement_age (int): Age at retirement
+
+    Returns:
+        dict: 'ages' (cohorts), 'weights' (cohorts x years x assets),
+              'expected_return', 'expected_volatility' and 'expected_wealth'
+              (cohorts x years, wealth growth of 1 invested at the start of each path)
+    """
+    model = get_asset_model()
+    profiles = np.array([
+        [ALLOCATION_MAPS[profile][asset] for asset in ASSET_CLASSES]
+        for profile in PROFILE_ORDER
+    ])
+
+    ages = np.arange(MIN_AGE, MAX_AGE + 1)
+    levels = glide_levels(ages[:, None] + np.arange(HORIZON_YEARS)[None, :], retirement_age)
+    lower = np.minimum(np.floor(levels).astype(int), len(PROFILE_ORDER) - 2)
+    fraction = (levels - lower)[..., None]
+    weights = (1 - fraction) * profiles[lower] + fraction * profiles[lower + 1]
+
+    expected_return = weights @ model['expected_returns']
+    variance = np.einsum('cya,ab,cyb->cy', weights, model['cov_matrix'], weights, optimize=True)
+    expected_wealth = np.cumprod(1 + expected_return, axis=1)
+
+    result = {
+        'ages': ages,
+        'weights': weights,
+        'expected_return': expected_return,
+        'expected_volatility': np.sqrt(variance),
+        'expected_wealth': expected_wealth
+    }
+    for values in result.values():
+        values.flags.writeable = False
+    return result
+
+def get_glide_path(age, retirement_age=DEFAULT_RETIREMENT_AGE, years=None):
+    """
+    Look up the glide path of one investor.
+
+    Args:
+        age (int): Current age, between MIN_AGE and MAX_AGE
+        retirement_age (int): Age at retirement
+        years (int): Number of years to return, at most HORIZON_YEARS
+
+    Returns:
+        pandas.DataFrame: One row per age with the weight of each asset class,
+                          the expected return, volatility and wealth growth
+    """
+    paths = get_glide_paths(retirement_age)
+    cohort = int(np.clip(age, MIN_AGE, MAX_AGE)) - MIN_AGE
+    years = HORIZON_YEARS if years is None else min(years, HORIZON_YEARS)
+
+    path = pd.DataFrame(paths['weights'][cohort, :years], columns=ASSET_CLASSES,
+                        index=pd.RangeIndex(cohort + MIN_AGE, cohort + MIN_AGE + years, name='age'))
+    path['expected_return'] = paths['expected_return'][cohort, :years]
+    path['expected_volatility'] = paths['expected_volatility'][cohort, :years]
+    path['expected_wealth'] = paths['expected_wealth'][cohort, :years]
+    return path
@@ -0,0 +1,88 @@
+import pandas as pd
+import numpy as np
+
+# Length of a bar for each supported interval, in seconds
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '5m': 5 * 60,
+    '15m': 15 * 60,
+    '30m': 30 * 60,
+    '1h': 60 * 60,
+    '1d': 24 * 60 * 60
+}
+
+# Length of a US equity trading session, in minutes
+SESSION_MINUTES = 390
+
+def bars_per_day(interval):
+    """
+    Number of bars in one trading session for an interval.
+
+    Args:
+        interval (str): Bar interval, one of INTERVAL_SECONDS
+
+    Returns:
+        int: Bars per session (1 for daily bars)
+    """
+    if interval == '1d':
+        return 1
+    return int(np.ceil(SESSION_MINUTES * 60 / INTERVAL_SECONDS[interval]))
+
+def periods_per_year(interval):
+    """
+    Number of bars per year, used to annualize per-bar statistics.
+
+    Args:
+        interval (str): Bar interval, one of INTERVAL_SECONDS
+
+    Returns:
+        int: Bars per year, assuming 252 trading sessions
+    """
+    return 252 * bars_per_day(interval)
+
+def compact_prices(prices):
+    """
+    Convert a price panel to its compact representation.
+
+    Prices are stored as float32 and timestamps as naive UTC datetime64[ns],
+    i.e. int64 nanoseconds since the epoch, halving the memory of intraday
+    panels compared with float64.
+
+    Args:
+        prices (pandas.DataFrame): Prices indexed by timestamp
+
+    Returns:
+        pandas.DataFrame: The same prices with compact dtypes
+    """
+    index = pd.DatetimeIndex(prices.index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return pd.DataFrame(
+        prices.to_numpy(dtype=np.float32),
+        index=index.as_unit('ns'), columns=prices.columns
+    )
+
+def resample_prices(prices, interval):
+    """
+    Resample prices to coarser bars, keeping the last price of each bar.
+
+    Bars are assigned to buckets by integer division of their epoch timestamps,
+    and each bucket's last row is picked with one vectorized gather, avoiding
+    pandas' groupby machinery. Missing prices are forward-filled first, so a
+    bucket without any price carries the previous close.
+
+    Args:
+        prices (pandas.DataFrame): Prices indexed by timestamp, sorted
+        interval (str): Target interval, one of INTERVAL_SECONDS
+
+    Returns:
+        pandas.DataFrame: Resampled prices labelled by the start of each bar
+    """
+    width = INTERVAL_SECONDS[interval] * 10 ** 9
+    stamps = pd.DatetimeIndex(prices.index).as_unit('ns').asi8
+    buckets = stamps // width
+
+    last_rows = np.append(np.flatnonzero(np.diff(buckets)), len(buckets) - 1) if len(buckets) else []
+    values = prices.ffill().to_numpy()[last_rows]
+    index = pd.to_datetime(buckets[last_rows] * width)
+    return pd.DataFrame(values, index=index, columns=prices.columns)
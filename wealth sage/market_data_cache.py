@@ -0,0 +1,160 @@
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+import pandas as pd
+
+# How long a fetched panel is served from memory, in seconds
+DEFAULT_TTL = 15 * 60
+# Maximum number of panels kept in memory
+DEFAULT_MAX_ENTRIES = 32
+
+class PanelCache:
+    """
+    In-process LRU/TTL cache of price panels shared by all sessions.
+
+    A request is answered from any cached panel that covers it, i.e. one with
+    a superset of the tickers and a date range containing the requested one,
+    by slicing that panel. Requests that cannot be answered from the cache
+    are coalesced: while a fetch is in flight, every request it covers waits
+    for that fetch instead of starting its own. Empty panels and panels with
+    failed tickers are handed to those waiters but never cached, so a
+    transient upstream error is retried by the next request.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        """
+        Args:
+            max_entries (int): Maximum number of panels kept in memory
+            ttl (float): Seconds after which a panel is fetched again
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _covers(key, namespace, tickers, start, end):
+        """
+        Check whether a cache key covers a request.
+
+        Args:
+            key (tuple): (namespace, tickers, start, end) of a cached or in-flight panel
+            namespace (hashable): Provider the request is for
+            tickers (frozenset): Requested tickers
+            start (pandas.Timestamp): Requested start date
+            end (pandas.Timestamp): Requested end date (exclusive)
+
+        Returns:
+            bool: True if the panel contains everything the request needs
+        """
+        key_namespace, key_tickers, key_start, key_end = key
+        return (key_namespace == namespace and tickers <= key_tickers
+                and key_start <= start and end <= key_end)
+
+    @staticmethod
+    def _slice(result, tickers, start, end):
+        """
+        Cut a request out of a wider panel.
+
+        Args:
+            result (tuple): (prices, failures) of the wider panel
+            tickers (list): Requested tickers, in the order to return them
+            start (pandas.Timestamp): Requested start date
+            end (pandas.Timestamp): Requested end date (exclusive)
+
+        Returns:
+            tuple: (prices, failures) restricted to the request
+        """
+        prices, failures = result
+        rows = (prices.index >= start) & (prices.index < end)
+        columns = [ticker for ticker in tickers if ticker in prices.columns]
+        prices = prices.loc[rows, columns]
+        # Rows only the wider panel's other tickers have bars for (e.g. weekends
+        # of a crypto panel) are dropped, as they would be on a direct fetch
+        empty_rows = prices.isna().all(axis=1)
+        return (
+            prices[~empty_rows] if empty_rows.any() else prices,
+            {ticker: error for ticker, error in failures.items() if ticker in tickers}
+        )
+
+    def get(self, namespace, tickers, start, end, fetch, ttl=None):
+        """
+        Return prices for a request, from memory when possible.
+
+        Args:
+            namespace (hashable): Identifies the provider the prices come from
+            tickers (list): List of ticker symbols
+            start (str or datetime): First date to return
+            end (str or datetime): End date (exclusive)
+            fetch (callable): Function fetch() returning (prices, failures) for
+                              exactly this request, called on a cache miss
+            ttl (float): Maximum age in seconds of a panel used for this request,
+                         defaults to the cache's ttl
+
+        Returns:
+            tuple: (prices, failures) where prices is a DataFrame with one column
+                   per ticker and failures maps tickers to error messages
+        """
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        ticker_set = frozenset(tickers)
+
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+
+        with self.lock:
+            now = time.monotonic()
+            for key in list(self.entries):
+                created, result = self.entries[key]
+                if now - created > self.ttl:
+                    del self.entries[key]
+                elif now - created <= ttl and self._covers(key, namespace, ticker_set, start, end):
+                    self.entries.move_to_end(key)
+                    return self._slice(result, tickers, start, end)
+
+            leader = True
+            for key, future in self.in_flight.items():
+                if self._covers(key, namespace, ticker_set, start, end):
+                    leader = False
+                    break
+            else:
+                key = (namespace, ticker_set, start, end)
+                future = self.in_flight[key] = Future()
+
+        # Another request is already fetching a panel that covers this one
+        if not leader:
+            return self._slice(future.result(), tickers, start, end)
+
+        try:
+            result = fetch()
+        except Exception as e:
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(e)
+            raise
+
+        prices, failures = result
+        with self.lock:
+            del self.in_flight[key]
+            if not prices.empty and not failures:
+                # Panels covered by the new one are no longer needed
+                for old_key in list(self.entries):
+                    if self._covers(key, *old_key):
+                        del self.entries[old_key]
+                self.entries[key] = (time.monotonic(), result)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+
+        future.set_result(result)
+        return self._slice(result, tickers, start, end)
+
+    def clear(self):
+        """
+        Drop all cached panels.
+        """
+        with self.lock:
+            self.entries.clear()
+
+# Cache shared by all sessions of the app
+market_data_cache = PanelCache()
@@ -1,8 +1,618 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 import pandas as pd
 import numpy as np
 import streamlit as st
+from scipy.special import ndtri
+from scipy.stats import qmc
 
-def project_portfolio_performance(portfolio, initial_investment=10000, years=10, monte_carlo_sims=1000):
+from portfolio_optimizer import get_asset_model
+from quantile_sketch import QuantileSketch
+
+# Number of simulated returns drawn at once, bounding the memory of a chunk of paths
+CHUNK_VALUES = 1000000
+
+# Rebalancing periods of the multi-asset simulation, in periods per year
+REBALANCE_PERIODS = {'monthly': 12, 'quarterly': 4, 'annual': 1}
+
+# Independent replicates of a projection, whose spread gives the standard errors
+REPLICATES = 10
+
+# Leading shocks of a path drawn from Sobol' points, at most qmc.Sobol.MAXDIM.
+# Scrambling costs grow with the dimension and are paid for every chunk,
+# while later dimensions gain little over independent draws
+SOBOL_DIMENSIONS = 1024
+
+# Percentiles reported for the Monte Carlo simulation
+PERCENTILES = {'5th': 5, '25th': 25, '50th': 50, '75th': 75, '95th': 95}
+
+def _chunk_plan(num_paths, values_per_path, seed, chunk_size=None, replicates=1, sampling=None):
+    """
+    Split a simulation into replicates and chunks, each chunk with its own random stream.
+    
+    Every chunk gets an independent child of SeedSequence(seed), so the
+    numbers a chunk draws depend only on the seed and the chunk's position,
+    never on which worker runs it or in which order. Replicates are
+    independent batches of paths, made of whole chunks, whose spread gives
+    the standard errors of the estimates.
+    
+    Antithetic pairs are kept within a chunk, so chunks hold an even number
+    of paths; scrambled Sobol' points are balanced in blocks of 2^m points,
+    so every chunk is a power of two. With either method the paths of each
+    replicate are rounded up accordingly.
+    
+    Args:
+        num_paths (int): Number of paths
+        values_per_path (int): Random numbers drawn per path
+        seed (int or numpy.random.SeedSequence): Root seed, None for fresh entropy
+        chunk_size (int): Paths per chunk, by default CHUNK_VALUES random numbers per chunk
+        replicates (int): Number of replicates
+        sampling (str): None, 'antithetic' or 'sobol', see _draw_normals
+        
+    Returns:
+        list: (SeedSequence, number of paths, replicate) for every chunk, in path order
+    """
+    if chunk_size is None:
+        chunk_size = max(1, CHUNK_VALUES // max(values_per_path, 1))
+    replicates = max(1, min(replicates, num_paths))
+    replicate_sizes = [num_paths // replicates + (replicate < num_paths % replicates)
+                       for replicate in range(replicates)]
+    
+    if sampling == 'antithetic':
+        chunk_size = max(2, chunk_size - chunk_size % 2)
+        replicate_sizes = [size + size % 2 for size in replicate_sizes]
+    elif sampling == 'sobol':
+        chunk_size = 2 ** int(np.log2(chunk_size))
+        replicate_sizes = [2 ** int(np.ceil(np.log2(size))) for size in replicate_sizes]
+    elif sampling is not None:
+        raise ValueError(f"Unknown sampling method: {sampling}")
+    
+    plan = [
+        (min(chunk_size, size - start), replicate)
+        for replicate, size in enumerate(replicate_sizes)
+        for start in range(0, size, chunk_size)
+    ]
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return [(seed_sequence, size, replicate) for seed_sequence, (size, replicate) in zip(root.spawn(len(plan)), plan)]
+
+def _draw_normals(seed_sequence, size, dimensions, sampling=None):
+    """
+    Draw the standard normal shocks of a chunk of paths.
+    
+    'antithetic' draws half of the paths and mirrors them (z, -z), cancelling
+    the odd-order noise of the sample. 'sobol' maps one scrambled Sobol'
+    sequence through the inverse normal CDF: the points fill the unit cube
+    more evenly than independent draws, and the random scrambling keeps
+    every chunk an independent, unbiased sample. Sobol' points gain most
+    when few dimensions matter, i.e. with few steps per path; shocks beyond
+    the first SOBOL_DIMENSIONS of a path are independent draws.
+    
+    Args:
+        seed_sequence (numpy.random.SeedSequence): Random stream of the chunk
+        size (int): Number of paths
+        dimensions (int): Shocks per path
+        sampling (str): None for independent draws, 'antithetic' or 'sobol'
+        
+    Returns:
+        numpy.ndarray: Shocks shaped (size, dimensions)
+    """
+    rng = np.random.default_rng(seed_sequence)
+    if sampling == 'sobol':
+        sobol_dimensions = min(dimensions, SOBOL_DIMENSIONS)
+        points = qmc.Sobol(sobol_dimensions, scramble=True, rng=rng).random(size)
+        shocks = ndtri(np.clip(points, 1e-12, 1 - 1e-12))
+        if dimensions > sobol_dimensions:
+            shocks = np.hstack([shocks, rng.standard_normal((size, dimensions - sobol_dimensions))])
+        return shocks
+    if sampling == 'antithetic':
+        half = rng.standard_normal((-(-size // 2), dimensions))
+        return np.concatenate([half, -half])[:size]
+    return rng.standard_normal((size, dimensions))
+
+def _lognormal_control(shocks, initial_investment, step_return, step_volatility, steps_per_year):
+    """
+    Value of the lognormal control variate driven by the same shocks as the paths.
+    
+    The control compounds continuously, initial * exp(Σ (μ - σ²/2 + σ z)), so
+    its quantiles are known exactly (see _control_quantiles) while it moves
+    almost one-for-one with the simulated portfolio.
+    
+    Args:
+        shocks (numpy.ndarray): Standard normal portfolio shocks, paths x steps
+        initial_investment (float): Initial investment amount
+        step_return (float): Mean portfolio return per step
+        step_volatility (float): Volatility of the portfolio return per step
+        steps_per_year (int): Steps per year
+        
+    Returns:
+        numpy.ndarray: Control value of each path at the start and at the end of every year
+    """
+    size = len(shocks)
+    yearly = shocks.reshape(size, -1, steps_per_year).sum(axis=2)
+    log_growth = np.zeros((size, yearly.shape[1] + 1))
+    np.cumsum(step_volatility * yearly + steps_per_year * (step_return - step_volatility ** 2 / 2),
+              axis=1, out=log_growth[:, 1:])
+    return initial_investment * np.exp(log_growth)
+
+def _control_quantiles(initial_investment, step_return, step_volatility, steps_per_year, years, levels):
+    """
+    Exact percentiles of the lognormal control variate.
+    
+    Args:
+        initial_investment (float): Initial investment amount
+        step_return (float): Mean portfolio return per step
+        step_volatility (float): Volatility of the portfolio return per step
+        steps_per_year (int): Steps per year
+        years (int): Number of years simulated
+        levels (list): Percentiles between 0 and 100
+        
+    Returns:
+        numpy.ndarray: Percentiles shaped (len(levels), years + 1)
+    """
+    steps = np.arange(years + 1) * steps_per_year
+    z = ndtri(np.asarray(levels) / 100)[:, None]
+    return initial_investment * np.exp(steps * (step_return - step_volatility ** 2 / 2)
+                                       + np.sqrt(steps) * step_volatility * z)
+
+def _simulate_chunk(chunk, initial_investment, step_return, step_volatility, total_steps, steps_per_year,
+                    sampling=None, control=False):
+    """
+    Simulate one chunk of single-asset paths.
+    
+    The whole (paths x steps) shock matrix is drawn at once and compounded
+    with a cumulative product along the steps; only the year-end values are kept.
+    
+    Args:
+        chunk (tuple): (SeedSequence, number of paths, replicate) from _chunk_plan
+        initial_investment (float): Initial investment amount
+        step_return (float): Mean return per step
+        step_volatility (float): Volatility of returns per step
+        total_steps (int): Steps per path
+        steps_per_year (int): Steps per year
+        sampling (str): None, 'antithetic' or 'sobol', see _draw_normals
+        control (bool): Also return the lognormal control variate of the paths
+        
+    Returns:
+        tuple: Value of each path at the start and at the end of every year, and
+               the same for the control variate (None unless control)
+    """
+    seed_sequence, size, _ = chunk
+    shocks = _draw_normals(seed_sequence, size, total_steps, sampling)
+    growth = np.empty((size, total_steps + 1))
+    growth[:, 0] = initial_investment
+    growth[:, 1:] = 1 + step_return + step_volatility * shocks
+    np.cumprod(growth, axis=1, out=growth)
+    
+    controls = None
+    if control:
+        controls = _lognormal_control(shocks, initial_investment, step_return, step_volatility, steps_per_year)
+    return growth[:, ::steps_per_year], controls
+
+def _simulate_multi_asset_chunk(chunk, initial_investment, step_returns, step_factor, weights,
+                                total_steps, steps_per_year, steps_per_period, sampling=None, control=False):
+    """
+    Simulate one chunk of correlated multi-asset paths with periodic rebalancing.
+    
+    Asset returns for all paths, steps and assets are drawn as one
+    (paths x steps x assets) tensor and correlated with the Cholesky factor.
+    The steps are then reshaped into (periods x steps per period): within a
+    period the holdings drift, so each asset compounds with a cumulative
+    product and the portfolio grows by the weighted sum of those growths;
+    at the end of every period the portfolio is reset to the target weights,
+    so period values chain with a cumulative product over the periods.
+    
+    Args:
+        chunk (tuple): (SeedSequence, number of paths, replicate) from _chunk_plan
+        initial_investment (float): Initial investment amount
+        step_returns (numpy.ndarray): Mean return of each asset per step
+        step_factor (numpy.ndarray): Cholesky factor of the per-step covariance
+        weights (numpy.ndarray): Target weight of each asset
+        total_steps (int): Steps per path
+        steps_per_year (int): Steps per year
+        steps_per_period (int): Steps between rebalancings
+        sampling (str): None, 'antithetic' or 'sobol', see _draw_normals
+        control (bool): Also return the lognormal control variate of the paths
+        
+    Returns:
+        tuple: Value of each path at the start and at the end of every year, and
+               the same for the control variate (None unless control)
+    """
+    seed_sequence, size, _ = chunk
+    num_assets = len(weights)
+    periods = total_steps // steps_per_period
+    
+    shocks = _draw_normals(seed_sequence, size, total_steps * num_assets, sampling)
+    shocks = shocks.reshape(size, total_steps, num_assets)
+    controls = None
+    if control:
+        # Shock of the target portfolio, rescaled to a standard normal
+        loading = step_factor.T @ weights
+        step_volatility = np.sqrt(loading @ loading)
+        controls = _lognormal_control(shocks @ (loading / step_volatility), initial_investment,
+                                      step_returns @ weights, step_volatility, steps_per_year)
+    
+    growth = shocks @ step_factor.T
+    growth += 1 + step_returns
+    growth = growth.reshape(size, periods, steps_per_period, num_assets)
+    np.cumprod(growth, axis=2, out=growth)
+    
+    # Growth of the portfolio since the start of its period
+    period_growth = growth @ weights
+    period_start = np.empty((size, periods))
+    period_start[:, 0] = initial_investment
+    period_start[:, 1:] = initial_investment * np.cumprod(period_growth[:, :-1, -1], axis=1)
+    values = (period_start[:, :, None] * period_growth).reshape(size, total_steps)
+    
+    year_end = np.empty((size, total_steps // steps_per_year + 1))
+    year_end[:, 0] = initial_investment
+    year_end[:, 1:] = values[:, steps_per_year - 1::steps_per_year]
+    return year_end, controls
+
+def _map_chunks(function, chunks, max_workers=None):
+    """
+    Apply a function to every chunk on a thread pool, yielding results in chunk order.
+    
+    numpy releases the GIL while drawing random numbers and compounding them,
+    so the chunks run in parallel on separate cores.
+    
+    Args:
+        function (callable): Function of one chunk
+        chunks (list): Chunks from _chunk_plan
+        max_workers (int): Number of threads, by default one per CPU; 1 runs in
+                           the calling thread
+        
+    Yields:
+        Result of function for each chunk, in the order of chunks
+    """
+    max_workers = max_workers or os.cpu_count()
+    if max_workers == 1 or len(chunks) == 1:
+        yield from map(function, chunks)
+        return
+    with ThreadPoolExecutor(max_workers) as executor:
+        yield from executor.map(function, chunks)
+
+def _single_asset_simulator(initial_investment, expected_return, expected_volatility, years, steps_per_year=1):
+    """
+    Set up the simulation of a portfolio as a single normally distributed asset.
+    
+    Each step's return has mean expected_return / steps_per_year and volatility
+    expected_volatility / sqrt(steps_per_year).
+    
+    Args:
+        initial_investment (float): Initial investment amount
+        expected_return (float): Expected annual return
+        expected_volatility (float): Annual volatility of returns
+        years (int): Number of years to simulate
+        steps_per_year (int): Compounding steps per year (1 annual, 12 monthly, 252 daily)
+        
+    Returns:
+        tuple: (function simulating one chunk, random numbers drawn per path,
+                (mean, volatility) of the portfolio return per step)
+    """
+    total_steps = years * steps_per_year
+    step_return = expected_return / steps_per_year
+    step_volatility = expected_volatility / np.sqrt(steps_per_year)
+    simulate = partial(
+        _simulate_chunk,
+        initial_investment=initial_investment,
+        step_return=step_return,
+        step_volatility=step_volatility,
+        total_steps=total_steps,
+        steps_per_year=steps_per_year
+    )
+    return simulate, total_steps, (step_return, step_volatility)
+
+@lru_cache(maxsize=32)
+def _asset_factor(assets):
+    """
+    Expected returns and Cholesky factor of the annual covariance of a set of asset classes.
+    
+    Cached per set of assets, so every projection of the same portfolio reuses
+    the factorization.
+    
+    Args:
+        assets (tuple): Asset classes held by the portfolio
+        
+    Returns:
+        tuple: (expected returns, lower-triangular Cholesky factor), read-only
+    """
+    model = get_asset_model()
+    positions = [model['assets'].index(asset) for asset in assets]
+    expected_returns = model['expected_returns'][positions]
+    factor = np.linalg.cholesky(model['cov_matrix'][np.ix_(positions, positions)])
+    factor.flags.writeable = False
+    return expected_returns, factor
+
+def _multi_asset_simulator(allocation, initial_investment, years, steps_per_year=12, rebalance='annual'):
+    """
+    Set up the simulation of a portfolio from its correlated asset classes.
+    
+    Args:
+        allocation (dict): Target weight of each asset class
+        initial_investment (float): Initial investment amount
+        years (int): Number of years to simulate
+        steps_per_year (int): Steps per year, a multiple of the rebalancing periods per year
+        rebalance (str): 'monthly', 'quarterly', 'annual', or None to buy and hold
+        
+    Returns:
+        tuple: (function simulating one chunk, random numbers drawn per path,
+                (mean, volatility) of the portfolio return per step)
+    """
+    assets = tuple(asset for asset, weight in allocation.items() if weight)
+    weights = np.array([allocation[asset] for asset in assets], dtype=float)
+    expected_returns, factor = _asset_factor(assets)
+    
+    total_steps = years * steps_per_year
+    if rebalance is None:
+        steps_per_period = total_steps
+    elif steps_per_year % REBALANCE_PERIODS[rebalance]:
+        raise ValueError(f"{steps_per_year} steps per year cannot be rebalanced {rebalance}")
+    else:
+        steps_per_period = steps_per_year // REBALANCE_PERIODS[rebalance]
+    
+    step_returns = expected_returns / steps_per_year
+    step_factor = factor / np.sqrt(steps_per_year)
+    simulate = partial(
+        _simulate_multi_asset_chunk,
+        initial_investment=initial_investment,
+        step_returns=step_returns,
+        step_factor=step_factor,
+        weights=weights,
+        total_steps=total_steps,
+        steps_per_year=steps_per_year,
+        steps_per_period=steps_per_period
+    )
+    loading = step_factor.T @ weights
+    return simulate, total_steps * len(assets), (step_returns @ weights, np.sqrt(loading @ loading))
+
+def _split_replicates(chunks, pooled):
+    """
+    Split pooled per-path arrays into the contiguous rows of each replicate.
+    
+    Args:
+        chunks (list): Chunks from _chunk_plan
+        pooled (tuple): Arrays (or None) with one row per path
+        
+    Returns:
+        list: Tuple of row views per replicate
+    """
+    sizes = np.bincount([replicate for _, _, replicate in chunks],
+                        weights=[size for _, size, _ in chunks]).astype(int)
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    return [
+        tuple(None if array is None else array[start:end] for array in pooled)
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+
+def _collect_paths(simulate, chunks, years, max_workers=None):
+    """
+    Run a simulation and keep every path.
+    
+    Args:
+        simulate (callable): Function simulating one chunk
+        chunks (list): Chunks from _chunk_plan
+        years (int): Number of years simulated
+        max_workers (int): Number of threads, by default one per CPU
+        
+    Returns:
+        tuple: Pooled (values, control values or None), each shaped
+               (paths, years + 1), and the same per replicate
+    """
+    num_paths = sum(size for _, size, _ in chunks)
+    values = np.empty((num_paths, years + 1))
+    controls = None
+    start = 0
+    for chunk_values, chunk_controls in _map_chunks(simulate, chunks, max_workers):
+        end = start + len(chunk_values)
+        values[start:end] = chunk_values
+        if chunk_controls is not None:
+            if controls is None:
+                controls = np.empty_like(values)
+            controls[start:end] = chunk_controls
+        start = end
+    return (values, controls), _split_replicates(chunks, (values, controls))
+
+def _collect_quantiles(simulate, chunks, years, initial_investment, max_workers=None,
+                       relative_accuracy=0.005, control=False):
+    """
+    Run a simulation and keep only quantile sketches of each year.
+    
+    Each chunk is sketched by the worker that simulated it and the sketches
+    are merged by adding their counts, so memory holds one chunk per worker
+    and one sketch per replicate no matter how many paths are simulated.
+    
+    Args:
+        simulate (callable): Function simulating one chunk
+        chunks (list): Chunks from _chunk_plan
+        years (int): Number of years simulated
+        initial_investment (float): Initial investment amount, used to size the sketches
+        max_workers (int): Number of threads, by default one per CPU
+        relative_accuracy (float): Relative error of the quantiles
+        control (bool): Whether simulate also returns control values to sketch
+        
+    Returns:
+        tuple: Pooled (value sketch, control sketch or None) and the same per replicate
+    """
+    # Values from a millionth to a million times the investment are resolved
+    def new_sketches():
+        return tuple(
+            QuantileSketch(years + 1, initial_investment * 1e-6, initial_investment * 1e6, relative_accuracy)
+            if needed else None
+            for needed in (True, control)
+        )
+    
+    def merge(sketches, others):
+        for sketch, other in zip(sketches, others):
+            if sketch is not None:
+                sketch.merge(other)
+    
+    def sketch_chunk(chunk):
+        sketches = new_sketches()
+        for sketch, values in zip(sketches, simulate(chunk)):
+            if sketch is not None:
+                sketch.add(values)
+        return sketches
+    
+    replicates = [new_sketches() for _ in range(chunks[-1][2] + 1)]
+    for (_, _, replicate), chunk_sketches in zip(chunks, _map_chunks(sketch_chunk, chunks, max_workers)):
+        merge(replicates[replicate], chunk_sketches)
+    
+    pooled = new_sketches()
+    for replicate_sketches in replicates:
+        merge(pooled, replicate_sketches)
+    return pooled, replicates
+
+def _quantiles(sample, levels):
+    """
+    Percentiles of every year of a sample of paths.
+    
+    Args:
+        sample (numpy.ndarray or QuantileSketch): Paths x years values, or their sketch
+        levels (list): Percentiles between 0 and 100
+        
+    Returns:
+        numpy.ndarray: Percentiles shaped (len(levels), years + 1)
+    """
+    if isinstance(sample, QuantileSketch):
+        return sample.quantile([level / 100 for level in levels])
+    return np.percentile(sample, levels, axis=0)
+
+def _estimate_percentiles(pooled, replicates, levels, control_quantiles=None):
+    """
+    Estimate percentiles and their standard errors from independent replicates.
+    
+    Standard errors are the spread of the replicates' estimates divided by
+    the square root of their number, which stays valid for Sobol' points,
+    whose paths within a replicate are not independent.
+    
+    Without a control variate the estimate pools all paths, as percentiles of
+    small replicates are biased in the tails. With one, each replicate's
+    estimate is corrected by the ratio of the control's exact percentile to
+    its sampled one; in log terms the control's sampling error, small-sample
+    bias included, is subtracted from the portfolio's, which it tracks
+    closely. The estimate is then the mean of the replicates' estimates.
+    
+    Args:
+        pooled (tuple): Values and control values (or None) of all paths, as
+                        paths x years arrays or sketches of them
+        replicates (list): The same for each replicate
+        levels (list): Percentiles between 0 and 100
+        control_quantiles (numpy.ndarray): Exact percentiles of the control, from
+                                           _control_quantiles, or None
+        
+    Returns:
+        tuple: Estimates and standard errors, each shaped (len(levels), years + 1)
+    """
+    estimates = np.array([_quantiles(values, levels) for values, _ in replicates])
+    if control_quantiles is None:
+        estimate = _quantiles(pooled[0], levels)
+    else:
+        estimates *= control_quantiles / np.array([_quantiles(controls, levels) for _, controls in replicates])
+        estimate = estimates.mean(axis=0)
+    
+    if len(replicates) < 2:
+        return estimate, np.full_like(estimate, np.nan)
+    return estimate, estimates.std(axis=0, ddof=1) / np.sqrt(len(replicates))
+
+def simulate_paths(initial_investment, expected_return, expected_volatility, years, num_paths,
+                   steps_per_year=1, seed=None, max_workers=None, sampling=None):
+    """
+    Simulate portfolio value paths with normally distributed returns.
+    
+    Results are bit-identical for a given seed whatever the number of workers.
+    
+    Args:
+        initial_investment (float): Initial investment amount
+        expected_return (float): Expected annual return
+        expected_volatility (float): Annual volatility of returns
+        years (int): Number of years to simulate
+        num_paths (int): Number of paths, rounded up to whole antithetic pairs or
+                         Sobol' blocks (see _chunk_plan)
+        steps_per_year (int): Compounding steps per year (1 annual, 12 monthly, 252 daily)
+        seed (int or numpy.random.SeedSequence): Seed of the simulation, None for fresh entropy
+        max_workers (int): Number of threads, by default one per CPU
+        sampling (str): None, 'antithetic' or 'sobol', see _draw_normals
+        
+    Returns:
+        numpy.ndarray: Value of each path at the start and at the end of every year,
+                       shaped (paths, years + 1)
+    """
+    simulate, values_per_path, _ = _single_asset_simulator(initial_investment, expected_return,
+                                                           expected_volatility, years, steps_per_year)
+    chunks = _chunk_plan(num_paths, values_per_path, seed, sampling=sampling)
+    (values, _), _ = _collect_paths(partial(simulate, sampling=sampling), chunks, years, max_workers)
+    return values
+
+def simulate_quantiles(initial_investment, expected_return, expected_volatility, years, num_paths,
+                       steps_per_year=1, chunk_size=None, relative_accuracy=0.005, seed=None,
+                       max_workers=None, sampling=None):
+    """
+    Simulate portfolio value paths and keep only a quantile sketch of each year.
+    
+    Paths are generated in fixed-size chunks and folded into a QuantileSketch
+    with one series per year; the paths are the same as those of
+    simulate_paths for the same seed.
+    
+    Args:
+        initial_investment (float): Initial investment amount
+        expected_return (float): Expected annual return
+        expected_volatility (float): Annual volatility of returns
+        years (int): Number of years to simulate
+        num_paths (int): Number of paths, rounded up to whole antithetic pairs or
+                         Sobol' blocks (see _chunk_plan)
+        steps_per_year (int): Compounding steps per year (1 annual, 12 monthly, 252 daily)
+        chunk_size (int): Paths per chunk, by default CHUNK_VALUES random numbers per chunk
+        relative_accuracy (float): Relative error of the quantiles
+        seed (int or numpy.random.SeedSequence): Seed of the simulation, None for fresh entropy
+        max_workers (int): Number of threads, by default one per CPU
+        sampling (str): None, 'antithetic' or 'sobol', see _draw_normals
+        
+    Returns:
+        QuantileSketch: Sketch of the portfolio values at the start and the end of every year
+    """
+    simulate, values_per_path, _ = _single_asset_simulator(initial_investment, expected_return,
+                                                           expected_volatility, years, steps_per_year)
+    chunks = _chunk_plan(num_paths, values_per_path, seed, chunk_size, sampling=sampling)
+    (sketch, _), _ = _collect_quantiles(partial(simulate, sampling=sampling), chunks, years,
+                                        initial_investment, max_workers, relative_accuracy)
+    return sketch
+
+def simulate_multi_asset_paths(allocation, initial_investment, years, num_paths, steps_per_year=12,
+                               rebalance='annual', seed=None, max_workers=None, sampling=None):
+    """
+    Simulate portfolio value paths from correlated asset-class returns.
+    
+    Asset-class returns are multivariate normal with the expected returns and
+    covariance of portfolio_optimizer's asset model, and the portfolio is
+    rebalanced to its target allocation at the end of every period.
+    
+    Args:
+        allocation (dict): Target weight of each asset class
+        initial_investment (float): Initial investment amount
+        years (int): Number of years to simulate
+        num_paths (int): Number of paths, rounded up to whole antithetic pairs or
+                         Sobol' blocks (see _chunk_plan)
+        steps_per_year (int): Steps per year, a multiple of the rebalancing periods per year
+        rebalance (str): 'monthly', 'quarterly', 'annual', or None to buy and hold
+        seed (int or numpy.random.SeedSequence): Seed of the simulation, None for fresh entropy
+        max_workers (int): Number of threads, by default one per CPU
+        sampling (str): None, 'antithetic' or 'sobol', see _draw_normals
+        
+    Returns:
+        numpy.ndarray: Value of each path at the start and at the end of every year,
+                       shaped (paths, years + 1)
+    """
+    simulate, values_per_path, _ = _multi_asset_simulator(allocation, initial_investment, years,
+                                                          steps_per_year, rebalance)
+    chunks = _chunk_plan(num_paths, values_per_path, seed, sampling=sampling)
+    (values, _), _ = _collect_paths(partial(simulate, sampling=sampling), chunks, years, max_workers)
+    return values
+
+def project_portfolio_performance(portfolio, initial_investment=10000, years=10, monte_carlo_sims=1000,
+                                  steps_per_year=1, streaming=False, seed=42, max_workers=None,
+                                  multi_asset=False, rebalance='annual', sampling=None,
+                                  control_variate=False):
     """
     Project the performance of a portfolio over time.
     
@@ -11,9 +621,31 @@ def project_portfolio_performance(portfolio, initial_investment=10000, years=10,
         initial_investment (float): Initial investment amount
         years (int): Number of years to project
         monte_carlo_sims (int): Number of Monte Carlo simulations to run
+        steps_per_year (int): Compounding steps per simulated year (1, 12 or 252)
+        streaming (bool): Estimate the percentiles with a streaming quantile sketch
+                          instead of keeping every simulated path; the result then
+                          holds the sketch instead of the simulations. The sketch
+                          takes about 2,800 counters per year whatever the number
+                          of paths, so it only saves memory beyond a few thousand
+        seed (int): Seed of the simulation; results are identical for a given seed
+                    whatever the number of workers
+        max_workers (int): Number of threads simulating chunks of paths, by default one per CPU
+        multi_asset (bool): Simulate the correlated asset classes of the portfolio's
+                            allocation instead of a single asset with its expected
+                            return and volatility
+        rebalance (str): Rebalancing of the multi-asset simulation ('monthly',
+                         'quarterly', 'annual' or None); steps_per_year must be a
+                         multiple of the rebalancing periods per year
+        sampling (str): Variance reduction of the random draws: None, 'antithetic'
+                        pairs or scrambled 'sobol' points (see _draw_normals);
+                        the number of simulations is rounded up to whole pairs or
+                        power-of-two blocks
+        control_variate (bool): Correct the percentiles with a lognormal control
+                                variate whose percentiles are known exactly
         
     Returns:
-        dict: Projected performance data
+        dict: Projected performance data; the Monte Carlo percentiles come with
+              'standard_errors' estimated from REPLICATES independent replicates
     """
     # Extract portfolio metrics
     expected_return = portfolio['expected_return']
@@ -50,37 +682,38 @@ def project_portfolio_performance(portfolio, initial_investment=10000, years=10,
     
     # Monte Carlo simulation (optional, not displayed in basic version)
     # This simulates many possible paths the portfolio might take
-    np.random.seed(42)  # For reproducibility
-    simulation_results = []
-    
-    for i in range(monte_carlo_sims):
-        # Generate random returns with expected return and volatility
-        random_returns = np.random.normal(expected_return, expected_volatility, years)
-        # Simulate growth path
-        portfolio_value = [initial_investment]
-        
-        for annual_return in random_returns:
-            portfolio_value.append(portfolio_value[-1] * (1 + annual_return))
-        
-        simulation_results.append(portfolio_value)
-    
-    # Convert to numpy array for easier calculations
-    simulation_array = np.array(simulation_results)
-    
-    # Calculate percentiles for each year
-    percentiles = {
-        '5th': np.percentile(simulation_array, 5, axis=0),
-        '25th': np.percentile(simulation_array, 25, axis=0),
-        '50th': np.percentile(simulation_array, 50, axis=0),
-        '75th': np.percentile(simulation_array, 75, axis=0),
-        '95th': np.percentile(simulation_array, 95, axis=0)
-    }
+    # Each chunk of paths draws from its own stream spawned from the seed,
+    # leaving numpy's global random state untouched
+    if multi_asset:
+        allocation = dict(zip(portfolio['asset_class'], portfolio['allocation']))
+        simulator = _multi_asset_simulator(allocation, initial_investment, years, steps_per_year, rebalance)
+    else:
+        simulator = _single_asset_simulator(initial_investment, expected_return, expected_volatility,
+                                            years, steps_per_year)
+    simulate, values_per_path, (step_return, step_volatility) = simulator
+    simulate = partial(simulate, sampling=sampling, control=control_variate)
+    chunks = _chunk_plan(monte_carlo_sims, values_per_path, seed, replicates=REPLICATES, sampling=sampling)
+    
+    if streaming:
+        pooled, replicates = _collect_quantiles(simulate, chunks, years, initial_investment, max_workers,
+                                                control=control_variate)
+        monte_carlo = {'sketch': pooled[0]}
+    else:
+        pooled, replicates = _collect_paths(simulate, chunks, years, max_workers)
+        monte_carlo = {'simulations': pooled[0]}
+    
+    # Calculate percentiles for each year, and their standard errors across replicates
+    levels = list(PERCENTILES.values())
+    control_quantiles = None
+    if control_variate:
+        control_quantiles = _control_quantiles(initial_investment, step_return, step_volatility,
+                                               steps_per_year, years, levels)
+    estimates, standard_errors = _estimate_percentiles(pooled, replicates, levels, control_quantiles)
+    monte_carlo['percentiles'] = dict(zip(PERCENTILES, estimates))
+    monte_carlo['standard_errors'] = dict(zip(PERCENTILES, standard_errors))
     
     return {
         'projection_df': projection_df,
         'final_values': final_values,
-        'monte_carlo': {
-            'simulations': simulation_array,
-            'percentiles': percentiles
-        }
+        'monte_carlo': monte_carlo
     }
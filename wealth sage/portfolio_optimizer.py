@@ -1,179 +1,651 @@
 import pandas as pd
 import numpy as np
-from sklearn.covariance import LedoitWolf
 import yfinance as yf
+import threading
 from datetime import datetime, timedelta
+from functools import lru_cache
+from scipy.cluster.hierarchy import leaves_list, linkage
+from scipy.linalg import cho_factor, cho_solve
+from scipy.spatial.distance import squareform
+from data_providers import get_provider
+from financial_data import get_market_data
 
-def get_optimized_portfolio(risk_profile):
+# Asset classes in the order used by every weight vector and matrix below
+ASSET_CLASSES = [
+    "US Bonds",
+    "International Bonds",
+    "US Large Cap",
+    "US Mid/Small Cap",
+    "International Equity",
+    "Real Estate",
+    "Cash"
+]
+
+# Define asset allocation based on risk profile
+ALLOCATION_MAPS = {
+    "Conservative": {
+        "US Bonds": 0.5,
+        "International Bonds": 0.15,
+        "US Large Cap": 0.15,
+        "US Mid/Small Cap": 0.05,
+        "International Equity": 0.1,
+        "Real Estate": 0.05,
+        "Cash": 0.0
+    },
+    "Moderately Conservative": {
+        "US Bonds": 0.40,
+        "International Bonds": 0.10,
+        "US Large Cap": 0.25,
+        "US Mid/Small Cap": 0.05,
+        "International Equity": 0.15,
+        "Real Estate": 0.05,
+        "Cash": 0.0
+    },
+    "Moderate": {
+        "US Bonds": 0.25,
+        "International Bonds": 0.10,
+        "US Large Cap": 0.30,
+        "US Mid/Small Cap": 0.10,
+        "International Equity": 0.20,
+        "Real Estate": 0.05,
+        "Cash": 0.0
+    },
+    "Moderately Aggressive": {
+        "US Bonds": 0.15,
+        "International Bonds": 0.05,
+        "US Large Cap": 0.35,
+        "US Mid/Small Cap": 0.15,
+        "International Equity": 0.25,
+        "Real Estate": 0.05,
+        "Cash": 0.0
+    },
+    "Aggressive": {
+        "US Bonds": 0.05,
+        "International Bonds": 0.05,
+        "US Large Cap": 0.40,
+        "US Mid/Small Cap": 0.15,
+        "International Equity": 0.30,
+        "Real Estate": 0.05,
+        "Cash": 0.0
+    }
+}
+
+# Example ETFs for each asset class
+EXAMPLE_TICKERS = {
+    "US Bonds": "AGG",  # iShares Core U.S. Aggregate Bond ETF
+    "International Bonds": "BNDX",  # Vanguard Total International Bond ETF
+    "US Large Cap": "VTI",  # Vanguard Total Stock Market ETF
+    "US Mid/Small Cap": "IJR",  # iShares Core S&P Small-Cap ETF
+    "International Equity": "VXUS",  # Vanguard Total International Stock ETF
+    "Real Estate": "VNQ",  # Vanguard Real Estate ETF
+    "Cash": "SHV"  # iShares Short Treasury Bond ETF
+}
+
+# Longer-history stand-ins for the proxies launched after 2008, used to
+# extend backtests and historical scenarios to before their launch
+FALLBACK_TICKERS = {
+    "International Bonds": "BWX",  # SPDR Bloomberg International Treasury Bond ETF, since 2007
+    "International Equity": "EFA"  # iShares MSCI EAFE ETF, since 2001
+}
+
+# Descriptions for each asset class
+DESCRIPTIONS = {
+    "US Bonds": "U.S. investment-grade bonds for stable income and lower volatility",
+    "International Bonds": "Non-U.S. bonds for diversification and yield",
+    "US Large Cap": "Large U.S. companies for growth and stability",
+    "US Mid/Small Cap": "Smaller U.S. companies with higher growth potential",
+    "International Equity": "Non-U.S. stocks for global diversification",
+    "Real Estate": "REITs and real estate securities for income and inflation protection",
+    "Cash": "Short-term treasury securities for capital preservation"
+}
+
+# Expected returns and volatility
+# These are simplified assumptions based on historical data
+EXPECTED_RETURNS = {
+    "US Bonds": 0.03,  # 3%
+    "International Bonds": 0.035,  # 3.5%
+    "US Large Cap": 0.08,  # 8%
+    "US Mid/Small Cap": 0.09,  # 9%
+    "International Equity": 0.075,  # 7.5%
+    "Real Estate": 0.06,  # 6%
+    "Cash": 0.015  # 1.5%
+}
+
+EXPECTED_VOLATILITY = {
+    "US Bonds": 0.05,  # 5%
+    "International Bonds": 0.06,  # 6%
+    "US Large Cap": 0.15,  # 15%
+    "US Mid/Small Cap": 0.20,  # 20%
+    "International Equity": 0.18,  # 18%
+    "Real Estate": 0.17,  # 17%
+    "Cash": 0.01  # 1%
+}
+
+# Simplified correlation matrix (in practice, this would be calculated from historical data)
+# This is a very basic approximation
+CORRELATION_MATRIX = np.array([
+    [1.0, 0.8, 0.2, 0.2, 0.2, 0.3, 0.1],  # US Bonds
+    [0.8, 1.0, 0.2, 0.2, 0.3, 0.3, 0.1],  # International Bonds
+    [0.2, 0.2, 1.0, 0.8, 0.8, 0.7, 0.0],  # US Large Cap
+    [0.2, 0.2, 0.8, 1.0, 0.7, 0.7, 0.0],  # US Mid/Small Cap
+    [0.2, 0.3, 0.8, 0.7, 1.0, 0.6, 0.0],  # International Equity
+    [0.3, 0.3, 0.7, 0.7, 0.6, 1.0, 0.1],  # Real Estate
+    [0.1, 0.1, 0.0, 0.0, 0.0, 0.1, 1.0]   # Cash
+])
+
+# Risk-free rate used for Sharpe ratios
+RISK_FREE_RATE = 0.015
+
+# Half-life in bars of the exponential weights of the covariance estimate
+COVARIANCE_HALFLIFE = 63
+
+def covariance_matrix():
     """
-    Generate an optimized portfolio based on the user's risk profile.
+    Build the covariance matrix of the asset classes from their expected
+    volatilities and correlations.
+    
+    Returns:
+        numpy.ndarray: Covariance matrix in ASSET_CLASSES order
+    """
+    volatility_vector = np.array([EXPECTED_VOLATILITY[asset] for asset in ASSET_CLASSES])
+    return np.outer(volatility_vector, volatility_vector) * CORRELATION_MATRIX
+
+def portfolio_result(risk_profile, allocation, portfolio_return, portfolio_volatility):
+    """
+    Assemble the result dictionary describing a portfolio.
     
     Args:
-        risk_profile (str): The user's risk profile (Conservative, Moderately Conservative, Moderate, Moderately Aggressive, Aggressive)
+        risk_profile (str): The user's risk profile
+        allocation (dict): Weight of each asset class
+        portfolio_return (float): Expected annual return
+        portfolio_volatility (float): Expected annual volatility
         
     Returns:
         dict: Portfolio allocation, expected returns, volatility, and more
     """
-    # Define asset allocation based on risk profile
-    allocation_maps = {
-        "Conservative": {
-            "US Bonds": 0.5,
-            "International Bonds": 0.15,
-            "US Large Cap": 0.15,
-            "US Mid/Small Cap": 0.05,
-            "International Equity": 0.1,
-            "Real Estate": 0.05,
-            "Cash": 0.0
-        },
-        "Moderately Conservative": {
-            "US Bonds": 0.40,
-            "International Bonds": 0.10,
-            "US Large Cap": 0.25,
-            "US Mid/Small Cap": 0.05,
-            "International Equity": 0.15,
-            "Real Estate": 0.05,
-            "Cash": 0.0
-        },
-        "Moderate": {
-            "US Bonds": 0.25,
-            "International Bonds": 0.10,
-            "US Large Cap": 0.30,
-            "US Mid/Small Cap": 0.10,
-            "International Equity": 0.20,
-            "Real Estate": 0.05,
-            "Cash": 0.0
-        },
-        "Moderately Aggressive": {
-            "US Bonds": 0.15,
-            "International Bonds": 0.05,
-            "US Large Cap": 0.35,
-            "US Mid/Small Cap": 0.15,
-            "International Equity": 0.25,
-            "Real Estate": 0.05,
-            "Cash": 0.0
-        },
-        "Aggressive": {
-            "US Bonds": 0.05,
-            "International Bonds": 0.05,
-            "US Large Cap": 0.40,
-            "US Mid/Small Cap": 0.15,
-            "International Equity": 0.30,
-            "Real Estate": 0.05,
-            "Cash": 0.0
-        }
+    return {
+        'risk_profile': risk_profile,
+        'asset_class': list(allocation.keys()),
+        'allocation': list(allocation.values()),
+        'example_tickers': [EXAMPLE_TICKERS[asset] for asset in allocation],
+        'descriptions': [DESCRIPTIONS[asset] for asset in allocation],
+        'expected_return': portfolio_return,
+        'expected_volatility': portfolio_volatility,
+        'sharpe_ratio': (portfolio_return - RISK_FREE_RATE) / portfolio_volatility
     }
+
+@lru_cache(maxsize=1)
+def get_asset_model():
+    """
+    Precompute the asset assumptions as arrays, once per process.
     
-    # Get the allocation for the user's risk profile
-    allocation = allocation_maps.get(risk_profile, allocation_maps["Moderate"])
-    
-    # Example ETFs for each asset class
-    example_tickers = {
-        "US Bonds": "AGG",  # iShares Core U.S. Aggregate Bond ETF
-        "International Bonds": "BNDX",  # Vanguard Total International Bond ETF
-        "US Large Cap": "VTI",  # Vanguard Total Stock Market ETF
-        "US Mid/Small Cap": "IJR",  # iShares Core S&P Small-Cap ETF
-        "International Equity": "VXUS",  # Vanguard Total International Stock ETF
-        "Real Estate": "VNQ",  # Vanguard Real Estate ETF
-        "Cash": "SHV"  # iShares Short Treasury Bond ETF
-    }
+    The arrays are shared by every caller and therefore read-only.
     
-    # Descriptions for each asset class
-    descriptions = {
-        "US Bonds": "U.S. investment-grade bonds for stable income and lower volatility",
-        "International Bonds": "Non-U.S. bonds for diversification and yield",
-        "US Large Cap": "Large U.S. companies for growth and stability",
-        "US Mid/Small Cap": "Smaller U.S. companies with higher growth potential",
-        "International Equity": "Non-U.S. stocks for global diversification",
-        "Real Estate": "REITs and real estate securities for income and inflation protection",
-        "Cash": "Short-term treasury securities for capital preservation"
+    Returns:
+        dict: 'assets' (ASSET_CLASSES), 'expected_returns' and 'volatility'
+              (vectors in that order) and 'cov_matrix'
+    """
+    model = {
+        'assets': tuple(ASSET_CLASSES),
+        'expected_returns': np.array([EXPECTED_RETURNS[asset] for asset in ASSET_CLASSES]),
+        'volatility': np.array([EXPECTED_VOLATILITY[asset] for asset in ASSET_CLASSES]),
+        'cov_matrix': covariance_matrix()
     }
+    for key in ('expected_returns', 'volatility', 'cov_matrix'):
+        model[key].flags.writeable = False
+    return model
+
+class CovarianceEstimator:
+    """
+    Covariance of the asset classes estimated from their proxy ETFs' returns.
     
-    # Calculate expected returns and volatility
-    # These are simplified assumptions based on historical data
-    expected_returns = {
-        "US Bonds": 0.03,  # 3%
-        "International Bonds": 0.035,  # 3.5%
-        "US Large Cap": 0.08,  # 8%
-        "US Mid/Small Cap": 0.09,  # 9%
-        "International Equity": 0.075,  # 7.5%
-        "Real Estate": 0.06,  # 6%
-        "Cash": 0.015  # 1.5%
-    }
+    The estimate of a window is a Ledoit-Wolf shrinkage fit on daily returns
+    weighted by λ^age, the newest bar having age 0, with the shrinkage
+    intensity taken from the weighted sample over its effective size. It only
+    depends on the window: each estimate keeps exponentially weighted sums of
+    the window's bars, so a later request ages the sums, adds the new bars and
+    subtracts the ones that left the window instead of refitting, and returns
+    the same matrix as a fit from scratch. With λ = 1 it is the plain
+    Ledoit-Wolf fit.
+    """
     
-    expected_volatility = {
-        "US Bonds": 0.05,  # 5%
-        "International Bonds": 0.06,  # 6%
-        "US Large Cap": 0.15,  # 15%
-        "US Mid/Small Cap": 0.20,  # 20%
-        "International Equity": 0.18,  # 18%
-        "Real Estate": 0.17,  # 17%
-        "Cash": 0.01  # 1%
-    }
+    def __init__(self, halflife=COVARIANCE_HALFLIFE):
+        """
+        Args:
+            halflife (float): Half-life of the weights in bars
+        """
+        self.decay = 0.5 ** (1.0 / halflife)
+        self.estimates = {}
+        self.lock = threading.Lock()
     
-    # Calculate portfolio expected return and volatility
-    portfolio_return = sum(allocation[asset] * expected_returns[asset] for asset in allocation)
-    
-    # Simplified correlation matrix (in practice, this would be calculated from historical data)
-    # This is a very basic approximation
-    correlation_matrix = np.array([
-        [1.0, 0.8, 0.2, 0.2, 0.2, 0.3, 0.1],  # US Bonds
-        [0.8, 1.0, 0.2, 0.2, 0.3, 0.3, 0.1],  # International Bonds
-        [0.2, 0.2, 1.0, 0.8, 0.8, 0.7, 0.0],  # US Large Cap
-        [0.2, 0.2, 0.8, 1.0, 0.7, 0.7, 0.0],  # US Mid/Small Cap
-        [0.2, 0.3, 0.8, 0.7, 1.0, 0.6, 0.0],  # International Equity
-        [0.3, 0.3, 0.7, 0.7, 0.6, 1.0, 0.1],  # Real Estate
-        [0.1, 0.1, 0.0, 0.0, 0.0, 0.1, 1.0]   # Cash
-    ])
-    
-    volatility_vector = np.array([expected_volatility[asset] for asset in allocation])
-    allocation_vector = np.array([allocation[asset] for asset in allocation])
-    
-    # Convert correlation matrix to covariance matrix
-    cov_matrix = np.outer(volatility_vector, volatility_vector) * correlation_matrix
-    
-    # Calculate portfolio volatility
-    portfolio_volatility = np.sqrt(allocation_vector.T @ cov_matrix @ allocation_vector)
-    
-    # Calculate Sharpe ratio (assuming risk-free rate of 1.5%)
-    risk_free_rate = 0.015
-    sharpe_ratio = (portfolio_return - risk_free_rate) / portfolio_volatility
-    
-    # Prepare the result
-    result = {
-        'risk_profile': risk_profile,
-        'asset_class': list(allocation.keys()),
-        'allocation': list(allocation.values()),
-        'example_tickers': [example_tickers[asset] for asset in allocation],
-        'descriptions': [descriptions[asset] for asset in allocation],
-        'expected_return': portfolio_return,
+    def _sums(self, returns, ages):
+        """
+        Weighted sums of the returns and their powers up to the fourth.
+        
+        Args:
+            returns (numpy.ndarray): Returns, one row per bar
+            ages (numpy.ndarray): Age of each bar, in bars
+            
+        Returns:
+            dict: Sums of λ^age, λ^(2 age), λ^age r, λ^age r r', λ^age |r|² r and λ^age |r|⁴
+        """
+        weights = self.decay ** ages
+        squares = np.einsum('ij,ij->i', returns, returns)
+        return {
+            'weight': weights.sum(),
+            'weight_squared': (weights ** 2).sum(),
+            'first': weights @ returns,
+            'second': (returns * weights[:, None]).T @ returns,
+            'third': (weights * squares) @ returns,
+            'fourth': weights @ squares ** 2
+        }
+    
+    def _covariance(self, sums):
+        """
+        Shrunk covariance of daily returns from the weighted sums of a window.
+        
+        Args:
+            sums (dict): Sums as returned by _sums
+            
+        Returns:
+            numpy.ndarray: Covariance of daily returns
+        """
+        total = sums['weight']
+        mean = sums['first'] / total
+        sample = sums['second'] / total - np.outer(mean, mean)
+        # Weighted mean of |r - m|⁴, expanded in the sums of powers of r
+        norm = mean @ mean
+        fourth = (sums['fourth'] - 4 * sums['third'] @ mean + 4 * mean @ sums['second'] @ mean
+                  + 2 * norm * np.trace(sums['second']) - 4 * norm * sums['first'] @ mean
+                  + norm ** 2 * total) / total
+        effective_size = total ** 2 / sums['weight_squared']
+        
+        target = np.trace(sample) / len(sample)
+        distance = np.sum((sample - target * np.eye(len(sample))) ** 2)
+        dispersion = min((fourth - np.sum(sample ** 2)) / effective_size, distance)
+        shrinkage = dispersion / distance if distance > 0 else 0.0
+        return (1 - shrinkage) * sample + shrinkage * target * np.eye(len(sample))
+    
+    def update(self, key, returns):
+        """
+        Return the covariance for a window, updated with any new bars.
+        
+        Args:
+            key (hashable): Identifies the window (e.g. provider and lookback)
+            returns (pandas.DataFrame): Daily returns of the window, one column per asset
+            
+        Returns:
+            numpy.ndarray: Annualized covariance matrix in the column order of returns
+        """
+        with self.lock:
+            estimate = self.estimates.get(key)
+            if (estimate is None or returns.index[0] < estimate['returns'].index[0]
+                    or returns.index[0] > estimate['returns'].index[-1]):
+                values = returns.to_numpy()
+                estimate = self.estimates[key] = {
+                    'returns': returns,
+                    'sums': self._sums(values, np.arange(len(values) - 1, -1, -1))
+                }
+            else:
+                held = estimate['returns']
+                new_returns = returns[returns.index > held.index[-1]]
+                dropped = held[held.index < returns.index[0]]
+                if len(new_returns) or len(dropped):
+                    count = len(new_returns)
+                    sums = estimate['sums']
+                    for name in sums:
+                        sums[name] = sums[name] * self.decay ** (2 * count if name == 'weight_squared' else count)
+                    added = self._sums(new_returns.to_numpy(), np.arange(count - 1, -1, -1))
+                    removed = self._sums(dropped.to_numpy(), len(held) + count - 1 - np.arange(len(dropped)))
+                    for name in sums:
+                        sums[name] = sums[name] + added[name] - removed[name]
+                    estimate['returns'] = pd.concat([held[held.index >= returns.index[0]], new_returns])
+            return self._covariance(estimate['sums']) * 252
+    
+    def clear(self):
+        """
+        Drop all estimates, so the next request refits from scratch.
+        """
+        with self.lock:
+            self.estimates.clear()
+
+# Estimates shared by all sessions of the app
+covariance_estimator = CovarianceEstimator()
+
+def get_historical_asset_model(days=365 * 3, provider=None):
+    """
+    Build the asset model with a covariance estimated from the proxy ETFs.
+    
+    Expected returns keep the long-run assumptions; volatilities and
+    correlations come from covariance_estimator, keyed by provider and window.
+    
+    Args:
+        days (int): Number of days of history to estimate from
+        provider (MarketDataProvider or str): Price source, defaults to data_providers.get_provider()
+        
+    Returns:
+        dict: Asset model like get_asset_model(), or None if the proxies' prices
+              could not be fetched
+    """
+    try:
+        provider = get_provider(provider)
+        tickers = [EXAMPLE_TICKERS[asset] for asset in ASSET_CLASSES]
+        market_data = get_market_data(tickers, days, provider)
+        if market_data is None or market_data['failures']:
+            return None
+        
+        returns = market_data['daily_returns'][tickers]
+        cov_matrix = covariance_estimator.update((provider.cache_key(), days), returns)
+        
+        model = dict(get_asset_model())
+        model['cov_matrix'] = cov_matrix
+        model['volatility'] = np.sqrt(np.diag(cov_matrix))
+        return model
+    except Exception as e:
+        print(f"Error estimating covariance: {str(e)}")
+        return None
+
+def evaluate_portfolios(weights, chunk_size=100000, model=None):
+    """
+    Score many allocations against the asset assumptions at once.
+    
+    Expected returns come from W @ μ and volatilities from one W @ Σ product
+    followed by a row-wise dot with W, so no per-portfolio Python work is done.
+    Rows are processed chunk_size at a time to bound the temporary memory.
+    
+    Args:
+        weights (numpy.ndarray or pandas.DataFrame): One row per portfolio and one
+            column per asset class; a DataFrame is matched by column name, with
+            missing asset classes treated as 0
+        chunk_size (int): Number of portfolios scored together
+        model (dict): Asset model, defaults to get_asset_model()
+        
+    Returns:
+        pandas.DataFrame: 'expected_return', 'expected_volatility' and 'sharpe_ratio'
+                          of each portfolio, indexed like weights
+    """
+    if model is None:
+        model = get_asset_model()
+    index = None
+    if isinstance(weights, pd.DataFrame):
+        index = weights.index
+        weights = weights.reindex(columns=list(model['assets']), fill_value=0.0)
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    
+    portfolio_returns = np.empty(len(weights))
+    portfolio_volatility = np.empty(len(weights))
+    for start in range(0, len(weights), chunk_size):
+        chunk = weights[start:start + chunk_size]
+        portfolio_returns[start:start + chunk_size] = chunk @ model['expected_returns']
+        variance = np.einsum('ij,ij->i', chunk @ model['cov_matrix'], chunk)
+        portfolio_volatility[start:start + chunk_size] = np.sqrt(np.maximum(variance, 0.0))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe_ratio = (portfolio_returns - RISK_FREE_RATE) / portfolio_volatility
+    
+    return pd.DataFrame({
+        'expected_return': portfolio_returns,
         'expected_volatility': portfolio_volatility,
         'sharpe_ratio': sharpe_ratio
-    }
+    }, index=index)
+
+def get_optimized_portfolio(risk_profile, model=None):
+    """
+    Generate an optimized portfolio based on the user's risk profile.
     
-    return result
+    Args:
+        risk_profile (str): The user's risk profile (Conservative, Moderately Conservative, Moderate, Moderately Aggressive, Aggressive)
+        model (dict): Asset model, defaults to get_asset_model(); pass
+                      get_historical_asset_model() for estimated risk
+        
+    Returns:
+        dict: Portfolio allocation, expected returns, volatility, and more
+    """
+    # Get the allocation for the user's risk profile
+    allocation = ALLOCATION_MAPS.get(risk_profile, ALLOCATION_MAPS["Moderate"])
+    
+    # Calculate portfolio expected return and volatility
+    if model is None:
+        model = get_asset_model()
+    allocation_vector = np.array([allocation[asset] for asset in model['assets']])
+    portfolio_return = allocation_vector @ model['expected_returns']
+    portfolio_volatility = np.sqrt(allocation_vector @ model['cov_matrix'] @ allocation_vector)
+    
+    return portfolio_result(risk_profile, allocation, portfolio_return, portfolio_volatility)
 
-def optimize_portfolio_monte_carlo(risk_profile, num_simulations=10000):
+def optimize_portfolio_monte_carlo(risk_profile, num_simulations=10000, batch_size=100000,
+                                   frontier_points=50, seed=None):
     """
-    Advanced optimization using Monte Carlo simulation.
-    Note: This function is provided for reference but not used in the current app.
-    In a production environment, this could replace the basic allocation approach.
+    Optimize the allocation for a risk profile by sampling random portfolios.
+    
+    Weights are drawn uniformly from the simplex (Dirichlet(1, ..., 1)) in
+    batches of batch_size portfolios. Return, volatility and Sharpe ratio of a
+    whole batch come from two matrix products, and only the running best
+    portfolio and the best portfolio of each volatility bucket are kept, so
+    memory stays at one batch regardless of num_simulations.
+    
+    The optimum is the portfolio with the highest expected return whose
+    volatility does not exceed that of the profile's reference allocation,
+    i.e. the sampled efficient portfolio for the profile's risk budget.
     
     Args:
         risk_profile (str): The user's risk profile
         num_simulations (int): Number of Monte Carlo simulations
+        batch_size (int): Number of portfolios scored together
+        frontier_points (int): Number of volatility buckets of the sampled frontier
+        seed (int): Seed for the random weights
+        
+    Returns:
+        dict: Optimized portfolio allocation and metrics, as returned by
+              get_optimized_portfolio, plus 'frontier' (DataFrame of the highest-return
+              portfolio per volatility bucket) and 'num_simulations'
+    """
+    model = get_asset_model()
+    expected_returns = model['expected_returns']
+    cov_matrix = model['cov_matrix']
+    num_assets = len(ASSET_CLASSES)
+    
+    # The profile's risk budget is the volatility of its reference allocation
+    reference = get_optimized_portfolio(risk_profile)
+    max_volatility = reference['expected_volatility']
+    
+    # Volatility buckets span the range any long-only portfolio can reach
+    volatility_range = np.sqrt(np.diag(cov_matrix)).max()
+    frontier_returns = np.full(frontier_points, -np.inf)
+    frontier_volatility = np.full(frontier_points, np.nan)
+    frontier_weights = np.zeros((frontier_points, num_assets))
+    
+    best_return = -np.inf
+    best_weights = best_volatility = None
+    
+    rng = np.random.default_rng(seed)
+    for start in range(0, num_simulations, batch_size):
+        size = min(batch_size, num_simulations - start)
+        
+        # Normalized exponential draws are Dirichlet(1, ..., 1) distributed
+        weights = rng.standard_exponential((size, num_assets))
+        weights /= weights.sum(axis=1, keepdims=True)
+        
+        returns = weights @ expected_returns
+        volatility = np.sqrt(np.einsum('ij,ij->i', weights @ cov_matrix, weights))
+        
+        candidates = np.where(volatility <= max_volatility, returns, -np.inf)
+        best = np.argmax(candidates)
+        if candidates[best] > best_return:
+            best_return, best_volatility = returns[best], volatility[best]
+            best_weights = weights[best]
+        
+        # Highest return of the batch in each volatility bucket
+        buckets = np.minimum((volatility / volatility_range * frontier_points).astype(int), frontier_points - 1)
+        order = np.lexsort((-returns, buckets))
+        leaders = order[np.r_[True, np.diff(buckets[order]) != 0]]
+        leader_buckets = buckets[leaders]
+        improved = returns[leaders] > frontier_returns[leader_buckets]
+        leaders, leader_buckets = leaders[improved], leader_buckets[improved]
+        frontier_returns[leader_buckets] = returns[leaders]
+        frontier_volatility[leader_buckets] = volatility[leaders]
+        frontier_weights[leader_buckets] = weights[leaders]
+    
+    # Fall back to the reference allocation if no sample met the risk budget
+    if best_weights is None:
+        result = reference
+    else:
+        allocation = dict(zip(ASSET_CLASSES, best_weights.tolist()))
+        result = portfolio_result(risk_profile, allocation, best_return, best_volatility)
+    
+    filled = np.isfinite(frontier_returns)
+    frontier = pd.DataFrame(frontier_weights[filled], columns=ASSET_CLASSES)
+    frontier.insert(0, 'sharpe_ratio', (frontier_returns[filled] - RISK_FREE_RATE) / frontier_volatility[filled])
+    frontier.insert(0, 'expected_volatility', frontier_volatility[filled])
+    frontier.insert(0, 'expected_return', frontier_returns[filled])
+    
+    result['frontier'] = frontier
+    result['num_simulations'] = num_simulations
+    return result
+
+def _as_covariance(cov_matrix):
+    """
+    Split a covariance matrix into its values and asset labels.
+    
+    Args:
+        cov_matrix (numpy.ndarray or pandas.DataFrame): Covariance matrix
+        
+    Returns:
+        tuple: (numpy.ndarray, labels) where labels are the DataFrame's columns
+               or the asset positions
+    """
+    if isinstance(cov_matrix, pd.DataFrame):
+        return cov_matrix.to_numpy(dtype=float), cov_matrix.columns
+    cov_matrix = np.asarray(cov_matrix, dtype=float)
+    return cov_matrix, pd.RangeIndex(len(cov_matrix))
+
+def equal_risk_contribution(cov_matrix, budgets=None, tolerance=1e-10, max_iterations=100):
+    """
+    Compute the long-only portfolio whose assets contribute equal risk.
+    
+    Solved with damped Newton steps on the convex problem
+    min 1/2 y'Σy - Σ b_i log(y_i), whose minimizer satisfies y_i (Σy)_i = b_i.
+    The Hessian Σ + diag(b / y²) is positive definite, so each step is one
+    Cholesky solve, and convergence is quadratic: a 2,000-asset universe takes
+    around ten iterations. Normalizing y gives the weights.
+    
+    Args:
+        cov_matrix (numpy.ndarray or pandas.DataFrame): Covariance matrix
+        budgets (numpy.ndarray): Risk budget of each asset, equal by default
+        tolerance (float): Maximum relative deviation of a risk contribution from its budget
+        max_iterations (int): Maximum number of Newton steps
+        
+    Returns:
+        pandas.Series: Weight of each asset, summing to 1
+    """
+    cov_matrix, labels = _as_covariance(cov_matrix)
+    num_assets = len(cov_matrix)
+    budgets = np.full(num_assets, 1.0 / num_assets) if budgets is None else np.asarray(budgets, dtype=float)
+    
+    def objective(y):
+        return 0.5 * y @ cov_matrix @ y - budgets @ np.log(y)
+    
+    # Inverse-volatility start, scaled so that the total risk matches the budgets
+    y = 1.0 / np.sqrt(np.diag(cov_matrix))
+    y *= np.sqrt(budgets.sum() / (y @ cov_matrix @ y))
+    value = objective(y)
+    
+    for _ in range(max_iterations):
+        product = cov_matrix @ y
+        if np.abs(y * product / budgets - 1).max() <= tolerance:
+            break
+        
+        gradient = product - budgets / y
+        hessian = cov_matrix + np.diag(budgets / y ** 2)
+        step = cho_solve(cho_factor(hessian), gradient)
+        decrement = gradient @ step
+        
+        # Backtrack to stay positive and decrease the objective
+        size = 1.0
+        while True:
+            candidate = y - size * step
+            if candidate.min() > 0:
+                candidate_value = objective(candidate)
+                if candidate_value <= value - 0.25 * size * decrement:
+                    break
+            size *= 0.5
+        y, value = candidate, candidate_value
+    
+    return pd.Series(y / y.sum(), index=labels)
+
+def hierarchical_risk_parity(cov_matrix, method='single'):
+    """
+    Compute the hierarchical risk parity portfolio.
+    
+    Assets are clustered on the correlation distance sqrt((1 - ρ) / 2) from
+    the condensed distance vector, ordered by the leaves of the dendrogram
+    (quasi-diagonalization), and weighted by recursive bisection: each half of
+    a cluster receives weight in inverse proportion to its inverse-variance
+    portfolio's variance. Memory stays O(n²) and nothing is inverted.
+    
+    Args:
+        cov_matrix (numpy.ndarray or pandas.DataFrame): Covariance matrix
+        method (str): Linkage method passed to scipy's linkage()
+        
+    Returns:
+        pandas.Series: Weight of each asset, summing to 1
+    """
+    cov_matrix, labels = _as_covariance(cov_matrix)
+    num_assets = len(cov_matrix)
+    volatility = np.sqrt(np.diag(cov_matrix))
+    
+    correlation = cov_matrix / np.outer(volatility, volatility)
+    distance = np.sqrt(np.clip((1.0 - correlation) / 2.0, 0.0, None))
+    np.fill_diagonal(distance, 0.0)
+    order = leaves_list(linkage(squareform(distance, checks=False), method=method))
+    del correlation, distance
+    
+    def cluster_variance(members):
+        inverse_variance = 1.0 / volatility[members] ** 2
+        inverse_variance /= inverse_variance.sum()
+        return inverse_variance @ cov_matrix[np.ix_(members, members)] @ inverse_variance
+    
+    weights = np.ones(num_assets)
+    clusters = [order] if num_assets > 1 else []
+    while clusters:
+        halves = []
+        for members in clusters:
+            middle = len(members) // 2
+            left, right = members[:middle], members[middle:]
+            left_variance, right_variance = cluster_variance(left), cluster_variance(right)
+            alpha = 1 - left_variance / (left_variance + right_variance)
+            weights[left] *= alpha
+            weights[right] *= 1 - alpha
+            halves.extend(half for half in (left, right) if len(half) > 1)
+        clusters = halves
+    
+    return pd.Series(weights / weights.sum(), index=labels)
+
+def get_risk_parity_portfolio(method='erc', model=None):
+    """
+    Build a risk-based allocation of the asset classes.
+    
+    Args:
+        method (str): 'erc' for equal risk contribution or 'hrp' for
+                      hierarchical risk parity
+        model (dict): Asset model, defaults to get_asset_model()
         
     Returns:
-        dict: Optimized portfolio allocation and metrics
+        dict: Portfolio allocation, expected returns, volatility, and more, as
+              returned by get_optimized_portfolio
     """
-    # This would be a more sophisticated implementation using Monte Carlo simulation
-    # to find an optimal portfolio on the efficient frontier.
+    if model is None:
+        model = get_asset_model()
+    cov_matrix = pd.DataFrame(model['cov_matrix'], index=model['assets'], columns=model['assets'])
     
-    # For the purpose of the example app, we use the simpler approach above.
-    # In a real implementation, this would involve:
-    # 1. Getting historical return data for each asset class
-    # 2. Calculating covariance matrix
-    # 3. Generating random portfolio weights many times
-    # 4. Finding the portfolio that maximizes Sharpe ratio for the given risk profile
+    if method == 'erc':
+        weights = equal_risk_contribution(cov_matrix)
+        label = "Equal Risk Contribution"
+    elif method == 'hrp':
+        weights = hierarchical_risk_parity(cov_matrix)
+        label = "Hierarchical Risk Parity"
+    else:
+        raise ValueError(f"Unknown risk parity method: {method}")
     
-    # This would be implemented if requested as an enhancement
-    pass
+    metrics = evaluate_portfolios(weights.to_frame().T, model=model).iloc[0]
+    return portfolio_result(label, weights.to_dict(), metrics['expected_return'], metrics['expected_volatility'])
@@ -0,0 +1,264 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Directory holding one Parquet file of adjusted closing prices per ticker.
+# Can be overridden with the WEALTH_SAGE_CACHE_DIR environment variable.
+CACHE_DIR = os.environ.get(
+    'WEALTH_SAGE_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'prices')
+)
+
+# Relative change of a re-fetched adjusted close above which the cached history
+# of its ticker is considered rescaled (by a dividend or split) and discarded
+ADJUSTMENT_TOLERANCE = 1e-5
+
+def _cache_path(ticker, cache_dir=None):
+    """
+    Return the Parquet file path used to store a ticker's price history.
+
+    Args:
+        ticker (str): Ticker symbol
+        cache_dir (str): Cache directory (defaults to CACHE_DIR)
+
+    Returns:
+        str: Path of the ticker's cache file
+    """
+    safe_name = ticker.replace(os.sep, '_')
+    return os.path.join(cache_dir or CACHE_DIR, f"{safe_name}.parquet")
+
+def load_cached_prices(ticker, cache_dir=None):
+    """
+    Load the stored price history for a ticker.
+
+    Args:
+        ticker (str): Ticker symbol
+        cache_dir (str): Cache directory (defaults to CACHE_DIR)
+
+    Returns:
+        tuple: (prices, covered_from, covered_to) where prices is a pandas.Series
+               indexed by date and [covered_from, covered_to) is the date range that
+               has already been fetched, or None if nothing is cached
+    """
+    path = _cache_path(ticker, cache_dir)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        frame = pd.read_parquet(path)
+        covered_from = pd.Timestamp(frame.attrs['covered_from'])
+        covered_to = pd.Timestamp(frame.attrs['covered_to'])
+    except Exception as e:
+        print(f"Ignoring unreadable price cache for {ticker}: {str(e)}")
+        return None
+
+    return frame[ticker], covered_from, covered_to
+
+def save_cached_prices(ticker, prices, covered_from, covered_to, cache_dir=None):
+    """
+    Store the price history for a ticker together with the range it covers.
+
+    The file is written to a temporary path first and then moved into place, so
+    concurrent readers never see a partially written file.
+
+    Args:
+        ticker (str): Ticker symbol
+        prices (pandas.Series): Adjusted closing prices indexed by date
+        covered_from (pandas.Timestamp): First date of the fetched range
+        covered_to (pandas.Timestamp): End of the fetched range (exclusive)
+        cache_dir (str): Cache directory (defaults to CACHE_DIR)
+    """
+    path = _cache_path(ticker, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    frame = prices.rename(ticker).to_frame()
+    frame.attrs = {
+        'covered_from': covered_from.isoformat(),
+        'covered_to': covered_to.isoformat()
+    }
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        frame.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _missing_ranges(start, end, covered_from, covered_to):
+    """
+    Work out which parts of [start, end) are not yet covered by the cache.
+
+    The cache records a single contiguous covered range, so a request that
+    does not touch it also fetches the gap in between; the covered range can
+    then grow to include the request without claiming bars never fetched.
+
+    Args:
+        start (pandas.Timestamp): Requested start date
+        end (pandas.Timestamp): Requested end date (exclusive)
+        covered_from (pandas.Timestamp): Start of the cached range
+        covered_to (pandas.Timestamp): End of the cached range (exclusive)
+
+    Returns:
+        list: List of (start, end) tuples that still have to be fetched
+    """
+    ranges = []
+    if start < covered_from:
+        ranges.append((start, covered_from))
+    if end > covered_to:
+        ranges.append((covered_to, end))
+    return ranges
+
+def _with_overlap(fetch_range, prices, covered_from, covered_to):
+    """
+    Extend a missing range by one cached bar on the side touching the cache.
+
+    Adjusted closes are rescaled over the whole history after every dividend
+    and split, so each delta fetch re-reads the nearest cached bar to check
+    that the cache is still on the provider's current scale.
+
+    Args:
+        fetch_range (tuple): (start, end) of a range from _missing_ranges
+        prices (pandas.Series): Cached prices of the ticker
+        covered_from (pandas.Timestamp): Start of the cached range
+        covered_to (pandas.Timestamp): End of the cached range (exclusive)
+
+    Returns:
+        tuple: (start, end) of the range to fetch
+    """
+    range_start, range_end = fetch_range
+    if prices.empty:
+        return fetch_range
+    if range_end == covered_from:
+        range_end = prices.index[0] + pd.Timedelta(days=1)
+    if range_start == covered_to:
+        range_start = prices.index[-1]
+    return range_start, range_end
+
+def _rescaled(cached, bars):
+    """
+    Check whether re-fetched bars disagree with the cached ones for the same dates.
+
+    Args:
+        cached (pandas.Series): Cached prices of a ticker
+        bars (pandas.Series): Newly fetched prices of the ticker
+
+    Returns:
+        bool: True if any common date moved by more than ADJUSTMENT_TOLERANCE
+    """
+    common = cached.index.intersection(bars.index)
+    if common.empty:
+        return False
+    return not np.allclose(bars[common], cached[common], rtol=ADJUSTMENT_TOLERANCE, atol=0)
+
+def get_cached_prices(tickers, start, end, fetch, cache_dir=None, failures=None):
+    """
+    Return adjusted closing prices, reading the on-disk cache first and fetching
+    only the date ranges that are missing from it.
+
+    Tickers that need the same missing range are fetched together, so a warm
+    request usually costs at most one small delta download (the bars published
+    since the previous request) or none at all. Every delta includes one
+    cached bar; when the provider's adjusted close for it has changed, the
+    ticker's history is discarded and the whole request fetched again.
+
+    Args:
+        tickers (list): List of ticker symbols
+        start (str or datetime): First date to return
+        end (str or datetime): End date (exclusive)
+        fetch (callable): Function fetch(tickers, start, end) returning a
+                          DataFrame of prices with one column per ticker, or a
+                          dict with 'prices' and per-ticker 'failures' as
+                          returned by bulk_download.bulk_download
+        cache_dir (str): Cache directory (defaults to CACHE_DIR)
+        failures (dict): Optional dict that receives an error message for every
+                         ticker that could not be fetched
+
+    Returns:
+        pandas.DataFrame: Prices indexed by date with one column per ticker
+    """
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize()
+
+    # Read whatever is cached and plan the delta fetches
+    cached = {}
+    plan = {}
+    for ticker in tickers:
+        entry = load_cached_prices(ticker, cache_dir)
+        if entry is None:
+            cached[ticker] = (pd.Series(index=pd.DatetimeIndex([]), dtype=float), start, end)
+            ranges = [(start, end)]
+        else:
+            cached[ticker] = entry
+            ranges = [
+                _with_overlap(fetch_range, *entry)
+                for fetch_range in _missing_ranges(start, end, entry[1], entry[2])
+            ]
+
+        for fetch_range in ranges:
+            plan.setdefault(fetch_range, []).append(ticker)
+
+    failed = {}
+
+    def fetch_plan(plan):
+        # Fetch the missing ranges, one call per distinct range
+        fetched = {}
+        for (range_start, range_end), range_tickers in plan.items():
+            if range_start >= range_end:
+                continue
+            try:
+                data = fetch(range_tickers, range_start, range_end)
+            except Exception as e:
+                print(f"Error fetching prices for {', '.join(range_tickers)}: {str(e)}")
+                failed.update({ticker: str(e) for ticker in range_tickers})
+                continue
+
+            if isinstance(data, dict):
+                failed.update(data['failures'])
+                data = data['prices']
+
+            for ticker in range_tickers:
+                if data is not None and ticker in data:
+                    fetched.setdefault(ticker, []).append(data[ticker].dropna())
+        return fetched
+
+    fetched = fetch_plan(plan)
+
+    # Discard the history of tickers whose adjusted closes have been rescaled
+    stale = [
+        ticker for ticker, bars in fetched.items()
+        if any(_rescaled(cached[ticker][0], ticker_bars) for ticker_bars in bars)
+    ]
+    if stale:
+        print(f"Adjusted prices changed for {', '.join(stale)}, fetching their history again")
+        for ticker in stale:
+            cached[ticker] = (pd.Series(index=pd.DatetimeIndex([]), dtype=float), start, end)
+            del fetched[ticker]
+        fetched.update(fetch_plan({(start, end): stale}))
+
+    # Merge the new bars into the cache and assemble the result
+    columns = {}
+    for ticker in tickers:
+        prices, covered_from, covered_to = cached[ticker]
+
+        if ticker in fetched:
+            prices = pd.concat([prices] + fetched[ticker]).astype(float)
+            prices = prices[~prices.index.duplicated(keep='last')].sort_index()
+
+        # Extend the covered range even when a delta fetch returned no bars
+        # (weekends, holidays), so the same gap is not requested again
+        if ticker not in failed and not prices.empty:
+            new_from, new_to = min(covered_from, start), max(covered_to, end)
+            if ticker in fetched or (new_from, new_to) != (covered_from, covered_to):
+                save_cached_prices(ticker, prices, new_from, new_to, cache_dir)
+
+        if not prices.empty:
+            columns[ticker] = prices[(prices.index >= start) & (prices.index < end)]
+
+    if failures is not None:
+        failures.update(failed)
+
+    result = pd.concat(columns, axis=1) if columns else pd.DataFrame(index=pd.DatetimeIndex([]))
+    return result.dropna(how='all')
@@ -0,0 +1,191 @@
+import os
+import json
+import functools
+import pandas as pd
+import numpy as np
+
+# Directory holding the memory-mapped price panels.
+# Can be overridden with the WEALTH_SAGE_PANEL_DIR environment variable.
+PANEL_DIR = os.environ.get(
+    'WEALTH_SAGE_PANEL_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'panel')
+)
+
+class PricePanel:
+    """
+    Memory-mapped dates x tickers price matrix with a ticker index.
+
+    The matrix is stored column-major (one contiguous run of prices per
+    ticker) in a .npy file and opened read-only with numpy.memmap, so every
+    process that opens the same panel shares one physical copy through the OS
+    page cache. Date ranges, single tickers and runs of adjacent tickers are
+    returned as zero-copy views; only an arbitrary selection of tickers has to
+    copy the selected columns.
+    """
+
+    def __init__(self, values, dates, tickers):
+        """
+        Args:
+            values (numpy.ndarray): Prices with shape (len(dates), len(tickers))
+            dates (pandas.DatetimeIndex): Sorted dates of the rows
+            tickers (list): Ticker symbols of the columns
+        """
+        self.values = values
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.ticker_index = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    @classmethod
+    def write(cls, path, prices, dtype=np.float64):
+        """
+        Write a price DataFrame to disk as a panel and open it.
+
+        Args:
+            path (str): Directory to write the panel to
+            prices (pandas.DataFrame): Prices indexed by date with one column per ticker
+            dtype (numpy.dtype): Storage type of the prices
+
+        Returns:
+            PricePanel: The newly written panel, opened read-only
+        """
+        os.makedirs(path, exist_ok=True)
+        prices = prices.sort_index()
+
+        # Write to temporary files and move them into place, so processes that
+        # still map the previous panel keep reading intact data
+        values_path = os.path.join(path, 'values.npy')
+        values = np.lib.format.open_memmap(
+            values_path + '.tmp', mode='w+', dtype=dtype,
+            shape=prices.shape, fortran_order=True
+        )
+        for j, ticker in enumerate(prices.columns):
+            values[:, j] = prices[ticker].to_numpy(dtype=dtype)
+        values.flush()
+        del values
+
+        dates_path = os.path.join(path, 'dates.npy')
+        with open(dates_path + '.tmp', 'wb') as f:
+            np.save(f, prices.index.values.astype('datetime64[ns]').view(np.int64))
+
+        tickers_path = os.path.join(path, 'tickers.json')
+        with open(tickers_path + '.tmp', 'w') as f:
+            json.dump([str(ticker) for ticker in prices.columns], f)
+
+        for final_path in (values_path, dates_path, tickers_path):
+            os.replace(final_path + '.tmp', final_path)
+        open_panel.cache_clear()
+
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Open a panel written by PricePanel.write() without loading it into memory.
+
+        Args:
+            path (str): Directory holding the panel
+
+        Returns:
+            PricePanel: Read-only panel backed by the files on disk
+        """
+        values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r')
+        dates = pd.to_datetime(np.load(os.path.join(path, 'dates.npy')))
+        with open(os.path.join(path, 'tickers.json')) as f:
+            tickers = json.load(f)
+        return cls(values, dates, tickers)
+
+    def _rows(self, start=None, end=None):
+        """
+        Translate a date range into a row slice.
+
+        Args:
+            start (datetime): First date to include
+            end (datetime): End date (exclusive)
+
+        Returns:
+            slice: Rows of the requested dates
+        """
+        first = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start))
+        last = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end))
+        return slice(first, last)
+
+    def _columns(self, tickers=None):
+        """
+        Translate a ticker selection into a column selector, preferring a slice.
+
+        Args:
+            tickers (list): Tickers to select, None for all
+
+        Returns:
+            slice or numpy.ndarray: Slice when the tickers are adjacent, else indices
+        """
+        if tickers is None:
+            return slice(None)
+
+        indices = np.array([self.ticker_index[ticker] for ticker in tickers], dtype=int)
+        if len(indices) > 0 and np.array_equal(indices, np.arange(indices[0], indices[0] + len(indices))):
+            return slice(indices[0], indices[0] + len(indices))
+        return indices
+
+    def column(self, ticker, start=None, end=None):
+        """
+        Return one ticker's prices as a zero-copy view.
+
+        Args:
+            ticker (str): Ticker symbol
+            start (datetime): First date to include
+            end (datetime): End date (exclusive)
+
+        Returns:
+            numpy.ndarray: Read-only view of the prices
+        """
+        return self.values[self._rows(start, end), self.ticker_index[ticker]]
+
+    def select(self, tickers=None, start=None, end=None):
+        """
+        Return the prices of some tickers over a date range.
+
+        Args:
+            tickers (list): Tickers to select, None for all
+            start (datetime): First date to include
+            end (datetime): End date (exclusive)
+
+        Returns:
+            numpy.ndarray: Prices with shape (dates, tickers), a view unless the
+                           tickers are not adjacent in the panel
+        """
+        return self.values[self._rows(start, end), self._columns(tickers)]
+
+    def frame(self, tickers=None, start=None, end=None):
+        """
+        Return the prices of some tickers over a date range as a DataFrame.
+
+        The DataFrame wraps the array returned by select() without copying it.
+
+        Args:
+            tickers (list): Tickers to select, None for all
+            start (datetime): First date to include
+            end (datetime): End date (exclusive)
+
+        Returns:
+            pandas.DataFrame: Prices indexed by date with one column per ticker
+        """
+        rows = self._rows(start, end)
+        columns = self.tickers if tickers is None else list(tickers)
+        return pd.DataFrame(
+            self.values[rows, self._columns(tickers)],
+            index=self.dates[rows], columns=columns, copy=False
+        )
+
+@functools.lru_cache(maxsize=None)
+def open_panel(path=PANEL_DIR):
+    """
+    Open a panel once per process and share it between all callers.
+
+    Args:
+        path (str): Directory holding the panel
+
+    Returns:
+        PricePanel: Shared read-only panel
+    """
+    return PricePanel.open(path)
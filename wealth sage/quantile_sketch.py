@@ -0,0 +1,79 @@
+import numpy as np
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch for many series of positive values.
+
+    Values are counted in logarithmic buckets [γ^(i-1), γ^i) with
+    γ = (1 + α) / (1 - α), as in DDSketch, so every quantile is returned
+    within a relative error α of the exact one whatever the number of values.
+    Memory is fixed by the value range and α: one counter per bucket and
+    series, independent of how many values are added. Values outside
+    [min_value, max_value] are counted in the outermost buckets.
+    """
+
+    def __init__(self, num_series, min_value, max_value, relative_accuracy=0.005):
+        """
+        Args:
+            num_series (int): Number of independent series (e.g. time steps)
+            min_value (float): Smallest value resolved, must be positive
+            max_value (float): Largest value resolved
+            relative_accuracy (float): Relative error α of the quantiles
+        """
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.offset = int(np.floor(np.log(min_value) / self.log_gamma))
+        self.num_buckets = int(np.ceil(np.log(max_value) / self.log_gamma)) - self.offset + 1
+        self.counts = np.zeros((num_series, self.num_buckets), dtype=np.int64)
+
+    def add(self, values):
+        """
+        Count a chunk of values.
+
+        Args:
+            values (numpy.ndarray): One row per observation and one column per series
+        """
+        values = np.asarray(values, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            buckets = np.ceil(np.log(values) / self.log_gamma) - self.offset
+        buckets = np.clip(np.nan_to_num(buckets, nan=0.0, neginf=0.0), 0, self.num_buckets - 1).astype(np.int64)
+
+        # One bincount over (series, bucket) pairs for the whole chunk
+        num_series = self.counts.shape[0]
+        flat = buckets + np.arange(num_series) * self.num_buckets
+        self.counts += np.bincount(flat.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+    def merge(self, other):
+        """
+        Add the counts of a sketch built with the same parameters.
+
+        Args:
+            other (QuantileSketch): Sketch to merge into this one
+        """
+        self.counts += other.counts
+
+    @property
+    def count(self):
+        """int: Number of observations added to each series"""
+        return int(self.counts[0].sum())
+
+    def quantile(self, q):
+        """
+        Estimate quantiles of every series.
+
+        Args:
+            q (float or list): Quantile level(s) between 0 and 1
+
+        Returns:
+            numpy.ndarray: Estimates shaped (len(q), num_series), or (num_series,)
+                           for a single level
+        """
+        levels = np.atleast_1d(q)
+        cumulative = np.cumsum(self.counts, axis=1)
+        ranks = levels[:, None] * (cumulative[:, -1] - 1)
+
+        # First bucket whose cumulative count exceeds the rank of the quantile
+        buckets = (cumulative[None, :, :] <= ranks[:, :, None]).sum(axis=2)
+        index = buckets + self.offset
+        estimates = 2 * self.gamma ** index / (self.gamma + 1)
+        return estimates if np.ndim(q) else estimates[0]
@@ -0,0 +1,201 @@
+import pandas as pd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+def _window_sums(values, windows):
+    """
+    Compute trailing-window sums of every column for several window lengths.
+
+    Each sum comes from the difference of two cumulative sums, so a window of
+    any length costs the same single subtraction per element. Windows that
+    contain a missing value are NaN, like pandas' rolling() with the default
+    min_periods.
+
+    Args:
+        values (numpy.ndarray): Values with one row per bar and one column per series
+        windows (list): Window lengths in bars
+
+    Returns:
+        dict: Mapping of window length to an array shaped like values
+    """
+    valid = ~np.isnan(values)
+    padded = np.zeros((values.shape[0] + 1,) + values.shape[1:])
+    counts = np.zeros_like(padded)
+    np.cumsum(np.where(valid, values, 0.0), axis=0, out=padded[1:])
+    np.cumsum(valid, axis=0, out=counts[1:])
+
+    sums = {}
+    for window in windows:
+        result = np.full(values.shape, np.nan)
+        if window <= values.shape[0]:
+            window_sum = padded[window:] - padded[:-window]
+            window_count = counts[window:] - counts[:-window]
+            result[window - 1:] = np.where(window_count == window, window_sum, np.nan)
+        sums[window] = result
+    return sums
+
+def rolling_volatility(returns, windows=(21, 63, 252), periods_per_year=252):
+    """
+    Compute annualized rolling volatility for several window lengths.
+
+    Args:
+        returns (pandas.DataFrame): Periodic returns with one column per ticker
+        windows (list): Window lengths in bars
+        periods_per_year (int): Bars per year, used for annualization
+
+    Returns:
+        dict: Mapping of window length to a DataFrame of volatilities in percent
+    """
+    values = returns.to_numpy(dtype=float)
+    sums = _window_sums(values, windows)
+    sums_sq = _window_sums(values ** 2, windows)
+
+    result = {}
+    for window in windows:
+        variance = (sums_sq[window] - sums[window] ** 2 / window) / (window - 1)
+        volatility = np.sqrt(np.maximum(variance, 0.0) * periods_per_year) * 100
+        result[window] = pd.DataFrame(volatility, index=returns.index, columns=returns.columns)
+    return result
+
+def rolling_sharpe(returns, windows=(21, 63, 252), periods_per_year=252, risk_free_rate=0.0):
+    """
+    Compute annualized rolling Sharpe ratios for several window lengths.
+
+    Args:
+        returns (pandas.DataFrame): Periodic returns with one column per ticker
+        windows (list): Window lengths in bars
+        periods_per_year (int): Bars per year, used for annualization
+        risk_free_rate (float): Annual risk-free rate
+
+    Returns:
+        dict: Mapping of window length to a DataFrame of Sharpe ratios
+    """
+    values = returns.to_numpy(dtype=float) - risk_free_rate / periods_per_year
+    sums = _window_sums(values, windows)
+    sums_sq = _window_sums(values ** 2, windows)
+
+    result = {}
+    for window in windows:
+        mean = sums[window] / window
+        variance = (sums_sq[window] - sums[window] ** 2 / window) / (window - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = mean * np.sqrt(periods_per_year) / np.sqrt(np.maximum(variance, 0.0))
+        result[window] = pd.DataFrame(sharpe, index=returns.index, columns=returns.columns)
+    return result
+
+def rolling_beta(returns, benchmark='SPY', windows=(63, 252)):
+    """
+    Compute rolling betas against a benchmark for several window lengths.
+
+    Args:
+        returns (pandas.DataFrame): Periodic returns with one column per ticker
+        benchmark (str or pandas.Series): Column of returns to use as the benchmark,
+                                          or the benchmark's own returns
+        windows (list): Window lengths in bars
+
+    Returns:
+        dict: Mapping of window length to a DataFrame of betas
+    """
+    if isinstance(benchmark, str):
+        benchmark = returns[benchmark]
+    values = returns.to_numpy(dtype=float)
+    market = benchmark.reindex(returns.index).to_numpy(dtype=float)[:, None]
+
+    # Mask the benchmark wherever a ticker is missing so that every sum
+    # runs over the same bars
+    market = np.where(np.isnan(values), np.nan, market)
+    sums = _window_sums(values, windows)
+    market_sums = _window_sums(market, windows)
+    cross_sums = _window_sums(values * market, windows)
+    market_sums_sq = _window_sums(market ** 2, windows)
+
+    result = {}
+    for window in windows:
+        covariance = cross_sums[window] - sums[window] * market_sums[window] / window
+        variance = market_sums_sq[window] - market_sums[window] ** 2 / window
+        with np.errstate(divide='ignore', invalid='ignore'):
+            beta = covariance / variance
+        result[window] = pd.DataFrame(beta, index=returns.index, columns=returns.columns)
+    return result
+
+def underwater(prices):
+    """
+    Compute the drawdown from the running peak at every bar.
+
+    Args:
+        prices (pandas.DataFrame): Prices with one column per ticker
+
+    Returns:
+        pandas.DataFrame: Drawdowns as negative fractions (0 at a new peak)
+    """
+    values = prices.ffill().to_numpy(dtype=float)
+    peaks = np.fmax.accumulate(values, axis=0)
+    return pd.DataFrame(values / peaks - 1, index=prices.index, columns=prices.columns)
+
+def max_drawdown(prices):
+    """
+    Compute the maximum drawdown over the whole period.
+
+    Args:
+        prices (pandas.DataFrame): Prices with one column per ticker
+
+    Returns:
+        pandas.Series: Maximum drawdown per ticker as a negative fraction
+    """
+    return underwater(prices).min()
+
+def rolling_max_drawdown(prices, window=252, chunk_size=8):
+    """
+    Compute the maximum drawdown within each trailing window.
+
+    Every window is a strided view into the price array; running peaks are
+    accumulated along the window axis for a chunk of tickers at a time, which
+    bounds the temporary memory to chunk_size * len(prices) * window values.
+
+    Args:
+        prices (pandas.DataFrame): Prices with one column per ticker
+        window (int): Window length in bars
+        chunk_size (int): Number of tickers processed together
+
+    Returns:
+        pandas.DataFrame: Maximum drawdown of the window ending at each bar
+    """
+    values = prices.ffill().to_numpy(dtype=float)
+    result = np.full(values.shape, np.nan)
+    if window > values.shape[0]:
+        return pd.DataFrame(result, index=prices.index, columns=prices.columns)
+
+    for start in range(0, values.shape[1], chunk_size):
+        chunk = values[:, start:start + chunk_size]
+        # (bars - window + 1, tickers, window) view, no data is copied
+        windows = sliding_window_view(chunk, window, axis=0)
+        peaks = np.maximum.accumulate(windows, axis=2)
+        result[window - 1:, start:start + chunk_size] = (windows / peaks - 1).min(axis=2)
+
+    return pd.DataFrame(result, index=prices.index, columns=prices.columns)
+
+def rolling_analytics(prices, windows=(21, 63, 252), benchmark='SPY', periods_per_year=252):
+    """
+    Compute the full set of rolling analytics for a price panel.
+
+    Args:
+        prices (pandas.DataFrame): Prices with one column per ticker
+        windows (list): Window lengths in bars
+        benchmark (str or pandas.Series): Benchmark column or returns for beta,
+                                          skipped if the column is not in prices
+        periods_per_year (int): Bars per year, used for annualization
+
+    Returns:
+        dict: Dictionary with rolling volatility, Sharpe and beta (each keyed by
+              window length), the underwater curve and the maximum drawdown
+    """
+    returns = prices.pct_change(fill_method=None).iloc[1:]
+    has_benchmark = not isinstance(benchmark, str) or benchmark in prices.columns
+
+    return {
+        'volatility': rolling_volatility(returns, windows, periods_per_year),
+        'sharpe': rolling_sharpe(returns, windows, periods_per_year),
+        'beta': rolling_beta(returns, benchmark, windows) if has_benchmark else None,
+        'underwater': underwater(prices),
+        'max_drawdown': max_drawdown(prices)
+    }
@@ -0,0 +1,210 @@
+import pandas as pd
+import numpy as np
+
+def pairwise_correlation(pair_count, pair_sum, pair_sum_sq, cross):
+    """
+    Turn pairwise sufficient statistics into a correlation matrix.
+
+    Entry [i, j] of each statistic only includes observations where both
+    series i and j are present, which gives the same result as pandas'
+    pairwise-complete DataFrame.corr().
+
+    Args:
+        pair_count (numpy.ndarray): Number of joint observations
+        pair_sum (numpy.ndarray): Sum of x_i over joint observations
+        pair_sum_sq (numpy.ndarray): Sum of x_i^2 over joint observations
+        cross (numpy.ndarray): Sum of x_i * x_j over joint observations
+
+    Returns:
+        numpy.ndarray: Correlation matrix (NaN where it is undefined)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = np.where(pair_count >= 2, pair_count, np.nan)
+        covariance = cross - pair_sum * pair_sum.T / n
+        variance = pair_sum_sq - pair_sum ** 2 / n
+        correlation = covariance / np.sqrt(variance * variance.T)
+    return np.clip(correlation, -1.0, 1.0)
+
+class StreamingMetrics:
+    """
+    Incrementally maintained return, volatility, Sharpe and correlation metrics.
+
+    Instead of keeping the return history, the engine keeps running sums per
+    ticker (count, sum, sum of squares) and per pair (joint count, sums and
+    cross-products). Appending a bar costs O(n) for the per-ticker metrics and
+    O(n^2) for the correlation update, independent of the history length.
+
+    Returns are measured against the last available price of each ticker, so a
+    missing bar simply merges into the next return.
+    """
+
+    def __init__(self, tickers, periods_per_year=252, track_correlation=True):
+        """
+        Args:
+            tickers (list): List of ticker symbols
+            periods_per_year (int): Bars per year, used for annualization
+            track_correlation (bool): Whether to maintain the pairwise statistics
+        """
+        self.tickers = list(tickers)
+        self.periods_per_year = periods_per_year
+        self.track_correlation = track_correlation
+
+        n = len(self.tickers)
+        self.first_price = np.full(n, np.nan)
+        self.last_price = np.full(n, np.nan)
+        self.last_date = None
+
+        self.count = np.zeros(n)
+        self.sum = np.zeros(n)
+        self.sum_sq = np.zeros(n)
+
+        if track_correlation:
+            self.pair_count = np.zeros((n, n))
+            self.pair_sum = np.zeros((n, n))
+            self.pair_sum_sq = np.zeros((n, n))
+            self.cross = np.zeros((n, n))
+
+    @classmethod
+    def from_prices(cls, prices, periods_per_year=252, track_correlation=True):
+        """
+        Build an engine from a price history in one vectorized pass.
+
+        Args:
+            prices (pandas.DataFrame): Prices indexed by date with one column per ticker
+            periods_per_year (int): Bars per year, used for annualization
+            track_correlation (bool): Whether to maintain the pairwise statistics
+
+        Returns:
+            StreamingMetrics: Engine holding the statistics of the whole history
+        """
+        engine = cls(prices.columns, periods_per_year, track_correlation)
+        engine.extend(prices)
+        return engine
+
+    def _returns(self, values):
+        """
+        Compute returns of a block of prices against the last known prices.
+
+        Args:
+            values (numpy.ndarray): Prices, one row per bar
+
+        Returns:
+            numpy.ndarray: Returns, NaN where a ticker has no price or no prior price
+        """
+        previous = np.vstack([self.last_price, values[:-1]])
+        previous = pd.DataFrame(previous).ffill().to_numpy()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = values / previous - 1
+
+        # Remember the first and last price seen for each ticker
+        seen = ~np.isnan(values)
+        has_price = seen.any(axis=0)
+        first_rows = seen.argmax(axis=0)
+        last_rows = len(values) - 1 - seen[::-1].argmax(axis=0)
+        columns = np.arange(values.shape[1])
+        new_first = np.isnan(self.first_price) & has_price
+        self.first_price[new_first] = values[first_rows, columns][new_first]
+        self.last_price[has_price] = values[last_rows, columns][has_price]
+
+        return returns
+
+    def extend(self, prices):
+        """
+        Fold a block of bars into the statistics.
+
+        Args:
+            prices (pandas.DataFrame): Prices indexed by date, columns in ticker order
+        """
+        values = prices[self.tickers].to_numpy(dtype=float)
+        if len(values) == 0:
+            return
+
+        returns = self._returns(values)
+        mask = ~np.isnan(returns)
+        filled = np.where(mask, returns, 0.0)
+
+        self.count += mask.sum(axis=0)
+        self.sum += filled.sum(axis=0)
+        self.sum_sq += (filled ** 2).sum(axis=0)
+
+        if self.track_correlation:
+            weights = mask.astype(float)
+            self.pair_count += weights.T @ weights
+            self.pair_sum += filled.T @ weights
+            self.pair_sum_sq += (filled ** 2).T @ weights
+            self.cross += filled.T @ filled
+
+        self.last_date = prices.index[-1]
+
+    def append(self, prices, date=None):
+        """
+        Fold a single new bar into the statistics.
+
+        Args:
+            prices (pandas.Series or dict): Latest price per ticker
+            date (datetime): Timestamp of the bar
+        """
+        values = pd.Series(prices, dtype=float).reindex(self.tickers).to_numpy()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = values / self.last_price - 1
+
+        has_price = ~np.isnan(values)
+        new_first = np.isnan(self.first_price) & has_price
+        self.first_price[new_first] = values[new_first]
+        self.last_price[has_price] = values[has_price]
+
+        mask = ~np.isnan(returns)
+        filled = np.where(mask, returns, 0.0)
+
+        self.count += mask
+        self.sum += filled
+        self.sum_sq += filled ** 2
+
+        if self.track_correlation:
+            weights = mask.astype(float)
+            self.pair_count += np.outer(weights, weights)
+            self.pair_sum += np.outer(filled, weights)
+            self.pair_sum_sq += np.outer(filled ** 2, weights)
+            self.cross += np.outer(filled, filled)
+
+        if date is not None:
+            self.last_date = date
+
+    @property
+    def mean(self):
+        """pandas.Series: Mean return per bar"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return pd.Series(self.sum / self.count, index=self.tickers)
+
+    @property
+    def std(self):
+        """pandas.Series: Sample standard deviation of returns per bar"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n = np.where(self.count >= 2, self.count, np.nan)
+            variance = (self.sum_sq - self.sum ** 2 / n) / (n - 1)
+        return pd.Series(np.sqrt(np.maximum(variance, 0.0)), index=self.tickers)
+
+    @property
+    def volatility(self):
+        """pandas.Series: Annualized volatility in percent"""
+        return self.std * np.sqrt(self.periods_per_year) * 100
+
+    @property
+    def sharpe(self):
+        """pandas.Series: Annualized Sharpe ratio (0% risk-free rate)"""
+        return (self.mean * self.periods_per_year) / (self.std * np.sqrt(self.periods_per_year))
+
+    @property
+    def total_return(self):
+        """pandas.Series: Return since the first bar in percent"""
+        return pd.Series((self.last_price / self.first_price - 1) * 100, index=self.tickers)
+
+    @property
+    def correlation(self):
+        """pandas.DataFrame: Pairwise correlation of returns"""
+        if not self.track_correlation:
+            raise ValueError("Correlation tracking is disabled for this engine")
+        matrix = pairwise_correlation(self.pair_count, self.pair_sum, self.pair_sum_sq, self.cross)
+        return pd.DataFrame(matrix, index=self.tickers, columns=self.tickers)
@@ -0,0 +1,208 @@
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from financial_data import get_market_data
+from portfolio_optimizer import ASSET_CLASSES, EXAMPLE_TICKERS, FALLBACK_TICKERS
+
+# Instantaneous shocks, as the return of each asset class over the episode.
+# Historical figures are approximate peak-to-trough returns of the proxy
+# asset classes; the rate shock is a hypothetical parallel +200bp move.
+SCENARIOS = {
+    "2008 Financial Crisis": {
+        "US Bonds": 0.05,
+        "International Bonds": 0.03,
+        "US Large Cap": -0.51,
+        "US Mid/Small Cap": -0.55,
+        "International Equity": -0.58,
+        "Real Estate": -0.68,
+        "Cash": 0.02
+    },
+    "2020 COVID Crash": {
+        "US Bonds": -0.01,
+        "International Bonds": -0.02,
+        "US Large Cap": -0.34,
+        "US Mid/Small Cap": -0.41,
+        "International Equity": -0.34,
+        "Real Estate": -0.42,
+        "Cash": 0.003
+    },
+    "2022 Inflation Bear Market": {
+        "US Bonds": -0.17,
+        "International Bonds": -0.14,
+        "US Large Cap": -0.25,
+        "US Mid/Small Cap": -0.24,
+        "International Equity": -0.28,
+        "Real Estate": -0.33,
+        "Cash": 0.01
+    },
+    "Rate Shock (+200bp)": {
+        "US Bonds": -0.12,
+        "International Bonds": -0.14,
+        "US Large Cap": -0.10,
+        "US Mid/Small Cap": -0.13,
+        "International Equity": -0.09,
+        "Real Estate": -0.18,
+        "Cash": 0.0
+    }
+}
+
+# Historical windows replayed day by day from the proxy tickers' prices
+HISTORICAL_WINDOWS = {
+    "2008 Financial Crisis": ("2008-09-01", "2009-03-09"),
+    "2020 COVID Crash": ("2020-02-19", "2020-03-23"),
+    "2022 Rate Shock": ("2022-01-03", "2022-10-14")
+}
+
+def _weight_matrix(weights):
+    """
+    Arrange portfolios as a weights matrix over the asset classes.
+
+    Args:
+        weights (pandas.DataFrame or dict): One row per portfolio and one column
+            per asset class, or a mapping of portfolio name to an allocation dict;
+            missing asset classes are 0
+
+    Returns:
+        pandas.DataFrame: Portfolios x ASSET_CLASSES weights
+    """
+    if isinstance(weights, dict):
+        weights = pd.DataFrame.from_dict(weights, orient='index')
+    return weights.reindex(columns=ASSET_CLASSES, fill_value=0.0).fillna(0.0)
+
+def scenario_matrix(scenarios=None):
+    """
+    Arrange shock scenarios as a matrix over the asset classes.
+
+    Args:
+        scenarios (dict): Mapping of scenario name to the return of each asset
+                          class, defaults to SCENARIOS
+
+    Returns:
+        pandas.DataFrame: Scenarios x ASSET_CLASSES returns
+    """
+    if scenarios is None:
+        scenarios = SCENARIOS
+    return pd.DataFrame.from_dict(scenarios, orient='index').reindex(columns=ASSET_CLASSES, fill_value=0.0)
+
+def stress_test(weights, scenarios=None):
+    """
+    Apply instantaneous shocks to many portfolios at once.
+
+    The whole book is evaluated with a single scenarios x portfolios matrix
+    product of the shock returns and the portfolio weights.
+
+    Args:
+        weights (pandas.DataFrame or dict): Portfolios, see _weight_matrix
+        scenarios (dict): Mapping of scenario name to asset-class returns,
+                          defaults to SCENARIOS
+
+    Returns:
+        pandas.DataFrame: Return of each portfolio (columns) in each scenario (rows)
+    """
+    weights = _weight_matrix(weights)
+    shocks = scenario_matrix(scenarios)
+    return pd.DataFrame(shocks.to_numpy() @ weights.to_numpy().T, index=shocks.index, columns=weights.index)
+
+def get_historical_scenarios(windows=None, provider=None):
+    """
+    Fetch the daily asset-class returns of historical stress windows.
+
+    Asset-class returns are those of the proxy tickers in EXAMPLE_TICKERS,
+    or of their FALLBACK_TICKERS for windows that start before a proxy was
+    launched. A window for which an asset class has neither is reported and
+    left out rather than replayed with that asset class held flat.
+
+    Args:
+        windows (dict): Mapping of scenario name to (start, end) dates,
+                        defaults to HISTORICAL_WINDOWS
+        provider (MarketDataProvider or str): Price source, defaults to data_providers.get_provider()
+
+    Returns:
+        dict: Mapping of scenario name to a DataFrame of daily returns with one
+              column per asset class, or None if the prices could not be fetched
+    """
+    if windows is None:
+        windows = HISTORICAL_WINDOWS
+
+    earliest = min(pd.Timestamp(start) for start, _ in windows.values())
+    days = (datetime.now() - earliest).days + 7
+    candidates = {
+        asset: [EXAMPLE_TICKERS[asset]] + ([FALLBACK_TICKERS[asset]] if asset in FALLBACK_TICKERS else [])
+        for asset in ASSET_CLASSES
+    }
+    market_data = get_market_data(sorted({ticker for tickers in candidates.values() for ticker in tickers}),
+                                  days, provider)
+    if market_data is None:
+        return None
+    prices = market_data['prices']
+
+    scenarios = {}
+    for name, (start, end) in windows.items():
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        # The window starts at the last close on or before its start date
+        history = prices[prices.index <= end]
+        first = history.index.searchsorted(start, side='right') - 1
+        window = history.iloc[max(first, 0):]
+
+        columns, missing = {}, []
+        for asset in ASSET_CLASSES:
+            covering = [
+                ticker for ticker in candidates[asset]
+                if first >= 0 and ticker in window and pd.notna(window[ticker].iloc[0])
+            ]
+            if covering:
+                columns[asset] = window[covering[0]]
+            else:
+                missing.append(asset)
+
+        if missing:
+            print(f"Skipping {name}: no prices for {', '.join(missing)} on {start.date()}")
+            continue
+
+        # Bars missing inside the window (e.g. exchange holidays) carry the last price
+        window = pd.DataFrame(columns).ffill()
+        scenarios[name] = window.pct_change(fill_method=None).iloc[1:]
+
+    return scenarios
+
+def stress_test_paths(weights, scenarios, keep_paths=True):
+    """
+    Replay path-dependent scenarios on many buy-and-hold portfolios at once.
+
+    For each scenario, the cumulative growth of every asset class comes from
+    one vectorized cumulative product over the days, and the value path of
+    every portfolio from one (days x assets) @ (assets x portfolios) product.
+    Drawdowns use a running maximum along the same axis.
+
+    Args:
+        weights (pandas.DataFrame or dict): Portfolios, see _weight_matrix
+        scenarios (dict): Mapping of scenario name to a DataFrame of daily
+                          asset-class returns, e.g. from get_historical_scenarios()
+        keep_paths (bool): Also return the value paths; turn off for large books,
+                           whose paths take days x portfolios memory per scenario
+
+    Returns:
+        dict: 'total_return' and 'max_drawdown' (DataFrames of scenarios x
+              portfolios) and 'paths' (mapping of scenario name to a DataFrame of
+              portfolio values relative to the start, empty unless keep_paths)
+    """
+    weights = _weight_matrix(weights)
+    weight_values = weights.to_numpy().T
+
+    total_returns, drawdowns, paths = {}, {}, {}
+    for name, returns in scenarios.items():
+        returns = returns.reindex(columns=ASSET_CLASSES, fill_value=0.0)
+        growth = np.cumprod(1.0 + returns.to_numpy(), axis=0)
+        values = np.vstack([np.ones((1, len(ASSET_CLASSES))), growth]) @ weight_values
+        peaks = np.maximum.accumulate(values, axis=0)
+
+        total_returns[name] = values[-1] / values[0] - 1
+        drawdowns[name] = (values / peaks - 1).min(axis=0)
+        if keep_paths:
+            paths[name] = pd.DataFrame(values[1:], index=returns.index, columns=weights.index)
+
+    return {
+        'total_return': pd.DataFrame.from_dict(total_returns, orient='index', columns=weights.index),
+        'max_drawdown': pd.DataFrame.from_dict(drawdowns, orient='index', columns=weights.index),
+        'paths': paths
+    }
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+from backtest import backtest_allocation, backtest_grid, backtest_profiles, rebalancing_rules, splice_fallbacks
+from data_providers import FixtureProvider, SyntheticProvider
+from market_data_cache import market_data_cache
+from portfolio_optimizer import EXAMPLE_TICKERS, FALLBACK_TICKERS
+
+WEIGHTS = {'AAA': 0.5, 'BBB': 0.3, 'CCC': 0.2}
+
+@pytest.fixture
+def prices():
+    return SyntheticProvider().download(list(WEIGHTS), '2015-01-01', '2020-01-01')
+
+def reference_backtest(prices, weights, frequency, threshold, cost):
+    """Bar-by-bar backtest holding units of each ticker between rebalancings."""
+    tickers = list(weights)
+    targets = np.array([weights[ticker] for ticker in tickers])
+    values = prices[tickers].to_numpy()
+    periods = prices.index.to_period(frequency) if frequency else None
+
+    units = targets / values[0]
+    portfolio, rebalances = [1.0], []
+    for bar in range(1, len(values)):
+        value = units @ values[bar]
+        candidate = (periods[bar] != periods[bar - 1]) if frequency else threshold is not None
+        if candidate:
+            drift = units * values[bar] / value - targets
+            if threshold is None or np.abs(drift).max() > threshold:
+                value *= 1 - cost * np.abs(drift).sum()
+                units = targets * value / values[bar]
+                rebalances.append(prices.index[bar])
+        portfolio.append(value)
+    return pd.Series(portfolio, index=prices.index), pd.DatetimeIndex(rebalances)
+
+@pytest.mark.parametrize('frequency, threshold', [
+    ('M', None), ('Q', None), ('Y', 0.02), ('M', 0.05), (None, 0.03), (None, None)
+])
+def test_backtest_matches_reference_loop(prices, frequency, threshold):
+    result = backtest_allocation(prices, WEIGHTS, frequency, threshold, cost=0.002)
+    value, rebalances = reference_backtest(prices, WEIGHTS, frequency, threshold, 0.002)
+    pdt.assert_series_equal(result['value'], value, check_freq=False, rtol=1e-10)
+    pdt.assert_index_equal(result['rebalance_dates'], rebalances, exact=False)
+
+def test_grid_is_independent_of_worker_count(prices):
+    allocations = {'balanced': WEIGHTS, 'tilted': {'AAA': 0.8, 'CCC': 0.2}}
+    rules = rebalancing_rules(frequencies=('M', None), thresholds=(None, 0.05))
+    serial = backtest_grid(prices, allocations, rules, max_workers=1)
+    pooled = backtest_grid(prices, allocations, rules, max_workers=2)
+    pdt.assert_frame_equal(serial, pooled)
+
+def test_splice_follows_fallback_returns_before_launch():
+    index = pd.bdate_range('2020-01-01', periods=10)
+    prices = pd.DataFrame({'NEW': [np.nan] * 4 + [50.0, 51, 52, 53, 54, 55],
+                           'OLD': [10.0, 11, 12, 13, 14, 15, 16, 17, 18, 19]}, index=index)
+    spliced = splice_fallbacks(prices, {'NEW': 'OLD'})
+    pdt.assert_series_equal(spliced['NEW'].iloc[4:], prices['NEW'].iloc[4:])
+    pdt.assert_series_equal(spliced['NEW'].pct_change().iloc[1:5], prices['OLD'].pct_change().iloc[1:5],
+                              check_names=False)
+
+def test_profiles_cover_history_before_late_proxies():
+    market_data_cache.clear()
+    tickers = sorted(set(EXAMPLE_TICKERS.values()) | set(FALLBACK_TICKERS.values()))
+    end = pd.Timestamp.today().normalize()
+    prices = SyntheticProvider().download(tickers, end - pd.Timedelta(days=365 * 6), end)
+    # BNDX and VXUS launch three years into the history
+    launch = end - pd.Timedelta(days=365 * 3)
+    prices.loc[prices.index < launch, ['BNDX', 'VXUS']] = np.nan
+
+    result = backtest_profiles(rules=[{'frequency': 'Q'}], days=365 * 5,
+                               provider=FixtureProvider(prices), max_workers=1)
+    market_data_cache.clear()
+    assert (result['start'] < launch - pd.Timedelta(days=365)).all()
+    assert (result['start'] <= end - pd.Timedelta(days=365 * 5 - 7)).all()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bulk_download import bulk_download
+from data_providers import FixtureProvider, MarketDataProvider
+from financial_data import get_market_data
+from market_data_cache import market_data_cache
+
+class EmptyProvider(MarketDataProvider):
+    """Provider that knows no ticker, answering like YahooFinanceProvider."""
+    name = 'empty'
+
+    def download(self, tickers, start, end, interval='1d'):
+        return pd.DataFrame()
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    market_data_cache.clear()
+    yield
+    market_data_cache.clear()
+
+@pytest.fixture
+def fixture_provider():
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=60)
+    rng = np.random.default_rng(0)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(index), 2)), axis=0)),
+                          index=index, columns=['A', 'B'])
+    return FixtureProvider(prices)
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_missing_tickers_are_reported(fixture_provider, bulk):
+    market_data = get_market_data(['A', 'ZZZ'], 30, fixture_provider, bulk=bulk)
+    assert market_data['failures'] == {'ZZZ': 'No data returned'}
+    assert list(market_data['prices'].columns) == ['A']
+
+def test_all_invalid_chunk_is_reported():
+    result = bulk_download(['ZZZ', 'YYY'], '2024-03-04', '2024-03-09', EmptyProvider(), rate_limit=None)
+    assert set(result['failures']) == {'ZZZ', 'YYY'}
+    assert result['prices'].empty
+
+def test_range_without_business_day_is_not_a_failure():
+    # Saturday to Monday (exclusive)
+    result = bulk_download(['A'], '2024-03-09', '2024-03-11', EmptyProvider(), rate_limit=None)
+    assert result['failures'] == {}
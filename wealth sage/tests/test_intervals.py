@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+from data_providers import SyntheticProvider
+from financial_data import get_market_data
+from intervals import compact_prices, resample_prices
+from market_data_cache import market_data_cache
+
+TICKERS = ['SPY', 'AGG']
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    market_data_cache.clear()
+    yield
+    market_data_cache.clear()
+
+@pytest.mark.parametrize('interval', ['1m', '5m', '1h'])
+def test_resampled_intraday_matches_daily(interval):
+    provider = SyntheticProvider()
+    daily = provider.download(TICKERS, '2024-03-01', '2024-04-01')
+    intraday = provider.download(TICKERS, '2024-03-01', '2024-04-01', interval)
+    pdt.assert_frame_equal(resample_prices(intraday, '1d'), daily, check_freq=False, check_index_type=False, rtol=1e-12)
+
+def test_resample_matches_pandas():
+    intraday = SyntheticProvider().download(TICKERS, '2024-03-01', '2024-03-08', '5m')
+    intraday.iloc[::7, 0] = np.nan
+    # Buckets without a price for a ticker carry its previous close
+    expected = intraday.ffill().resample('1h').last().dropna(how='all')
+    pdt.assert_frame_equal(resample_prices(intraday, '1h'), expected, check_freq=False, check_index_type=False)
+
+def test_market_data_resamples_to_daily():
+    provider = SyntheticProvider()
+    intraday = get_market_data(TICKERS, days=10, provider=provider, interval='5m')
+    daily = get_market_data(TICKERS, days=10, provider=provider)
+    assert intraday.prices.dtypes.eq(np.float32).all()
+    resampled = intraday.resample('1d').prices
+    common = resampled.index.intersection(daily.prices.index)
+    assert len(common) >= 5
+    np.testing.assert_allclose(resampled.loc[common], daily.prices.loc[common], rtol=1e-6)
+
+def test_compact_prices_use_utc_nanoseconds_and_float32():
+    index = pd.date_range('2024-03-01 09:30', periods=4, freq='1h', tz='America/New_York')
+    prices = compact_prices(pd.DataFrame({'SPY': [1.0, 2.0, 3.0, 4.0]}, index=index))
+    assert prices['SPY'].dtype == np.float32
+    assert prices.index.tz is None and prices.index.unit == 'ns'
+    assert prices.index[0] == pd.Timestamp('2024-03-01 14:30')
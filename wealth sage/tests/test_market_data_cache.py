@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+from data_providers import FixtureProvider
+from financial_data import get_market_data
+from market_data_cache import PanelCache, market_data_cache
+
+class CountingProvider(FixtureProvider):
+    """Fixture provider that counts its downloads."""
+
+    def __init__(self, prices):
+        super().__init__(prices)
+        self.downloads = 0
+
+    def download(self, tickers, start, end, interval='1d'):
+        self.downloads += 1
+        return super().download(tickers, start, end, interval)
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    market_data_cache.clear()
+    yield
+    market_data_cache.clear()
+
+@pytest.fixture
+def crypto_and_stock():
+    # BTC trades every day, AAPL only on weekdays
+    index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=120, freq='D')
+    rng = np.random.default_rng(0)
+    prices = pd.DataFrame({
+        'BTC': 100 * np.exp(np.cumsum(rng.normal(0, 0.03, len(index)))),
+        'AAPL': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    }, index=index)
+    prices.loc[index.dayofweek >= 5, 'AAPL'] = np.nan
+    return prices
+
+@pytest.mark.parametrize('days', [27, 28, 30])
+def test_cached_subset_matches_direct_fetch(crypto_and_stock, days):
+    direct = get_market_data(['AAPL'], days, FixtureProvider(crypto_and_stock))
+
+    provider = CountingProvider(crypto_and_stock)
+    get_market_data(['BTC', 'AAPL'], days, provider)
+    cached = get_market_data(['AAPL'], days, provider)
+
+    assert provider.downloads == 1
+    pdt.assert_frame_equal(cached['prices'], direct['prices'])
+    pdt.assert_frame_equal(cached['normalized'], direct['normalized'])
+    pdt.assert_series_equal(cached['volatility'], direct['volatility'])
+    assert not cached['normalized'].isna().all().any()
+
+def test_failed_panels_are_not_cached():
+    cache = PanelCache()
+    index = pd.date_range('2024-01-01', periods=30)
+    good = pd.DataFrame({'SPY': 1.0, 'QQQ': 2.0, 'IWM': 3.0}, index=index)
+
+    def failing():
+        return pd.DataFrame(index=pd.DatetimeIndex([])), {'SPY': 'upstream error'}
+
+    def partial():
+        return good[['QQQ', 'IWM']], {'SPY': 'upstream error'}
+
+    prices, failures = cache.get('fixture', ['SPY', 'QQQ', 'IWM'], '2024-01-01', '2024-01-31', failing)
+    assert prices.empty and failures
+    cache.get('fixture', ['SPY', 'QQQ', 'IWM'], '2024-01-01', '2024-01-31', partial)
+
+    # The provider has recovered: narrower and identical requests are fetched again
+    prices, failures = cache.get('fixture', ['SPY'], '2024-01-05', '2024-01-15', lambda: (good[['SPY']], {}))
+    assert list(prices.columns) == ['SPY'] and len(prices) == 10 and not failures
+    prices, failures = cache.get('fixture', ['SPY', 'QQQ', 'IWM'], '2024-01-01', '2024-01-31',
+                                 lambda: (good, {}))
+    assert prices.shape == (30, 3) and not failures
+
+def test_narrower_request_is_sliced_from_cached_panel():
+    cache = PanelCache()
+    index = pd.date_range('2024-01-01', periods=30)
+    good = pd.DataFrame({'SPY': 1.0, 'QQQ': 2.0}, index=index)
+    cache.get('fixture', ['SPY', 'QQQ'], '2024-01-01', '2024-01-31', lambda: (good, {}))
+
+    def unexpected():
+        raise AssertionError("covered request was fetched")
+
+    prices, _ = cache.get('fixture', ['QQQ'], '2024-01-10', '2024-01-20', unexpected)
+    pdt.assert_frame_equal(prices, good.loc['2024-01-10':'2024-01-19', ['QQQ']])
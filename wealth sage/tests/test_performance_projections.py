@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+from scipy.special import ndtr
+from scipy.stats import qmc
+
+pytest.importorskip('streamlit')
+
+from performance_projections import (
+    REBALANCE_PERIODS, SOBOL_DIMENSIONS, _asset_factor, _chunk_plan, _draw_normals, project_portfolio_performance,
+    simulate_multi_asset_paths, simulate_paths, simulate_quantiles
+)
+
+PORTFOLIO = {
+    'expected_return': 0.07,
+    'expected_volatility': 0.12,
+    'asset_class': ['US Large Cap', 'US Bonds', 'International Equity'],
+    'allocation': [0.5, 0.3, 0.2]
+}
+
+@pytest.mark.parametrize('sampling', [None, 'antithetic', 'sobol'])
+def test_paths_are_identical_for_any_worker_count(sampling, monkeypatch):
+    # Small chunks, so that the paths are spread over many workers
+    monkeypatch.setattr('performance_projections.CHUNK_VALUES', 2000)
+    serial = simulate_paths(10000, 0.07, 0.15, 10, 3000, steps_per_year=12, seed=5,
+                            max_workers=1, sampling=sampling)
+    for max_workers in (2, 3, 8):
+        parallel = simulate_paths(10000, 0.07, 0.15, 10, 3000, steps_per_year=12, seed=5,
+                                  max_workers=max_workers, sampling=sampling)
+        np.testing.assert_array_equal(parallel, serial)
+
+def test_sketches_are_identical_for_any_worker_count():
+    levels = [0.05, 0.5, 0.95]
+    serial = simulate_quantiles(10000, 0.07, 0.15, 10, 5000, chunk_size=256, seed=5, max_workers=1)
+    parallel = simulate_quantiles(10000, 0.07, 0.15, 10, 5000, chunk_size=256, seed=5, max_workers=4)
+    np.testing.assert_array_equal(parallel.quantile(levels), serial.quantile(levels))
+
+@pytest.mark.parametrize('multi_asset', [False, True])
+def test_projection_is_identical_for_any_worker_count(multi_asset):
+    results = [
+        project_portfolio_performance(PORTFOLIO, monte_carlo_sims=2000, steps_per_year=12, seed=42,
+                                      max_workers=max_workers, multi_asset=multi_asset)['monte_carlo']
+        for max_workers in (1, 4)
+    ]
+    np.testing.assert_array_equal(results[0]['simulations'], results[1]['simulations'])
+    for key in ('percentiles', 'standard_errors'):
+        for level in results[0][key]:
+            np.testing.assert_array_equal(results[0][key][level], results[1][key][level])
+
+def test_seed_leaves_global_random_state_alone():
+    np.random.seed(0)
+    expected = np.random.random()
+    np.random.seed(0)
+    simulate_paths(10000, 0.07, 0.15, 5, 100, seed=1)
+    assert np.random.random() == expected
+
+def reference_multi_asset_paths(allocation, initial_investment, years, num_paths, steps_per_year, rebalance, seed):
+    """Step-by-step simulation resetting the holdings to their targets at the end of every period."""
+    assets = tuple(asset for asset, weight in allocation.items() if weight)
+    weights = np.array([allocation[asset] for asset in assets])
+    expected_returns, factor = _asset_factor(assets)
+    total_steps = years * steps_per_year
+    steps_per_period = total_steps if rebalance is None else steps_per_year // REBALANCE_PERIODS[rebalance]
+
+    paths = []
+    for seed_sequence, size, _ in _chunk_plan(num_paths, total_steps * len(assets), seed):
+        shocks = _draw_normals(seed_sequence, size, total_steps * len(assets))
+        for path_shocks in shocks.reshape(size, total_steps, len(assets)):
+            holdings = initial_investment * weights
+            path = [initial_investment]
+            for step, shock in enumerate(path_shocks, 1):
+                holdings = holdings * (1 + expected_returns / steps_per_year + factor @ shock / np.sqrt(steps_per_year))
+                if step % steps_per_year == 0:
+                    path.append(holdings.sum())
+                if step % steps_per_period == 0:
+                    holdings = holdings.sum() * weights
+            paths.append(path)
+    return np.array(paths)
+
+@pytest.mark.parametrize('rebalance', ['monthly', 'quarterly', 'annual', None])
+def test_multi_asset_paths_match_naive_loop(rebalance):
+    allocation = dict(zip(PORTFOLIO['asset_class'], PORTFOLIO['allocation']))
+    values = simulate_multi_asset_paths(allocation, 10000, 3, 40, steps_per_year=12, rebalance=rebalance, seed=3)
+    reference = reference_multi_asset_paths(allocation, 10000, 3, 40, 12, rebalance, seed=3)
+    np.testing.assert_allclose(values, reference, rtol=1e-10)
+
+def test_rebalancing_must_fit_the_steps():
+    with pytest.raises(ValueError):
+        simulate_multi_asset_paths({'US Bonds': 1.0}, 10000, 2, 10, steps_per_year=6, rebalance='quarterly')
+
+def test_sobol_shocks_are_stratified():
+    shocks = _draw_normals(np.random.SeedSequence(0), 64, 12, 'sobol')
+    # Every dimension puts exactly one point in each of 64 equal-probability bins
+    bins = np.floor(ndtr(shocks) * 64).astype(int)
+    for column in bins.T:
+        assert sorted(column) == list(range(64))
+
+def test_sobol_paths_beyond_the_sobol_dimension_limit():
+    dimensions = qmc.Sobol.MAXDIM + 100
+    shocks = _draw_normals(np.random.SeedSequence(1), 8, dimensions, 'sobol')
+    assert shocks.shape == (8, dimensions) and np.isfinite(shocks).all()
+    assert dimensions > SOBOL_DIMENSIONS
+    # 100 years of daily steps draw more shocks per path than Sobol' points have dimensions
+    values = simulate_paths(10000, 0.07, 0.15, 100, 4, steps_per_year=252, seed=1, sampling='sobol')
+    assert values.shape == (4, 101) and np.isfinite(values).all()
+
+def test_antithetic_shocks_are_mirrored():
+    shocks = _draw_normals(np.random.SeedSequence(2), 10, 6, 'antithetic')
+    np.testing.assert_array_equal(shocks[5:], -shocks[:5])
+
+def test_control_variate_reduces_standard_errors():
+    results = {
+        control_variate: project_portfolio_performance(PORTFOLIO, monte_carlo_sims=4000, steps_per_year=12,
+                                                       seed=42, control_variate=control_variate)['monte_carlo']
+        for control_variate in (False, True)
+    }
+    for level in results[False]['standard_errors']:
+        plain, controlled = results[False]['standard_errors'][level][1:], results[True]['standard_errors'][level][1:]
+        assert (controlled < plain / 2).all()
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.cluster.hierarchy import linkage
+from scipy.spatial.distance import squareform
+from sklearn.covariance import LedoitWolf
+from data_providers import SyntheticProvider
+from portfolio_optimizer import (
+    ASSET_CLASSES, EXAMPLE_TICKERS, CovarianceEstimator, equal_risk_contribution, hierarchical_risk_parity
+)
+
+TICKERS = [EXAMPLE_TICKERS[asset] for asset in ASSET_CLASSES]
+
+@pytest.fixture
+def returns():
+    prices = SyntheticProvider().download(TICKERS, '2018-01-01', '2022-01-01')
+    return prices.pct_change().iloc[1:]
+
+def test_without_decay_estimate_is_ledoit_wolf(returns):
+    estimate = CovarianceEstimator(halflife=np.inf).update('window', returns)
+    np.testing.assert_allclose(estimate, LedoitWolf().fit(returns.to_numpy()).covariance_ * 252, rtol=1e-9)
+
+def test_warm_estimate_matches_cold_fit(returns):
+    warm = CovarianceEstimator()
+    # Slide a 500-bar window forward by uneven steps, as daily requests would
+    for end in [500, 501, 505, 530, 600, 750]:
+        window = returns.iloc[end - 500:end]
+        estimate = warm.update('window', window)
+        cold = CovarianceEstimator().update('window', window)
+        np.testing.assert_allclose(estimate, cold, rtol=1e-9)
+
+def test_estimate_weights_recent_bars_more(returns):
+    calm = returns.iloc[:500].copy()
+    stressed = calm.copy()
+    stressed.iloc[-50:] *= 3
+    estimator = CovarianceEstimator()
+    assert np.trace(estimator.update('stressed', stressed)) > 2 * np.trace(estimator.update('calm', calm))
+
+def random_covariance(num_assets, seed=0):
+    """Covariance with a few common factors, like that of asset returns."""
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.1, (num_assets, 3))
+    return loadings @ loadings.T + np.diag(rng.uniform(0.01, 0.05, num_assets))
+
+def reference_hrp(cov_matrix):
+    """Hierarchical risk parity as in López de Prado's recursion."""
+    volatility = np.sqrt(np.diag(cov_matrix))
+    distance = np.sqrt(np.clip((1 - cov_matrix / np.outer(volatility, volatility)) / 2, 0, None))
+    np.fill_diagonal(distance, 0)
+    links = linkage(squareform(distance, checks=False), method='single')
+    num_assets = len(cov_matrix)
+
+    def quasi_diagonal(node):
+        if node < num_assets:
+            return [node]
+        left, right = links[node - num_assets, :2].astype(int)
+        return quasi_diagonal(left) + quasi_diagonal(right)
+
+    def cluster_variance(members):
+        block = cov_matrix[np.ix_(members, members)]
+        inverse_variance = 1 / np.diag(block)
+        inverse_variance /= inverse_variance.sum()
+        return inverse_variance @ block @ inverse_variance
+
+    weights = pd.Series(1.0, index=range(num_assets))
+    clusters = [quasi_diagonal(2 * num_assets - 2)]
+    while clusters:
+        clusters = [cluster[start:stop] for cluster in clusters
+                    for start, stop in ((0, len(cluster) // 2), (len(cluster) // 2, len(cluster)))
+                    if len(cluster) > 1]
+        for i in range(0, len(clusters), 2):
+            left, right = clusters[i], clusters[i + 1]
+            left_variance, right_variance = cluster_variance(left), cluster_variance(right)
+            alpha = 1 - left_variance / (left_variance + right_variance)
+            weights[left] *= alpha
+            weights[right] *= 1 - alpha
+    return weights.to_numpy()
+
+@pytest.mark.parametrize('num_assets', [2, 7, 60])
+def test_hrp_matches_reference_recursion(num_assets):
+    cov_matrix = random_covariance(num_assets, seed=num_assets)
+    np.testing.assert_allclose(hierarchical_risk_parity(cov_matrix), reference_hrp(cov_matrix), rtol=1e-12)
+
+def test_hrp_keeps_labels():
+    cov_matrix = pd.DataFrame(random_covariance(7), index=ASSET_CLASSES, columns=ASSET_CLASSES)
+    weights = hierarchical_risk_parity(cov_matrix)
+    assert list(weights.index) == ASSET_CLASSES
+    assert weights.sum() == pytest.approx(1)
+
+@pytest.mark.parametrize('budgets', [None, np.linspace(1, 3, 60)])
+def test_erc_contributions_match_budgets(budgets):
+    cov_matrix = random_covariance(60)
+    weights = equal_risk_contribution(cov_matrix, budgets).to_numpy()
+    contributions = weights * (cov_matrix @ weights)
+    budgets = np.ones(60) if budgets is None else budgets
+    np.testing.assert_allclose(contributions / contributions.sum(), budgets / budgets.sum(), rtol=1e-9)
+    assert weights.min() > 0 and weights.sum() == pytest.approx(1)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+from price_cache import get_cached_prices, load_cached_prices
+
+class Source:
+    """Adjusted closes served like a provider, recording every fetched range."""
+
+    def __init__(self, tickers, start='2023-01-02', end='2025-01-01'):
+        index = pd.bdate_range(start, end, inclusive='left')
+        rng = np.random.default_rng(0)
+        self.prices = pd.DataFrame(
+            100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(index), len(tickers))), axis=0)),
+            index=index, columns=tickers
+        )
+        self.calls = []
+
+    def __call__(self, tickers, start, end):
+        self.calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        rows = (self.prices.index >= start) & (self.prices.index < end)
+        return self.prices.loc[rows, tickers]
+
+    def expected(self, tickers, start, end):
+        rows = (self.prices.index >= start) & (self.prices.index < end)
+        return self.prices.loc[rows, tickers]
+
+def test_cold_request_returns_requested_range(tmp_path):
+    source = Source(['SPY'])
+    prices = get_cached_prices(['SPY'], '2024-01-01', '2024-03-01', source, str(tmp_path))
+    pdt.assert_frame_equal(prices, source.expected(['SPY'], '2024-01-01', '2024-03-01'), check_freq=False)
+
+@pytest.mark.parametrize('order', [
+    [('2024-01-01', '2024-02-01'), ('2024-06-01', '2024-07-01'), ('2024-01-01', '2024-08-01')],
+    [('2024-06-01', '2024-07-01'), ('2024-01-01', '2024-02-01'), ('2024-01-01', '2024-07-01')]
+])
+def test_disjoint_requests_do_not_leave_gaps(tmp_path, order):
+    source = Source(['SPY'])
+    for start, end in order:
+        prices = get_cached_prices(['SPY'], start, end, source, str(tmp_path))
+    pdt.assert_frame_equal(prices, source.expected(['SPY'], start, end), check_freq=False)
+
+def test_warm_request_only_fetches_delta(tmp_path):
+    source = Source(['SPY'])
+    get_cached_prices(['SPY'], '2024-01-01', '2024-03-01', source, str(tmp_path))
+    get_cached_prices(['SPY'], '2024-01-01', '2024-03-08', source, str(tmp_path))
+
+    # The delta starts at the last cached bar, re-read to check its adjustment
+    assert source.calls[-1] == (pd.Timestamp('2024-02-29'), pd.Timestamp('2024-03-08'))
+
+@pytest.mark.parametrize('factor', [0.1, 0.997])
+def test_rescaled_history_is_fetched_again(tmp_path, factor):
+    source = Source(['AGG', 'SPY'])
+    get_cached_prices(['AGG', 'SPY'], '2024-01-01', '2024-03-01', source, str(tmp_path))
+
+    # A split (0.1) or dividend (0.997) rescales AGG's whole adjusted history
+    source.prices['AGG'] *= factor
+    prices = get_cached_prices(['AGG', 'SPY'], '2024-01-01', '2024-04-01', source, str(tmp_path))
+
+    expected = source.expected(['AGG', 'SPY'], '2024-01-01', '2024-04-01')
+    pdt.assert_frame_equal(prices, expected, check_freq=False)
+    assert prices.pct_change().abs().max().max() < 0.1
+    cached, covered_from, covered_to = load_cached_prices('AGG', str(tmp_path))
+    pdt.assert_series_equal(cached, expected['AGG'], check_freq=False, check_names=False)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+from data_providers import SyntheticProvider
+from rolling_analytics import (max_drawdown, rolling_analytics, rolling_beta, rolling_sharpe,
+                               rolling_volatility, underwater)
+
+@pytest.fixture
+def returns():
+    prices = SyntheticProvider().download(['SPY', 'AAA', 'BBB'], '2020-01-01', '2021-01-01')
+    returns = prices.pct_change().iloc[1:]
+    returns.iloc[40:45, 1] = np.nan
+    return returns
+
+def test_rolling_volatility_matches_pandas(returns):
+    result = rolling_volatility(returns, windows=(21, 63))
+    for window in (21, 63):
+        expected = returns.rolling(window).std() * np.sqrt(252) * 100
+        pdt.assert_frame_equal(result[window], expected, check_freq=False)
+
+def test_rolling_sharpe_matches_pandas(returns):
+    result = rolling_sharpe(returns, windows=(21,))
+    rolling = returns.rolling(21)
+    expected = rolling.mean() * np.sqrt(252) / rolling.std()
+    pdt.assert_frame_equal(result[21], expected, check_freq=False)
+
+def test_rolling_beta_matches_pandas(returns):
+    result = rolling_beta(returns, 'SPY', windows=(63,))
+    for ticker in returns:
+        rolling = returns[ticker].rolling(63)
+        expected = rolling.cov(returns['SPY']) / returns['SPY'].where(returns[ticker].notna()).rolling(63).var()
+        pdt.assert_series_equal(result[63][ticker], expected, check_freq=False, check_names=False)
+
+def test_drawdowns(returns):
+    prices = (1 + returns.fillna(0)).cumprod()
+    expected = prices / prices.cummax() - 1
+    pdt.assert_frame_equal(underwater(prices), expected, check_freq=False)
+    pdt.assert_series_equal(max_drawdown(prices), expected.min(), check_names=False)
+
+def test_windows_longer_than_history_are_empty(returns):
+    analytics = rolling_analytics(returns.iloc[:20].add(1).cumprod(), windows=(21,))
+    assert analytics['volatility'][21].isna().all().all()
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+from data_providers import FixtureProvider, SyntheticProvider
+from market_data_cache import market_data_cache
+from portfolio_optimizer import ASSET_CLASSES, EXAMPLE_TICKERS, FALLBACK_TICKERS
+from stress_testing import SCENARIOS, get_historical_scenarios, stress_test, stress_test_paths
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    market_data_cache.clear()
+    yield
+    market_data_cache.clear()
+
+@pytest.fixture
+def book():
+    rng = np.random.default_rng(7)
+    weights = rng.dirichlet(np.ones(len(ASSET_CLASSES)), size=20)
+    return pd.DataFrame(weights, index=[f'p{i}' for i in range(20)], columns=ASSET_CLASSES)
+
+@pytest.fixture
+def prices():
+    tickers = sorted(set(EXAMPLE_TICKERS.values()) | set(FALLBACK_TICKERS.values()))
+    prices = SyntheticProvider().download(tickers, '2005-01-03', pd.Timestamp.today().normalize())
+    # The international proxies launched after 2008
+    prices.loc[:'2013-06-03', EXAMPLE_TICKERS['International Bonds']] = np.nan
+    prices.loc[:'2011-01-26', EXAMPLE_TICKERS['International Equity']] = np.nan
+    return prices
+
+def test_stress_test_matches_loop(book):
+    result = stress_test(book)
+    for scenario, shocks in SCENARIOS.items():
+        for portfolio, weights in book.iterrows():
+            expected = sum(weights[asset] * shocks.get(asset, 0.0) for asset in ASSET_CLASSES)
+            assert result.at[scenario, portfolio] == pytest.approx(expected)
+
+def test_stress_test_paths_match_loop(book):
+    index = pd.bdate_range('2020-02-19', periods=25)
+    returns = pd.DataFrame(np.random.default_rng(3).normal(0, 0.02, (25, len(ASSET_CLASSES))),
+                           index=index, columns=ASSET_CLASSES)
+    result = stress_test_paths(book, {'shock': returns})
+    for portfolio, weights in book.iterrows():
+        holdings, path = weights.to_numpy().copy(), []
+        for _, day in returns.iterrows():
+            holdings = holdings * (1 + day.to_numpy())
+            path.append(holdings.sum())
+        path = np.array(path)
+        np.testing.assert_allclose(result['paths']['shock'][portfolio], path)
+        assert result['total_return'].at['shock', portfolio] == pytest.approx(path[-1] - 1)
+        drawdown = min(0.0, (path / np.maximum.accumulate(np.r_[1.0, path])[1:] - 1).min())
+        assert result['max_drawdown'].at['shock', portfolio] == pytest.approx(drawdown)
+
+def test_windows_before_launch_use_fallbacks(prices):
+    scenarios = get_historical_scenarios(provider=FixtureProvider(prices))
+    crisis = scenarios['2008 Financial Crisis']
+    window = prices.loc['2008-09-01':'2009-03-09'].pct_change().iloc[1:]
+    for asset in ASSET_CLASSES:
+        ticker = FALLBACK_TICKERS.get(asset, EXAMPLE_TICKERS[asset])
+        pdt.assert_series_equal(crisis[asset], window[ticker], check_names=False, check_freq=False)
+    # No asset class is held flat
+    assert (crisis.abs().sum() > 0).all()
+    pdt.assert_frame_equal(scenarios['2022 Rate Shock'].iloc[:, :2],
+                           prices.loc['2022-01-03':'2022-10-14', [EXAMPLE_TICKERS[a] for a in ASSET_CLASSES[:2]]]
+                           .pct_change().iloc[1:].set_axis(ASSET_CLASSES[:2], axis=1), check_freq=False)
+
+def test_window_without_coverage_is_skipped(prices, capsys):
+    prices.loc[:'2009-12-31', FALLBACK_TICKERS['International Bonds']] = np.nan
+    scenarios = get_historical_scenarios(provider=FixtureProvider(prices))
+    assert '2008 Financial Crisis' not in scenarios
+    assert set(scenarios) == {'2020 COVID Crash', '2022 Rate Shock'}
+    assert 'Skipping 2008 Financial Crisis: no prices for International Bonds' in capsys.readouterr().out
@@ -0,0 +1,114 @@
+import pandas as pd
+import numpy as np
+from portfolio_optimizer import RISK_FREE_RATE, get_asset_model
+
+# Number of incremental updates after which Σw is recomputed from scratch
+REFRESH_INTERVAL = 1000
+
+class WhatIfPortfolio:
+    """
+    Portfolio whose metrics are updated incrementally while weights are edited.
+
+    The engine keeps Σw, the portfolio variance and the expected return. When
+    one weight changes by δ, they follow from rank-1 updates
+
+        Σw ← Σw + δ Σ[:, i]
+        w'Σw ← w'Σw + 2δ (Σw)_i + δ² Σ_ii
+
+    so a slider tick costs O(n) instead of the O(n²) of recomputing w'Σw. The
+    per-asset risk decomposition w · Σw / σ only needs Σw and is O(n) too.
+    """
+
+    def __init__(self, allocation, model=None):
+        """
+        Args:
+            allocation (dict): Starting weight of each asset class; missing ones are 0
+            model (dict): Asset model, defaults to portfolio_optimizer.get_asset_model()
+        """
+        if model is None:
+            model = get_asset_model()
+        self.assets = list(model['assets'])
+        self.positions = {asset: i for i, asset in enumerate(self.assets)}
+        self.expected_returns = model['expected_returns']
+        self.cov_matrix = model['cov_matrix']
+        self.weights = np.array([allocation.get(asset, 0.0) for asset in self.assets], dtype=float)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Recompute the cached quantities from scratch, discarding rounding drift.
+        """
+        self.cov_weights = self.cov_matrix @ self.weights
+        self.variance = self.weights @ self.cov_weights
+        self.expected_return = self.weights @ self.expected_returns
+        self.updates = 0
+
+    def set_weight(self, asset, weight):
+        """
+        Change the weight of one asset class.
+
+        Args:
+            asset (str): Asset class
+            weight (float): New weight
+        """
+        i = self.positions[asset]
+        delta = weight - self.weights[i]
+        if delta == 0:
+            return
+
+        self.variance += 2 * delta * self.cov_weights[i] + delta ** 2 * self.cov_matrix[i, i]
+        # Σ is symmetric, so its contiguous row i equals column i
+        self.cov_weights += delta * self.cov_matrix[i]
+        self.expected_return += delta * self.expected_returns[i]
+        self.weights[i] = weight
+
+        self.updates += 1
+        if self.updates >= REFRESH_INTERVAL:
+            self.refresh()
+
+    def set_weights(self, allocation):
+        """
+        Change the weights of several asset classes, one rank-1 update each.
+
+        Args:
+            allocation (dict): New weight of each asset class to change
+        """
+        for asset, weight in allocation.items():
+            self.set_weight(asset, weight)
+
+    def metrics(self):
+        """
+        Return the current portfolio metrics.
+
+        Returns:
+            dict: 'expected_return', 'expected_volatility', 'sharpe_ratio' and
+                  'total_weight' (sum of the weights, 1 for a fully invested portfolio)
+        """
+        volatility = np.sqrt(max(self.variance, 0.0))
+        return {
+            'expected_return': self.expected_return,
+            'expected_volatility': volatility,
+            'sharpe_ratio': (self.expected_return - RISK_FREE_RATE) / volatility if volatility > 0 else np.nan,
+            'total_weight': self.weights.sum()
+        }
+
+    def risk_contributions(self):
+        """
+        Decompose the portfolio volatility by asset class.
+
+        Returns:
+            pandas.DataFrame: 'weight', 'marginal' risk (Σw / σ), 'contribution'
+                              (w · Σw / σ, summing to the volatility) and 'share'
+                              of the volatility for each asset class
+        """
+        volatility = np.sqrt(max(self.variance, 0.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            marginal = self.cov_weights / volatility
+            contribution = self.weights * marginal
+            share = contribution / volatility
+        return pd.DataFrame({
+            'weight': self.weights,
+            'marginal': marginal,
+            'contribution': contribution,
+            'share': share
+        }, index=self.assets)